@@ -1,51 +1,139 @@
 """
 Advanced password cracker implementation with additional features.
 """
+import hashlib
 import logging
 import time
 import itertools
 import string
-from typing import Optional, List, Dict, Set
+import threading
+from typing import Optional, Dict, Set, Iterable, Sequence, Tuple
 from pathlib import Path
 import argparse
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 from base_cracker import BaseCracker
+from combinator import CombinatorKeyspace
+from keyspace import Keyspace, Checkpoint, mask_keyspaces
+from markov import MarkovModel, MarkovKeyspace
+from progress import live_progress
+from rules import RuleEngine
+from stringtable import CachedTables
+from wordlist import ensure_compiled
 from utils import (
     SecurityError,
+    TokenBucket,
+    verify_many,
+    process_context,
     log_security_event,
     calculate_entropy,
     sanitize_output
 )
 from config import (
     WORDLISTS_DIR,
+    RULES_DIR,
+    CACHE_DIR,
     HASHES_DIR,
     RESULTS_DIR,
-    MAX_THREADS,
+    MAX_PROCESSES,
+    MAX_ATTEMPTS,
+    TIMEOUT,
+    CHECK_BATCH_SIZE,
+    BRUTE_FORCE_CHUNK,
+    CHECKPOINT_INTERVAL,
+    MARKOV_THRESHOLD,
     ERROR_MESSAGES,
     SUCCESS_MESSAGES
 )
 
 logger = logging.getLogger(__name__)
 
+# Stop flag and rate limiter shared with brute-force worker processes
+_worker_stop = None
+_worker_limiter = None
+
+# Wordlist-trained Markov models, keyed by wordlist identity and charset
+MARKOV_CACHE_SIZE = 4
+_markov_cache: Dict[Tuple[str, str], MarkovModel] = {}
+_markov_cache_lock = threading.Lock()
+
+def _wordlist_identity(wordlist_path: Path) -> str:
+    """Identify a wordlist by path, size and modification time."""
+    path = Path(wordlist_path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return str(path)
+    return f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def _init_worker(stop_event, rate_limiter: TokenBucket) -> None:
+    """Install the parent's stop flag and rate limiter in a worker process."""
+    global _worker_stop, _worker_limiter
+    _worker_stop = stop_event
+    _worker_limiter = rate_limiter
+
+def _brute_force_range(
+    algorithm: str,
+    target_hash: str,
+    keyspace: Keyspace,
+    start: int,
+    stop: int,
+    deadline: float
+) -> Tuple[Optional[str], int]:
+    """
+    Check an index range of the brute-force keyspace in a worker process.
+    
+    Returns:
+        Tuple[Optional[str], int]: Matching password (if any) and the
+        number of candidates checked
+    """
+    candidates = keyspace.iter_range(start, stop)
+    checked = 0
+    
+    while not (_worker_stop.is_set() or time.time() > deadline):
+        batch = list(itertools.islice(candidates, CHECK_BATCH_SIZE))
+        if not batch:
+            break
+        
+        _worker_limiter.acquire(len(batch))
+        index = verify_many(batch, target_hash, algorithm)
+        if index is not None:
+            _worker_stop.set()
+            return batch[index], checked + index + 1
+        checked += len(batch)
+    
+    return None, checked
+
 class AdvancedCracker(BaseCracker):
     """Advanced password cracker with additional features."""
     
-    def __init__(self, algorithm: str):
-        """Initialize advanced cracker with additional features."""
+    def __init__(self, algorithm: str, rules_path: Optional[Path] = None):
+        """
+        Initialize advanced cracker with additional features.
+        
+        Args:
+            algorithm: Hash algorithm to use
+            rules_path: Mangling rule file, defaults to rules/default.rule
+        """
         super().__init__(algorithm)
+        self.rule_engine = self._load_rules(rules_path or RULES_DIR / 'default.rule')
         self.character_sets = {
             'lowercase': string.ascii_lowercase,
             'uppercase': string.ascii_uppercase,
             'digits': string.digits,
             'special': string.punctuation
         }
-        self.known_patterns = {
-            'dates': self._generate_date_patterns(),
-            'common_words': self._load_common_words(),
-            'keyboard_patterns': self._generate_keyboard_patterns()
-        }
+        # Pattern tables are built on first use and cached on disk
+        self.known_patterns = CachedTables(
+            {
+                'dates': self._generate_date_patterns,
+                'common_words': self._load_common_words,
+                'keyboard_patterns': self._generate_keyboard_patterns
+            },
+            CACHE_DIR,
+            sources={'common_words': WORDLISTS_DIR / 'common_words.txt'}
+        )
     
     def _generate_date_patterns(self) -> Set[str]:
         """Generate common date patterns."""
@@ -78,6 +166,14 @@ class AdvancedCracker(BaseCracker):
             logger.warning(f"Failed to load common words: {str(e)}")
             return set()
     
+    def _load_rules(self, rules_path: Path) -> RuleEngine:
+        """Load mangling rules, falling back to the unmodified word."""
+        try:
+            return RuleEngine.from_file(rules_path)
+        except SecurityError as e:
+            logger.warning(f"Failed to load rules: {str(e)}")
+            return RuleEngine([':'])
+    
     def _generate_keyboard_patterns(self) -> Set[str]:
         """Generate common keyboard patterns."""
         patterns = set()
@@ -103,13 +199,14 @@ class AdvancedCracker(BaseCracker):
         
         return patterns
     
-    def crack_hash(self, target_hash: str, wordlist_path: Path) -> Optional[str]:
+    def crack_hash(self, target_hash: str, wordlist_path: Path, resume: bool = False) -> Optional[str]:
         """
         Attempt to crack a hash using advanced techniques.
         
         Args:
             target_hash: Hash to crack
             wordlist_path: Path to wordlist file
+            resume: Continue brute force from the last checkpoint
         
         Returns:
             Optional[str]: Cracked password if found, None otherwise
@@ -118,27 +215,59 @@ class AdvancedCracker(BaseCracker):
             # Validate inputs
             self.validate_hash(target_hash)
             
-            # Load wordlist
-            passwords = self.load_wordlist(wordlist_path)
-            logger.info(f"Loaded {len(passwords)} passwords from wordlist")
+            # Check precomputed tables before hashing anything
+            password = self.crack_precomputed(target_hash)
+            if password is not None:
+                return password
             
             # Start cracking
             self.start_time = time.time()
             logger.info(f"Starting advanced attack on {self.algorithm} hash")
             
-            # Try wordlist first
-            result = self._try_wordlist(target_hash, passwords)
-            if result:
-                return result
+            # Try lowercase + digits in brute force, likeliest candidates first.
+            # The attack id only depends on stable inputs; the Markov ordering
+            # is saved with the checkpoint, so new potfile entries do not
+            # invalidate it.
+            charset = self.character_sets['lowercase'] + self.character_sets['digits']
+            attack = f"markov:{_wordlist_identity(wordlist_path)}:{charset}:{MARKOV_THRESHOLD}"
+            checkpoint = Checkpoint(target_hash, self.algorithm, attack)
+            progress = checkpoint.load() if resume else None
             
-            # Try common patterns
-            result = self._try_patterns(target_hash)
-            if result:
-                return result
+            if progress is None:
+                # Stream wordlist
+                passwords = self.load_wordlist(wordlist_path, stream=True)
+                logger.info(f"Streaming passwords from {wordlist_path}")
+                
+                # Try wordlist first
+                self.begin_phase('wordlist')
+                result = self._try_wordlist(target_hash, passwords)
+                if result:
+                    self.record_found(target_hash, result)
+                    return result
+                
+                # Try common patterns
+                result = self._try_patterns(target_hash)
+                if result:
+                    self.record_found(target_hash, result)
+                    return result
+            else:
+                # Earlier phases were exhausted before the checkpoint was written
+                logger.info(
+                    f"Resuming brute force at length {progress['length']}, "
+                    f"offset {progress['offset']}"
+                )
+            
+            # Only train once the brute force is actually needed
+            if progress and progress.get('markov'):
+                markov = MarkovKeyspace(progress['markov'])
+            else:
+                markov = self.train_markov(wordlist_path, charset).keyspace(8, MARKOV_THRESHOLD)
+            checkpoint.context['markov'] = list(markov.orders)
             
             # Try brute force with common character sets
-            result = self._try_brute_force(target_hash)
+            result = self._try_brute_force(target_hash, charset, checkpoint, progress, markov)
             if result:
+                self.record_found(target_hash, result)
                 return result
             
             logger.warning("Password not found using advanced techniques")
@@ -148,108 +277,109 @@ class AdvancedCracker(BaseCracker):
             logger.error(f"Advanced cracking failed: {str(e)}")
             raise SecurityError(f"Failed to crack hash: {str(e)}")
     
-    def _try_wordlist(self, target_hash: str, passwords: List[str]) -> Optional[str]:
-        """Try cracking using wordlist with variations."""
+    def _try_wordlist(self, target_hash: str, passwords: Iterable[str]) -> Optional[str]:
+        """Try cracking using wordlist with rule-based variations."""
         try:
-            # Try original passwords
-            for password in passwords:
-                if self.stop_flag.is_set():
-                    break
-                
-                if self.check_timeout() or self.check_attempts():
-                    break
-                
-                if self.check_password(password, target_hash):
-                    return password
-                
-                # Try common variations
-                variations = self._generate_variations(password)
-                for variation in variations:
-                    if self.check_password(variation, target_hash):
-                        return variation
-            
-            return None
+            result = self.check_passwords(self.rule_engine.stream(passwords), target_hash)
+            if result is not None:
+                rule = self.rule_engine.record_hit(result)
+                logger.info(f"Password found by rule: {rule}")
+            logger.info(f"Rule statistics: {self.rule_engine.stats()}")
+            return result
         
         except Exception as e:
             logger.error(f"Wordlist attack failed: {str(e)}")
             return None
     
-    def _generate_variations(self, password: str) -> List[str]:
-        """Generate common password variations."""
-        variations = []
-        
-        # Case variations
-        variations.append(password.lower())
-        variations.append(password.upper())
-        variations.append(password.capitalize())
-        
-        # Common substitutions
-        substitutions = {
-            'a': '@', 'e': '3', 'i': '1', 'o': '0',
-            's': '$', 't': '7', 'l': '1', 'b': '8'
-        }
-        
-        for char, sub in substitutions.items():
-            if char in password.lower():
-                variations.append(password.lower().replace(char, sub))
-        
-        # Add common suffixes
-        suffixes = ['123', '!', '?', '1', '1234', '2023', '2024']
-        for suffix in suffixes:
-            variations.append(password + suffix)
-        
-        return variations
-    
     def _try_patterns(self, target_hash: str) -> Optional[str]:
         """Try cracking using known patterns."""
         try:
-            # Try date patterns
-            for pattern in self.known_patterns['dates']:
-                if self.stop_flag.is_set():
-                    break
-                
-                if self.check_timeout() or self.check_attempts():
-                    break
-                
-                if self.check_password(pattern, target_hash):
-                    return pattern
-            
-            # Try keyboard patterns
-            for pattern in self.known_patterns['keyboard_patterns']:
-                if self.stop_flag.is_set():
-                    break
-                
-                if self.check_timeout() or self.check_attempts():
-                    break
-                
-                if self.check_password(pattern, target_hash):
-                    return pattern
-            
-            return None
+            dates = self.known_patterns['dates']
+            keyboard = self.known_patterns['keyboard_patterns']
+            self.begin_phase('patterns', len(dates) + len(keyboard))
+            candidates = itertools.chain(dates, keyboard)
+            return self.check_passwords(candidates, target_hash)
         
         except Exception as e:
             logger.error(f"Pattern attack failed: {str(e)}")
             return None
     
-    def _try_brute_force(self, target_hash: str) -> Optional[str]:
-        """Try brute force with common character sets."""
+    def train_markov(self, wordlist_path: Path, charset: str) -> MarkovModel:
+        """
+        Train a Markov model on the wordlist and previously cracked passwords.
+        
+        Wordlist statistics are cached per wordlist path, size and
+        modification time, so repeated attacks only re-read the potfile.
+        
+        Args:
+            wordlist_path: Path to wordlist file
+            charset: Characters the brute force draws from
+        
+        Returns:
+            MarkovModel: The trained model
+        """
+        key = (_wordlist_identity(wordlist_path), charset)
+        with _markov_cache_lock:
+            cached = _markov_cache.get(key)
+        
+        if cached is None:
+            cached = MarkovModel(charset)
+            try:
+                cached.train(self.load_wordlist(wordlist_path, stream=True))
+            except SecurityError as e:
+                logger.warning(f"Markov training skipped wordlist: {str(e)}")
+            else:
+                with _markov_cache_lock:
+                    while len(_markov_cache) >= MARKOV_CACHE_SIZE:
+                        del _markov_cache[next(iter(_markov_cache))]
+                    _markov_cache[key] = cached
+        
+        # The potfile changes between runs, so it is never cached
+        model = cached.copy().train(self.potfile.passwords())
+        logger.info(f"Markov model trained on {model.trained} passwords")
+        return model
+    
+    def _try_brute_force(
+        self,
+        target_hash: str,
+        charset: str,
+        checkpoint: Optional[Checkpoint] = None,
+        progress: Optional[Dict] = None,
+        markov: Optional[MarkovKeyspace] = None
+    ) -> Optional[str]:
+        """
+        Try brute force with common character sets.
+        
+        Args:
+            target_hash: Hash to crack
+            charset: Charset used at every position
+            checkpoint: Where to record progress, if anywhere
+            progress: Saved progress to resume from
+            markov: Markov keyspace of the longest length ordering
+                candidates, lexicographic if None
+        """
         try:
+            first_length = progress['length'] if progress else 4
+            offset = progress['offset'] if progress else 0
+            
             # Start with shorter lengths and common character sets
-            for length in range(4, 9):
+            for length in range(first_length, 9):
                 if self.stop_flag.is_set():
                     break
                 
                 if self.check_timeout() or self.check_attempts():
                     break
                 
-                # Try lowercase + digits first
-                result = self._brute_force_length(
-                    target_hash,
-                    length,
-                    self.character_sets['lowercase'] + self.character_sets['digits']
+                if markov is not None:
+                    keyspace = markov.prefix(length)
+                else:
+                    keyspace = Keyspace.uniform(charset, length)
+                result = self._brute_force_keyspace(
+                    target_hash, keyspace, offset, checkpoint, f"brute force (length {length})"
                 )
                 if result:
                     return result
+                offset = 0
             
             return None
         
@@ -257,57 +387,288 @@ class AdvancedCracker(BaseCracker):
             logger.error(f"Brute force attack failed: {str(e)}")
             return None
     
-    def _brute_force_length(self, target_hash: str, length: int, charset: str) -> Optional[str]:
-        """Brute force passwords of specific length."""
+    def _brute_force_length(
+        self,
+        target_hash: str,
+        length: int,
+        charset: str,
+        start: int = 0,
+        checkpoint: Optional[Checkpoint] = None
+    ) -> Optional[str]:
+        """
+        Brute force passwords of specific length across worker processes.
+        
+        Args:
+            target_hash: Hash to crack
+            length: Password length
+            charset: Charset used at every position
+            start: Keyspace index to resume from
+            checkpoint: Where to record progress, if anywhere
+        
+        Returns:
+            Optional[str]: Cracked password if found, None otherwise
+        """
+        keyspace = Keyspace.uniform(charset, length)
+        return self._brute_force_keyspace(target_hash, keyspace, start, checkpoint)
+    
+    def _brute_force_keyspace(
+        self,
+        target_hash: str,
+        keyspace: Keyspace,
+        start: int = 0,
+        checkpoint: Optional[Checkpoint] = None,
+        phase: str = 'brute force'
+    ) -> Optional[str]:
+        """
+        Brute force a keyspace across worker processes.
+        
+        The keyspace is split into index ranges of at most
+        BRUTE_FORCE_CHUNK candidates. Ranges are submitted lazily so only a
+        few are in flight per worker, and all workers stop early through a
+        shared stop flag once any of them finds a match.
+        
+        Ranges can finish out of order, so progress is tracked as the
+        offset below which every range has completed. That offset is saved
+        to the checkpoint every CHECKPOINT_INTERVAL seconds and whenever
+        the attack stops without a match, including on interruption,
+        together with the keyspace length.
+        
+        The phase name and keyspace size are recorded for progress
+        reports.
+        """
+        length = keyspace.length
+        total = keyspace.size
+        self.begin_phase(phase, total, start)
+        budget = MAX_ATTEMPTS - self.attempts
+        chunk = max(1, min(BRUTE_FORCE_CHUNK, -(-(total - start) // MAX_PROCESSES)))
+        deadline = self.start_time + TIMEOUT
+        context = process_context()
+        stop_event = context.Event()
+        attempts_before = self.attempts
+        ranges = ((first, min(first + chunk, total)) for first in range(start, total, chunk))
+        # Offset below which every range is done, and finished ranges above it
+        watermark = start
+        completed: Dict[int, int] = {}
+        last_saved = time.time()
+        result = None
+        
+        try:
+            with ProcessPoolExecutor(
+                max_workers=MAX_PROCESSES,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(stop_event, self.rate_limiter)
+            ) as executor:
+                pending = {}
+                try:
+                    while True:
+                        # Keep every worker busy without queueing the whole keyspace
+                        while (
+                            len(pending) < MAX_PROCESSES * 2
+                            and budget > 0
+                            and not (stop_event.is_set() or self.stop_flag.is_set())
+                        ):
+                            next_range = next(ranges, None)
+                            if next_range is None:
+                                break
+                            first, last = next_range
+                            last = min(last, first + budget)
+                            budget -= last - first
+                            future = executor.submit(
+                                _brute_force_range,
+                                self.algorithm,
+                                target_hash,
+                                keyspace,
+                                first,
+                                last,
+                                deadline
+                            )
+                            pending[future] = (first, last)
+                        
+                        if not pending:
+                            break
+                        
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            first, last = pending.pop(future)
+                            password, checked = future.result()
+                            self.count_attempts(checked)
+                            if password is not None:
+                                result = password
+                            elif checked == last - first:
+                                completed[first] = last
+                        
+                        while watermark in completed:
+                            watermark = completed.pop(watermark)
+                        
+                        if result is not None or self.stop_flag.is_set() or self.check_timeout():
+                            break
+                        
+                        if checkpoint is not None and time.time() - last_saved >= CHECKPOINT_INTERVAL:
+                            checkpoint.save(length=length, offset=watermark)
+                            last_saved = time.time()
+                finally:
+                    # Stop outstanding workers before the pool shuts down
+                    stop_event.set()
+                    for future in pending:
+                        future.cancel()
+                    for future in wait(pending).done:
+                        if not future.cancelled() and future.exception() is None:
+                            self.count_attempts(future.result()[1])
+        
+        except Exception as e:
+            logger.error(f"Brute force failed: {str(e)}")
+        
+        finally:
+            if checkpoint is not None:
+                if result is None:
+                    checkpoint.save(length=length, offset=watermark)
+                else:
+                    checkpoint.clear()
+        
+        self.log_batch(self.attempts - attempts_before, result is not None)
+        return result
+    
+    def crack_mask(
+        self,
+        target_hash: str,
+        mask: str,
+        custom_charsets: Sequence[Optional[str]] = (),
+        increment: bool = False,
+        min_length: int = 1,
+        resume: bool = False
+    ) -> Optional[str]:
+        """
+        Attempt to crack a hash with a mask attack.
+        
+        Each position draws from its own charset, so a structure such as
+        ``?u?l?l?l?l?d?d!`` covers far fewer candidates than a uniform
+        charset of the same length.
+        
+        Args:
+            target_hash: Hash to crack
+            mask: Mask, see keyspace.parse_mask
+            custom_charsets: Definitions for ``?1`` to ``?4``
+            increment: Also try every prefix of the mask, shortest first
+            min_length: Shortest prefix to try when incrementing
+            resume: Continue from the last checkpoint
+        
+        Returns:
+            Optional[str]: Cracked password if found, None otherwise
+        """
         try:
-            with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-                futures = []
+            self.validate_hash(target_hash)
+            
+            password = self.crack_precomputed(target_hash)
+            if password is not None:
+                return password
+            
+            keyspaces = mask_keyspaces(mask, custom_charsets, increment, min_length)
+            attack = hashlib.sha256('|'.join(k.describe() for k in keyspaces).encode()).hexdigest()[:16]
+            checkpoint = Checkpoint(target_hash, self.algorithm, f"mask:{attack}")
+            progress = checkpoint.load() if resume else None
+            
+            self.start_time = time.time()
+            logger.info(
+                f"Starting mask attack on {self.algorithm} hash: "
+                f"{sum(k.size for k in keyspaces)} candidates"
+            )
+            
+            for keyspace in keyspaces:
+                if progress and keyspace.length < progress['length']:
+                    continue
+                start = progress['offset'] if progress and keyspace.length == progress['length'] else 0
                 
-                # Split work among threads
-                chunk_size = len(charset) // MAX_THREADS
-                for i in range(0, len(charset), chunk_size):
-                    chunk = charset[i:i + chunk_size]
-                    futures.append(
-                        executor.submit(
-                            self._brute_force_chunk,
-                            target_hash,
-                            length,
-                            chunk,
-                            charset
-                        )
-                    )
+                if self.stop_flag.is_set() or self.check_timeout() or self.check_attempts():
+                    break
                 
-                # Check results
-                for future in as_completed(futures):
-                    result = future.result()
-                    if result:
-                        return result
+                result = self._brute_force_keyspace(
+                    target_hash, keyspace, start, checkpoint, f"mask (length {keyspace.length})"
+                )
+                if result:
+                    self.record_found(target_hash, result)
+                    return result
             
+            logger.warning("Password not found in mask keyspace")
             return None
         
         except Exception as e:
-            logger.error(f"Brute force length failed: {str(e)}")
-            return None
+            logger.error(f"Mask attack failed: {str(e)}")
+            raise SecurityError(f"Failed to crack hash: {str(e)}")
     
-    def _brute_force_chunk(self, target_hash: str, length: int, start_chars: str, charset: str) -> Optional[str]:
-        """Brute force a chunk of possible passwords."""
+    def crack_combinator(
+        self,
+        target_hash: str,
+        left: str,
+        right: str,
+        separator: str = '',
+        resume: bool = False
+    ) -> Optional[str]:
+        """
+        Attempt to crack a hash with a combinator attack.
+        
+        Every word of the left source is joined with every word of the
+        right source. Each source is a wordlist path or the name of a
+        pattern table ('dates', 'common_words', 'keyboard_patterns');
+        text wordlists are compiled once so both sides are memory-mapped.
+        
+        Args:
+            target_hash: Hash to crack
+            left: Source of first words
+            right: Source of second words
+            separator: Text placed between the two words
+            resume: Continue from the last checkpoint
+        
+        Returns:
+            Optional[str]: Cracked password if found, None otherwise
+        """
         try:
-            for combo in itertools.product(start_chars, *[charset] * (length - 1)):
-                if self.stop_flag.is_set():
-                    break
-                
-                if self.check_timeout() or self.check_attempts():
-                    break
+            self.validate_hash(target_hash)
+            
+            password = self.crack_precomputed(target_hash)
+            if password is not None:
+                return password
+            
+            keyspace = CombinatorKeyspace(
+                self._combinator_table(left),
+                self._combinator_table(right),
+                separator
+            )
+            try:
+                checkpoint = Checkpoint(target_hash, self.algorithm, f"combinator:{keyspace.describe()}")
+                progress = checkpoint.load() if resume else None
                 
-                password = ''.join(combo)
-                if self.check_password(password, target_hash):
-                    return password
+                self.start_time = time.time()
+                logger.info(
+                    f"Starting combinator attack on {self.algorithm} hash: "
+                    f"{keyspace.left_size} x {keyspace.right_size} candidates"
+                )
+                result = self._brute_force_keyspace(
+                    target_hash,
+                    keyspace,
+                    progress['offset'] if progress else 0,
+                    checkpoint,
+                    'combinator'
+                )
+            finally:
+                keyspace.close()
             
+            if result:
+                self.record_found(target_hash, result)
+                return result
+            
+            logger.warning("Password not found in combinator keyspace")
             return None
         
         except Exception as e:
-            logger.error(f"Brute force chunk failed: {str(e)}")
-            return None
+            logger.error(f"Combinator attack failed: {str(e)}")
+            raise SecurityError(f"Failed to crack hash: {str(e)}")
+    
+    def _combinator_table(self, source: str) -> Path:
+        """Get the string table for a pattern table name or wordlist path."""
+        if source in self.known_patterns:
+            return self.known_patterns[source].path
+        return ensure_compiled(Path(source), CACHE_DIR)
     
     def analyze_password(self, password: str) -> Dict:
         """
@@ -379,6 +740,11 @@ class AdvancedCracker(BaseCracker):
             return 'Weak'
         else:
             return 'Very Weak'
+    
+    def cleanup(self) -> None:
+        """Clean up resources, including the pattern table memory maps."""
+        super().cleanup()
+        self.known_patterns.close()
 
 def main():
     """Main entry point."""
@@ -389,7 +755,7 @@ def main():
     
     parser.add_argument(
         'mode',
-        choices=['crack', 'analyze', 'demo'],
+        choices=['crack', 'mask', 'combinator', 'analyze', 'demo'],
         help='Mode of operation'
     )
     
@@ -398,11 +764,6 @@ def main():
         help='Target hash to crack or password to analyze'
     )
     
-    parser.add_argument(
-        '-f', '--file',
-        help='File containing hashes to crack'
-    )
-    
     parser.add_argument(
         '-w', '--wordlist',
         default=WORDLISTS_DIR / 'common_passwords.txt',
@@ -416,6 +777,55 @@ def main():
         help='Hash algorithm'
     )
     
+    parser.add_argument(
+        '-r', '--rules',
+        default=RULES_DIR / 'default.rule',
+        type=Path,
+        help='Mangling rule file'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume brute force from the last checkpoint'
+    )
+    
+    parser.add_argument(
+        '-m', '--mask',
+        help='Mask for mask mode, e.g. ?u?l?l?l?l?d?d!'
+    )
+    
+    for number in range(1, 5):
+        parser.add_argument(
+            f'-{number}', f'--custom-charset{number}',
+            help=f'Custom charset for ?{number} in the mask'
+        )
+    
+    parser.add_argument(
+        '-i', '--increment',
+        action='store_true',
+        help='Also try every shorter prefix of the mask'
+    )
+    
+    parser.add_argument(
+        '--increment-min',
+        type=int,
+        default=1,
+        help='Shortest mask prefix to try with --increment'
+    )
+    
+    parser.add_argument(
+        '--right',
+        help='Second wordlist or pattern table (dates, common_words, '
+             'keyboard_patterns) for combinator mode; -w is the first'
+    )
+    
+    parser.add_argument(
+        '--separator',
+        default='',
+        help='Text placed between the two words in combinator mode'
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -427,7 +837,7 @@ def main():
 ╚═══════════════════════════════════════════════════════════════╝
         """)
         
-        cracker = AdvancedCracker(args.algorithm)
+        cracker = AdvancedCracker(args.algorithm, rules_path=args.rules)
         
         if args.mode == 'analyze':
             if not args.target:
@@ -462,20 +872,58 @@ def main():
             print(f"Strength Level: {analysis['strength_level']}")
             print(f"Strength Score: {analysis['strength_score']}")
         
-        elif args.mode == 'crack':
-            if not args.target and not args.file:
-                print("[!] Please provide a target hash (-t) or hash file (-f)")
+        elif args.mode == 'mask':
+            if not args.target or not args.mask:
+                print("[!] Please provide a target hash (-t) and a mask (-m)")
                 sys.exit(1)
             
-            if args.target:
-                result = cracker.crack_hash(args.target, args.wordlist)
-                if result:
-                    print(f"[+] Password found: {result}")
-                else:
-                    print("[-] Password not found using advanced techniques")
+            # By position, so -2 works without -1
+            custom_charsets = [getattr(args, f'custom_charset{number}') for number in range(1, 5)]
             
-            elif args.file:
-                cracker.crack_multiple(args.file, args.wordlist)
+            with live_progress(cracker):
+                result = cracker.crack_mask(
+                    args.target,
+                    args.mask,
+                    custom_charsets,
+                    increment=args.increment,
+                    min_length=args.increment_min,
+                    resume=args.resume
+                )
+            if result:
+                print(f"[+] Password found: {result}")
+            else:
+                print("[-] Password not found in mask keyspace")
+        
+        elif args.mode == 'combinator':
+            if not args.target or not args.right:
+                print("[!] Please provide a target hash (-t) and a right wordlist (--right)")
+                sys.exit(1)
+            
+            with live_progress(cracker):
+                result = cracker.crack_combinator(
+                    args.target,
+                    str(args.wordlist),
+                    args.right,
+                    separator=args.separator,
+                    resume=args.resume
+                )
+            if result:
+                print(f"[+] Password found: {result}")
+            else:
+                print("[-] Password not found in combinator keyspace")
+        
+        elif args.mode == 'crack':
+            if not args.target:
+                # Hash files are cracked in one pass by basic_cracker.py crack -f
+                print("[!] Please provide a target hash (-t)")
+                sys.exit(1)
+            
+            with live_progress(cracker):
+                result = cracker.crack_hash(args.target, args.wordlist, resume=args.resume)
+            if result:
+                print(f"[+] Password found: {result}")
+            else:
+                print("[-] Password not found using advanced techniques")
         
         cracker.cleanup()
     
@@ -4,9 +4,10 @@ Base class for password cracking implementations.
 import logging
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
 from pathlib import Path
 import threading
+from itertools import islice
 from queue import Queue
 import json
 
@@ -15,16 +16,24 @@ from config import (
     RATE_LIMIT,
     MAX_THREADS,
     TIMEOUT,
+    CHECK_BATCH_SIZE,
+    TABLES_DIR,
+    POTFILE,
     SUPPORTED_HASHES,
     ERROR_MESSAGES,
     SUCCESS_MESSAGES
 )
+from lookup_table import LookupTable, open_lookup_tables
+from potfile import Potfile
+from wordlist import is_compiled, iter_compiled, iter_valid_lines, resolve_wordlist
 from utils import (
     SecurityError,
     validate_input,
     hash_password,
     verify_password,
-    rate_limit,
+    verify_many,
+    TokenBucket,
+    ShardedCounter,
     secure_file_operation,
     sanitize_output,
     log_security_event
@@ -46,12 +55,57 @@ class BaseCracker(ABC):
             raise SecurityError(f"Unsupported algorithm: {algorithm}")
         
         self.algorithm = algorithm
-        self.attempts = 0
+        self._attempts = ShardedCounter()
         self.start_time = 0
         self.stop_flag = threading.Event()
         self.lock = threading.Lock()
         self.found_passwords: Dict[str, str] = {}
-        self.rate_limiter = threading.Semaphore(RATE_LIMIT)
+        self.rate_limiter = TokenBucket(RATE_LIMIT)
+        self._lookup_tables: Optional[List[LookupTable]] = None
+        self._potfile: Optional[Potfile] = None
+        # Current phase name, its size and the attempt count it started at
+        self._phase: Tuple[Optional[str], Optional[int], int] = (None, None, 0)
+    
+    @property
+    def attempts(self) -> int:
+        """Candidates checked so far, summed across threads."""
+        return self._attempts.value
+    
+    @attempts.setter
+    def attempts(self, value: int) -> None:
+        """Reset the attempt count."""
+        self._attempts.reset(value)
+    
+    def count_attempts(self, count: int) -> None:
+        """
+        Record checked candidates without locking.
+        
+        Args:
+            count: Number of candidates checked
+        """
+        self._attempts.add(count)
+    
+    def begin_phase(self, name: str, total: Optional[int] = None, done: int = 0) -> None:
+        """
+        Record the attack phase now running, for progress reports.
+        
+        Args:
+            name: Phase name
+            total: Candidates in the phase, if known
+            done: Candidates already covered, e.g. by a resumed checkpoint
+        """
+        self._phase = (name, total, self.attempts - done)
+    
+    def phase_progress(self) -> Tuple[Optional[str], Optional[int], int]:
+        """
+        Get the current phase and how far it has got.
+        
+        Returns:
+            Tuple[Optional[str], Optional[int], int]: Phase name, its size
+            if known, and candidates covered so far
+        """
+        name, total, start = self._phase
+        return name, total, self.attempts - start
     
     @abstractmethod
     def crack_hash(self, target_hash: str, wordlist_path: Path) -> Optional[str]:
@@ -81,13 +135,80 @@ class BaseCracker(ABC):
             SecurityError: If hash is invalid
         """
         try:
-            validate_input(target_hash, 'hash')
+            validate_input(target_hash, 'bcrypt' if self.algorithm == 'bcrypt' else 'hash')
             return True
         except SecurityError as e:
             logger.error(f"Hash validation failed: {str(e)}")
             raise
     
-    @rate_limit
+    @property
+    def potfile(self) -> Potfile:
+        """Store of previously cracked hashes, opened on first use."""
+        if self._potfile is None:
+            self._potfile = Potfile(POTFILE)
+        return self._potfile
+    
+    def record_found(self, target_hash: str, password: str) -> None:
+        """
+        Record a cracked hash and add it to the potfile immediately.
+        
+        Args:
+            target_hash: Cracked hash
+            password: Its password
+        """
+        self.found_passwords[target_hash] = password
+        self.potfile.add(self.algorithm, target_hash, password)
+        self.log_attempt(password, True)
+    
+    def skip_known(self, hashes: List[str]) -> List[str]:
+        """
+        Resolve hashes already in the potfile.
+        
+        Args:
+            hashes: Hashes to crack
+        
+        Returns:
+            List[str]: Hashes that still need cracking
+        """
+        known = self.potfile.get_many(self.algorithm, hashes)
+        if known:
+            self.found_passwords.update(known)
+            logger.info(f"Skipping {len(known)} hash(es) already in the potfile")
+        return [target_hash for target_hash in hashes if target_hash not in known]
+    
+    def crack_precomputed(self, target_hash: str) -> Optional[str]:
+        """
+        Look a hash up in the potfile and the precomputed tables.
+        
+        Tables in TABLES_DIR are memory-mapped on first use; a lookup is a
+        binary search and hashes nothing.
+        
+        Args:
+            target_hash: Hash to look up
+        
+        Returns:
+            Optional[str]: Cracked password if found, None otherwise
+        """
+        password = self.potfile.get(self.algorithm, target_hash)
+        if password is not None:
+            self.found_passwords[target_hash] = password
+            logger.info("Password found in potfile")
+            return password
+        
+        if self.algorithm == 'bcrypt':
+            return None
+        
+        if self._lookup_tables is None:
+            self._lookup_tables = open_lookup_tables(self.algorithm, TABLES_DIR)
+        
+        for table in self._lookup_tables:
+            password = table.lookup(target_hash)
+            if password is not None:
+                self.record_found(target_hash, password)
+                logger.info(f"Password found in lookup table {table.path.name}")
+                return password
+        return None
+    
     def check_password(self, password: str, target_hash: str) -> bool:
         """
         Check if password matches target hash.
@@ -100,27 +221,91 @@ class BaseCracker(ABC):
             bool: True if password matches hash
         """
         try:
-            with self.rate_limiter:
-                self.attempts += 1
-                return verify_password(password, target_hash, self.algorithm)
+            self.rate_limiter.acquire()
+            self.count_attempts(1)
+            return verify_password(password, target_hash, self.algorithm)
         except Exception as e:
             logger.error(f"Password check failed: {str(e)}")
             return False
     
-    def load_wordlist(self, wordlist_path: Path) -> List[str]:
+    def check_passwords(self, passwords: Iterable[str], target_hash: str) -> Optional[str]:
+        """
+        Check many candidates against a target hash on the bulk fast path.
+        
+        Unlike check_password, each batch is hashed in one call to
+        verify_many and candidates are not validated, rate limited or logged
+        individually; one audit event is logged per batch instead.
+        
+        Args:
+            passwords: Candidate passwords
+            target_hash: Hash to check against
+        
+        Returns:
+            Optional[str]: Matching password if found, None otherwise
+        """
+        # bcrypt releases the GIL, so spread its batches over threads
+        threads = MAX_THREADS if self.algorithm == 'bcrypt' else 0
+        
+        for batch in self.iter_batches(passwords):
+            index = verify_many(batch, target_hash, self.algorithm, threads)
+            found = batch[index] if index is not None else None
+            checked = len(batch) if index is None else index + 1
+            
+            self.count_attempts(checked)
+            self.log_batch(checked, found is not None)
+            if found is not None:
+                return found
+        
+        return None
+    
+    def iter_batches(self, passwords: Iterable[str], size: Optional[int] = None) -> Iterator[List[str]]:
+        """
+        Split candidates into batches for bulk checking.
+        
+        Stop, timeout and attempt-budget checks and the rate-limit charge
+        run once per batch rather than once per candidate. Batches are
+        trimmed so the attempt budget is never exceeded; callers must pass
+        each batch's checked count to count_attempts before requesting the
+        next one.
+        
+        Args:
+            passwords: Candidate passwords
+            size: Maximum batch size, CHECK_BATCH_SIZE by default
+        
+        Returns:
+            Iterator[List[str]]: Batches of candidates
+        """
+        size = size or CHECK_BATCH_SIZE
+        candidates = iter(passwords)
+        while not (self.stop_flag.is_set() or self.check_timeout() or self.check_attempts()):
+            batch = list(islice(candidates, min(size, MAX_ATTEMPTS - self.attempts)))
+            if not batch:
+                return
+            self.rate_limiter.acquire(len(batch))
+            yield batch
+    
+    def load_wordlist(self, wordlist_path: Path, stream: bool = False) -> Iterable[str]:
         """
         Load and validate wordlist.
         
         Args:
             wordlist_path: Path to wordlist file
+            stream: Return a lazy iterator instead of a list
         
         Returns:
-            List[str]: List of passwords
+            Iterable[str]: Passwords, as a list or a lazy iterator
         
         Raises:
             SecurityError: If wordlist loading fails
         """
         try:
+            if stream:
+                return self.iter_wordlist(wordlist_path)
+            
+            wordlist_path = resolve_wordlist(wordlist_path)
+            if is_compiled(wordlist_path):
+                return list(iter_compiled(wordlist_path))
+            
             content = secure_file_operation(wordlist_path)
             passwords = [line.strip() for line in content.splitlines() if line.strip()]
             
@@ -139,6 +324,29 @@ class BaseCracker(ABC):
             logger.error(f"Wordlist loading failed: {str(e)}")
             raise SecurityError(f"Failed to load wordlist: {str(e)}")
     
+    def iter_wordlist(self, wordlist_path: Path) -> Iterator[str]:
+        """
+        Stream and validate a wordlist lazily.
+        
+        Compiled wordlists, and text wordlists with an up-to-date compiled
+        copy, are read from a memory map without validation. Text lines
+        are read in buffered chunks and validated as they are yielded, in
+        file order, so memory stays flat however large the wordlist is.
+        
+        Args:
+            wordlist_path: Path to wordlist file
+        
+        Returns:
+            Iterator[str]: Valid passwords
+        
+        Raises:
+            SecurityError: If the wordlist cannot be opened
+        """
+        wordlist_path = resolve_wordlist(wordlist_path)
+        if is_compiled(wordlist_path):
+            return iter_compiled(wordlist_path)
+        return iter_valid_lines(wordlist_path)
+    
     def check_timeout(self) -> bool:
         """
         Check if operation has timed out.
@@ -208,8 +416,32 @@ class BaseCracker(ABC):
             }
         )
     
+    def log_batch(self, checked: int, success: bool) -> None:
+        """
+        Log a summary of a batch of password attempts.
+        
+        Args:
+            checked: Number of candidates checked in the batch
+            success: Whether the batch produced a match
+        """
+        log_security_event(
+            'password_batch',
+            {
+                'checked': checked,
+                'success': success,
+                'attempts': self.attempts,
+                'time_elapsed': time.time() - self.start_time
+            }
+        )
+    
     def cleanup(self) -> None:
         """Clean up resources."""
         self.stop_flag.set()
         self.attempts = 0
-        self.found_passwords.clear() 
\ No newline at end of file
+        self.found_passwords.clear()
+        for table in self._lookup_tables or []:
+            table.close()
+        self._lookup_tables = None
+        if self._potfile is not None:
+            self._potfile.close()
+            self._potfile = None
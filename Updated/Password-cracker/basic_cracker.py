@@ -3,17 +3,24 @@ Basic password cracker implementation.
 """
 import logging
 import time
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pathlib import Path
 import argparse
 import sys
 
 from base_cracker import BaseCracker
-from utils import SecurityError, log_security_event
+from bcrypt_scheduler import BcryptScheduler, group_bcrypt_hashes
+from lookup_table import build_lookup_table, table_path
+from progress import live_progress
+from rules import RuleEngine
+from wordlist import compile_wordlist, compiled_path
+from utils import SecurityError, log_security_event, secure_file_operation, hash_many
 from config import (
     WORDLISTS_DIR,
     HASHES_DIR,
     RESULTS_DIR,
+    TABLES_DIR,
+    BCRYPT_BATCH_SIZE,
     ERROR_MESSAGES,
     SUCCESS_MESSAGES
 )
@@ -38,28 +45,25 @@ class BasicCracker(BaseCracker):
             # Validate inputs
             self.validate_hash(target_hash)
             
-            # Load wordlist
-            passwords = self.load_wordlist(wordlist_path)
-            logger.info(f"Loaded {len(passwords)} passwords from wordlist")
+            # Check precomputed tables before hashing anything
+            password = self.crack_precomputed(target_hash)
+            if password is not None:
+                return password
+            
+            # Stream wordlist
+            passwords = self.load_wordlist(wordlist_path, stream=True)
+            logger.info(f"Streaming passwords from {wordlist_path}")
             
             # Start cracking
             self.start_time = time.time()
             logger.info(f"Starting dictionary attack on {self.algorithm} hash")
+            self.begin_phase('wordlist')
             
-            for password in passwords:
-                if self.stop_flag.is_set():
-                    break
-                
-                if self.check_timeout() or self.check_attempts():
-                    break
-                
-                if self.check_password(password, target_hash):
-                    self.found_passwords[target_hash] = password
-                    self.log_attempt(password, True)
-                    logger.info(f"Password found: {password}")
-                    return password
-                
-                self.log_attempt(password, False)
+            password = self.check_passwords(passwords, target_hash)
+            if password is not None:
+                self.record_found(target_hash, password)
+                logger.info(f"Password found: {password}")
+                return password
             
             logger.warning("Password not found in wordlist")
             return None
@@ -84,16 +88,11 @@ class BasicCracker(BaseCracker):
             
             # Start cracking
             self.start_time = time.time()
-            for i, target_hash in enumerate(hashes, 1):
-                if self.stop_flag.is_set():
-                    break
-                
-                logger.info(f"Cracking hash {i}/{len(hashes)}")
-                self.attempts = 0
-                
-                result = self.crack_hash(target_hash, wordlist_path)
-                if result:
-                    self.found_passwords[target_hash] = result
+            remaining = self.skip_known(hashes)
+            if self.algorithm == 'bcrypt':
+                self._crack_bcrypt(remaining, wordlist_path)
+            else:
+                self._crack_unsalted(remaining, wordlist_path)
             
             # Save results
             if self.found_passwords:
@@ -106,6 +105,105 @@ class BasicCracker(BaseCracker):
         except Exception as e:
             logger.error(f"Multiple hash cracking failed: {str(e)}")
             raise SecurityError(f"Failed to crack multiple hashes: {str(e)}")
+    
+    def _crack_bcrypt(self, hashes: List[str], wordlist_path: Path) -> None:
+        """
+        Crack bcrypt hashes grouped by salt and cost.
+        
+        Each candidate is hashed once per salt group and checked against
+        every target in the group. Groups are attacked cheapest cost first,
+        with each batch spread across the process pool.
+        
+        Args:
+            hashes: Hashes to crack
+            wordlist_path: Path to wordlist file
+        """
+        valid = []
+        for target_hash in hashes:
+            try:
+                self.validate_hash(target_hash)
+            except SecurityError:
+                continue
+            valid.append(target_hash)
+        
+        groups = group_bcrypt_hashes(valid)
+        logger.info(f"Starting bcrypt attack on {len(valid)} hashes in {len(groups)} salt groups")
+        
+        with BcryptScheduler() as scheduler:
+            for i, group in enumerate(groups, 1):
+                if self.stop_flag.is_set():
+                    break
+                
+                logger.info(f"Cracking group {i}/{len(groups)}: {len(group)} hash(es) at cost {group.cost}")
+                self.begin_phase(f"bcrypt group {i}/{len(groups)}")
+                
+                passwords = self.load_wordlist(wordlist_path, stream=True)
+                for batch in self.iter_batches(passwords, BCRYPT_BATCH_SIZE):
+                    found = scheduler.check(group, batch)
+                    for password, matched in found:
+                        for target_hash in matched:
+                            self.record_found(target_hash, password)
+                        logger.info(f"Password found for {len(matched)} hash(es)")
+                    
+                    self.count_attempts(len(batch))
+                    self.log_batch(len(batch), bool(found))
+                    if not group.targets:
+                        break
+    
+    def _crack_unsalted(self, hashes: List[str], wordlist_path: Path) -> None:
+        """
+        Crack unsalted hashes in a single pass over the wordlist.
+        
+        Each candidate is hashed once and its digest is looked up in a
+        table of all outstanding targets, so the cost grows with the
+        wordlist rather than with wordlist x targets.
+        
+        Args:
+            hashes: Hashes to crack
+            wordlist_path: Path to wordlist file
+        """
+        # Map raw digest -> original hash strings
+        targets: Dict[bytes, List[str]] = {}
+        for target_hash in hashes:
+            try:
+                self.validate_hash(target_hash)
+                digest = bytes.fromhex(target_hash)
+            except (SecurityError, ValueError):
+                continue
+            targets.setdefault(digest, []).append(target_hash)
+        
+        # Resolve whatever the precomputed tables already know
+        for digest, matched in list(targets.items()):
+            password = self.crack_precomputed(matched[0])
+            if password is not None:
+                for target_hash in matched:
+                    self.found_passwords[target_hash] = password
+                del targets[digest]
+        
+        if not targets:
+            return
+        
+        logger.info(f"Starting multi-target attack on {len(targets)} {self.algorithm} hashes")
+        self.begin_phase('wordlist')
+        
+        for batch in self.iter_batches(self.load_wordlist(wordlist_path, stream=True)):
+            found = 0
+            checked = 0
+            for password, digest in zip(batch, hash_many(batch, self.algorithm)):
+                checked += 1
+                matched = targets.pop(digest, None)
+                if matched:
+                    found += 1
+                    for target_hash in matched:
+                        self.record_found(target_hash, password)
+                    logger.info(f"Password found for {len(matched)} hash(es)")
+                    if not targets:
+                        break
+            
+            self.count_attempts(checked)
+            self.log_batch(checked, found > 0)
+            if not targets:
+                break
 
 def main():
     """Main entry point."""
@@ -116,7 +214,7 @@ def main():
     
     parser.add_argument(
         'mode',
-        choices=['crack', 'generate', 'demo'],
+        choices=['crack', 'generate', 'demo', 'precompute', 'compile'],
         help='Mode of operation'
     )
     
@@ -127,11 +225,13 @@ def main():
     
     parser.add_argument(
         '-f', '--file',
+        type=Path,
         help='File containing hashes to crack'
     )
     
     parser.add_argument(
         '-w', '--wordlist',
+        type=Path,
         default=WORDLISTS_DIR / 'common_passwords.txt',
         help='Wordlist file path'
     )
@@ -143,6 +243,24 @@ def main():
         help='Hash algorithm'
     )
     
+    parser.add_argument(
+        '-r', '--rules',
+        type=Path,
+        help='Rule file whose variants are also precomputed'
+    )
+    
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        help='Compiled wordlist path (default: wordlist path with .pwl suffix)'
+    )
+    
+    parser.add_argument(
+        '--by-frequency',
+        action='store_true',
+        help='Order compiled words by how often they occur in the wordlist'
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -179,20 +297,42 @@ def main():
             else:
                 print("[-] Demo completed without finding password")
         
+        elif args.mode == 'precompute':
+            wordlist = args.wordlist
+            words = cracker.load_wordlist(wordlist, stream=True)
+            name = wordlist.stem
+            if args.rules:
+                words = RuleEngine.from_file(args.rules).stream(words)
+                name = f"{name}-{args.rules.stem}"
+            
+            path = table_path(name, args.algorithm, TABLES_DIR)
+            print(f"[*] Precomputing {args.algorithm} digests for {wordlist}...")
+            count = build_lookup_table(path, words, args.algorithm)
+            print(f"[+] Stored {count} digests in {path}")
+        
+        elif args.mode == 'compile':
+            wordlist = args.wordlist
+            output = args.output or compiled_path(wordlist)
+            print(f"[*] Compiling {wordlist}...")
+            count = compile_wordlist(wordlist, output, args.by_frequency)
+            print(f"[+] Stored {count} distinct words in {output}")
+        
         elif args.mode == 'crack':
             if not args.target and not args.file:
                 print("[!] Please provide a target hash (-t) or hash file (-f)")
                 sys.exit(1)
             
             if args.target:
-                result = cracker.crack_hash(args.target, args.wordlist)
+                with live_progress(cracker):
+                    result = cracker.crack_hash(args.target, args.wordlist)
                 if result:
                     print(f"[+] Password found: {result}")
                 else:
                     print("[-] Password not found in wordlist")
             
             elif args.file:
-                cracker.crack_multiple(args.file, args.wordlist)
+                with live_progress(cracker):
+                    cracker.crack_multiple(args.file, args.wordlist)
         
         cracker.cleanup()
     
@@ -0,0 +1,147 @@
+"""
+Scheduling for bcrypt multi-target attacks.
+
+A bcrypt hash embeds its own cost and salt, so every candidate has to be
+hashed once per distinct salt. Targets are grouped by salt and cost, each
+candidate is hashed once per group and checked against all of the group's
+targets, and groups are attacked cheapest cost first.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Iterable, List, Tuple
+
+import bcrypt
+
+from config import MAX_PROCESSES
+from utils import process_context
+
+logger = logging.getLogger(__name__)
+
+# "$2b$12$" plus the 22-character salt
+SALT_LENGTH = 29
+
+class BcryptGroup:
+    """bcrypt targets sharing one salt and cost."""
+    
+    def __init__(self, salt: bytes):
+        """
+        Initialize the group.
+        
+        Args:
+            salt: Hash prefix holding the version, cost and salt
+        """
+        self.salt = salt
+        self.cost = int(salt.split(b'$')[2])
+        # Checksum -> original hash strings
+        self.targets: Dict[bytes, List[str]] = {}
+    
+    def __len__(self) -> int:
+        """Number of outstanding targets."""
+        return sum(len(hashes) for hashes in self.targets.values())
+    
+    def add(self, target_hash: str) -> None:
+        """
+        Add a target to the group.
+        
+        Args:
+            target_hash: bcrypt hash with this group's salt
+        """
+        checksum = target_hash.encode()[SALT_LENGTH:]
+        self.targets.setdefault(checksum, []).append(target_hash)
+
+def group_bcrypt_hashes(hashes: Iterable[str]) -> List[BcryptGroup]:
+    """
+    Group validated bcrypt hashes by salt and cost.
+    
+    Args:
+        hashes: bcrypt hashes
+    
+    Returns:
+        List[BcryptGroup]: Groups ordered by cost, cheapest first
+    """
+    groups: Dict[bytes, BcryptGroup] = {}
+    for target_hash in hashes:
+        salt = target_hash.encode()[:SALT_LENGTH]
+        if salt not in groups:
+            groups[salt] = BcryptGroup(salt)
+        groups[salt].add(target_hash)
+    
+    return sorted(groups.values(), key=lambda group: group.cost)
+
+def _hash_candidates(salt: bytes, checksums: frozenset, passwords: List[str]) -> List[Tuple[str, bytes]]:
+    """
+    Hash candidates with one salt in a worker process.
+    
+    Returns:
+        List[Tuple[str, bytes]]: Matching passwords and their checksums
+    """
+    hashpw = bcrypt.hashpw
+    matches = []
+    for password in passwords:
+        checksum = hashpw(password.encode(), salt)[SALT_LENGTH:]
+        if checksum in checksums:
+            matches.append((password, checksum))
+    return matches
+
+class BcryptScheduler:
+    """
+    Spreads bcrypt hashing for salt groups across a process pool.
+    
+    Use as a context manager so the pool is shut down afterwards.
+    """
+    
+    def __init__(self, processes: Optional[int] = None):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            processes: Worker processes, MAX_PROCESSES by default; 1 hashes
+                in the calling process
+        """
+        self.processes = max(processes or MAX_PROCESSES, 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def __enter__(self) -> 'BcryptScheduler':
+        """Start the worker pool."""
+        if self.processes > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=process_context())
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+    
+    def check(self, group: BcryptGroup, passwords: List[str]) -> List[Tuple[str, List[str]]]:
+        """
+        Check candidates against every outstanding target in a group.
+        
+        Each candidate is hashed once with the group's salt. Cracked
+        targets are removed from the group.
+        
+        Args:
+            group: Salt group to attack
+            passwords: Candidate passwords
+        
+        Returns:
+            List[Tuple[str, List[str]]]: Each cracked password with the
+            original hashes it matched
+        """
+        checksums = frozenset(group.targets)
+        if self._executor is None or len(passwords) < 2:
+            matches = _hash_candidates(group.salt, checksums, passwords)
+        else:
+            size = -(-len(passwords) // self.processes)
+            futures = [
+                self._executor.submit(_hash_candidates, group.salt, checksums, passwords[i:i + size])
+                for i in range(0, len(passwords), size)
+            ]
+            matches = [match for future in futures for match in future.result()]
+        
+        found = []
+        for password, checksum in matches:
+            hashes = group.targets.pop(checksum, None)
+            if hashes:
+                found.append((password, hashes))
+        return found
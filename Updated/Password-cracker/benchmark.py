@@ -0,0 +1,293 @@
+"""
+Throughput benchmarks for the cracking engines.
+
+Every benchmark runs against synthetic wordlists and hash files in a
+temporary directory and reports items per second. Crackers run with rate
+limiting disabled so the engines themselves are measured. Results are
+written as JSON so runs from different releases can be compared with
+--baseline.
+"""
+import hashlib
+import json
+import logging
+import os
+import platform
+import string
+import sys
+import tempfile
+import time
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, List
+
+import bcrypt
+
+from advanced_cracker import AdvancedCracker
+from basic_cracker import BasicCracker
+from rules import RuleEngine
+from utils import SecurityError, TokenBucket, verify_many
+from wordlist import COMPILED_SUFFIX, compile_wordlist
+from config import RULES_DIR, RESULTS_DIR, SUPPORTED_HASHES
+
+logger = logging.getLogger(__name__)
+
+# Items per benchmark at scale 1.0
+WORDLIST_SIZE = 200000
+CANDIDATE_COUNT = 200000
+BCRYPT_CANDIDATES = 8
+RULE_WORDS = 5000
+MULTI_TARGETS = 100
+BRUTE_FORCE_SIZE = 500000
+
+# Benchmark: (work directory, scale) -> items processed
+Benchmark = Callable[[Path, float], int]
+
+def _count(base: int, scale: float) -> int:
+    """Scale an item count, keeping at least one item."""
+    return max(int(base * scale), 1)
+
+def _synthetic_words(count: int) -> List[str]:
+    """Generate distinct wordlist-style passwords."""
+    return [f"password{i:07d}" for i in range(count)]
+
+def _write_wordlist(workdir: Path, count: int) -> Path:
+    """Write a synthetic wordlist, reusing it if already present."""
+    path = workdir / f"wordlist_{count}.txt"
+    if not path.exists():
+        path.write_text('\n'.join(_synthetic_words(count)) + '\n')
+    return path
+
+def _new_cracker(cls: type, algorithm: str, **kwargs: Any):
+    """Create an unthrottled cracker with its clock started."""
+    cracker = cls(algorithm, **kwargs)
+    cracker.rate_limiter = TokenBucket(0)
+    cracker.start_time = time.time()
+    return cracker
+
+def _unmatched_hash(algorithm: str) -> str:
+    """Create a target hash that no synthetic candidate matches."""
+    if algorithm == 'bcrypt':
+        return bcrypt.hashpw(b'not-a-candidate', bcrypt.gensalt()).decode()
+    return hashlib.new(algorithm, b'not-a-candidate').hexdigest()
+
+def _bench_verify(algorithm: str) -> Benchmark:
+    """Build a benchmark for batch verification with one algorithm."""
+    def run(workdir: Path, scale: float) -> int:
+        base = BCRYPT_CANDIDATES if algorithm == 'bcrypt' else CANDIDATE_COUNT
+        candidates = _synthetic_words(_count(base, scale))
+        verify_many(candidates, _unmatched_hash(algorithm), algorithm)
+        return len(candidates)
+    return run
+
+def bench_wordlist_load(workdir: Path, scale: float) -> int:
+    """Stream and validate a wordlist."""
+    wordlist = _write_wordlist(workdir, _count(WORDLIST_SIZE, scale))
+    cracker = BasicCracker('sha256')
+    return sum(1 for _ in cracker.load_wordlist(wordlist, stream=True))
+
+def _write_compiled(workdir: Path, scale: float) -> None:
+    """Compile the synthetic wordlist, reusing it if already present."""
+    wordlist = _write_wordlist(workdir, _count(WORDLIST_SIZE, scale))
+    if not wordlist.with_suffix(COMPILED_SUFFIX).exists():
+        compile_wordlist(wordlist)
+
+def bench_compiled_load(workdir: Path, scale: float) -> int:
+    """Stream a compiled wordlist from its memory map."""
+    wordlist = workdir / f"wordlist_{_count(WORDLIST_SIZE, scale)}{COMPILED_SUFFIX}"
+    cracker = BasicCracker('sha256')
+    return sum(1 for _ in cracker.load_wordlist(wordlist, stream=True))
+
+def bench_basic_crack(workdir: Path, scale: float) -> int:
+    """Run a full dictionary attack that exhausts the wordlist."""
+    wordlist = _write_wordlist(workdir, _count(WORDLIST_SIZE, scale))
+    cracker = _new_cracker(BasicCracker, 'sha256')
+    cracker.crack_hash(_unmatched_hash('sha256'), wordlist)
+    return cracker.attempts
+
+def bench_crack_multiple(workdir: Path, scale: float) -> int:
+    """Run a multi-target attack that exhausts the wordlist."""
+    wordlist = _write_wordlist(workdir, _count(WORDLIST_SIZE, scale))
+    hash_file = workdir / 'hashes.txt'
+    hash_file.write_text('\n'.join(
+        hashlib.sha256(f"missing{i}".encode()).hexdigest() for i in range(MULTI_TARGETS)
+    ) + '\n')
+    
+    cracker = _new_cracker(BasicCracker, 'sha256')
+    cracker.crack_multiple(hash_file, wordlist)
+    return cracker.attempts
+
+def bench_rules(workdir: Path, scale: float) -> int:
+    """Generate variants with the default rule file."""
+    engine = RuleEngine.from_file(RULES_DIR / 'default.rule')
+    return sum(1 for _ in engine.stream(_synthetic_words(_count(RULE_WORDS, scale))))
+
+def bench_advanced_wordlist(workdir: Path, scale: float) -> int:
+    """Run the rule-based wordlist attack that exhausts its words."""
+    cracker = _new_cracker(AdvancedCracker, 'sha256', rules_path=RULES_DIR / 'default.rule')
+    cracker._try_wordlist(_unmatched_hash('sha256'), _synthetic_words(_count(RULE_WORDS, scale)))
+    return cracker.attempts
+
+def bench_brute_force(workdir: Path, scale: float) -> int:
+    """Brute force a four-character keyspace on the process pool."""
+    alphabet = string.ascii_lowercase + string.digits
+    width = min(max(round(_count(BRUTE_FORCE_SIZE, scale) ** 0.25), 2), len(alphabet))
+    
+    cracker = _new_cracker(AdvancedCracker, 'sha256')
+    cracker._brute_force_length(_unmatched_hash('sha256'), 4, alphabet[:width])
+    return cracker.attempts
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    **{f"verify_{algorithm}": _bench_verify(algorithm) for algorithm in SUPPORTED_HASHES},
+    'wordlist_load': bench_wordlist_load,
+    'compiled_load': bench_compiled_load,
+    'basic_crack': bench_basic_crack,
+    'crack_multiple': bench_crack_multiple,
+    'rules': bench_rules,
+    'advanced_wordlist': bench_advanced_wordlist,
+    'brute_force': bench_brute_force,
+}
+
+# Untimed preparation run before a benchmark
+SETUP: Dict[str, Callable[[Path, float], None]] = {
+    'compiled_load': _write_compiled,
+}
+
+def run_benchmarks(names: Optional[List[str]] = None, scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Run benchmarks and collect their throughput.
+    
+    Args:
+        names: Benchmarks to run, all by default
+        scale: Multiplier for the amount of synthetic work
+    
+    Returns:
+        Dict[str, Any]: Environment details and per-benchmark results
+    
+    Raises:
+        SecurityError: If a benchmark name is unknown
+    """
+    names = names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise SecurityError(f"Unknown benchmarks: {', '.join(unknown)}")
+    
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bench_') as tmp:
+        workdir = Path(tmp)
+        for name in names:
+            if name in SETUP:
+                SETUP[name](workdir, scale)
+            logger.info(f"Running benchmark {name}")
+            started = time.perf_counter()
+            items = BENCHMARKS[name](workdir, scale)
+            seconds = time.perf_counter() - started
+            results[name] = {
+                'items': items,
+                'seconds': round(seconds, 4),
+                'rate': round(items / seconds, 1) if seconds > 0 else 0.0
+            }
+    
+    return {
+        'timestamp': int(time.time()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'scale': scale,
+        'results': results
+    }
+
+def compare_results(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    Find benchmarks that slowed down against a baseline report.
+    
+    Args:
+        report: Current report from run_benchmarks
+        baseline: Earlier report
+        tolerance: Allowed fractional drop in rate
+    
+    Returns:
+        List[str]: Description of each regression
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('rate'):
+            continue
+        change = result['rate'] / previous['rate'] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{name}: {result['rate']:.0f}/s vs {previous['rate']:.0f}/s ({change:+.0%})"
+            )
+    return regressions
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Password Cracker throughput benchmarks'
+    )
+    
+    parser.add_argument(
+        'benchmarks',
+        nargs='*',
+        help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})"
+    )
+    
+    parser.add_argument(
+        '-s', '--scale',
+        type=float,
+        default=1.0,
+        help='Multiplier for the amount of synthetic work'
+    )
+    
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        help='JSON results file (default: results/benchmark_<time>.json)'
+    )
+    
+    parser.add_argument(
+        '-b', '--baseline',
+        type=Path,
+        help='Earlier results file to compare against'
+    )
+    
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.2,
+        help='Allowed fractional slowdown against the baseline'
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        report = run_benchmarks(args.benchmarks, args.scale)
+        
+        print(f"{'Benchmark':<20} {'Items':>10} {'Seconds':>9} {'Rate/s':>12}")
+        for name, result in report['results'].items():
+            print(f"{name:<20} {result['items']:>10} {result['seconds']:>9.3f} {result['rate']:>12.0f}")
+        
+        output = args.output or RESULTS_DIR / f"benchmark_{report['timestamp']}.json"
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[*] Results saved to {output}")
+        
+        if args.baseline:
+            with open(args.baseline, 'r') as f:
+                regressions = compare_results(report, json.load(f), args.tolerance)
+            if regressions:
+                print("[!] Throughput regressions:")
+                for regression in regressions:
+                    print(f"  - {regression}")
+                sys.exit(1)
+            print("[+] No throughput regressions")
+    
+    except (SecurityError, OSError, ValueError) as e:
+        print(f"[!] Error: {str(e)}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n[!] Benchmark cancelled by user")
+        sys.exit(0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Combinator keyspaces.
+
+A combinator keyspace is the cross product of two string tables: candidate
+i is left[i // len(right)] + separator + right[i % len(right)]. Both
+tables are memory-mapped, so the product is never materialized and memory
+stays bounded by the maps. Index ranges map to contiguous runs of left
+words, so a combinator keyspace is split across worker processes and
+checkpointed like any other keyspace.
+"""
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Any, Dict, Iterator, Tuple
+
+from stringtable import StringTable
+from utils import SecurityError
+
+logger = logging.getLogger(__name__)
+
+class CombinatorKeyspace:
+    """Cross product of two string tables, left word major."""
+    
+    # Candidates are made of two words; recorded in checkpoints as the length
+    length = 2
+    
+    def __init__(self, left: Path, right: Path, separator: str = ''):
+        """
+        Initialize the keyspace.
+        
+        Args:
+            left: String table of first words
+            right: String table of second words
+            separator: Text placed between the two words
+        
+        Raises:
+            SecurityError: If a table is invalid or either side is empty
+        """
+        self.left_path = Path(left)
+        self.right_path = Path(right)
+        self.separator = separator
+        self._tables: Optional[Tuple[StringTable, StringTable]] = None
+        
+        left_table, right_table = self._open()
+        self.left_size = len(left_table)
+        self.right_size = len(right_table)
+        if not self.left_size or not self.right_size:
+            self.close()
+            raise SecurityError("Combinator wordlists must not be empty")
+        self.size = self.left_size * self.right_size
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle paths only; worker processes map the tables themselves."""
+        state = self.__dict__.copy()
+        state['_tables'] = None
+        return state
+    
+    def _open(self) -> Tuple[StringTable, StringTable]:
+        """Map both tables on first use."""
+        if self._tables is None:
+            left = StringTable(self.left_path)
+            try:
+                self._tables = (left, StringTable(self.right_path))
+            except SecurityError:
+                left.close()
+                raise
+        return self._tables
+    
+    def candidate(self, index: int) -> str:
+        """
+        Generate the candidate at an index.
+        
+        Args:
+            index: Index into the keyspace
+        
+        Returns:
+            str: Candidate password
+        
+        Raises:
+            SecurityError: If the index is out of range
+        """
+        if not 0 <= index < self.size:
+            raise SecurityError(f"Keyspace index out of range: {index}")
+        left, right = self._open()
+        first, second = divmod(index, self.right_size)
+        return left[first] + self.separator + right[second]
+    
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """
+        Generate candidates [start, stop) in index order.
+        
+        Args:
+            start: First index
+            stop: Index after the last candidate
+        
+        Returns:
+            Iterator[str]: Candidate passwords
+        """
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        
+        left, right = self._open()
+        width = self.right_size
+        for left_index in range(start // width, (stop - 1) // width + 1):
+            first = left_index * width
+            prefix = left[left_index] + self.separator
+            for word in right.iter_range(start - first, stop - first):
+                yield prefix + word
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over every candidate."""
+        return self.iter_range(0, self.size)
+    
+    def describe(self) -> str:
+        """
+        Describe the keyspace for checkpoint matching.
+        
+        Returns:
+            str: Stable description of both tables and the separator
+        """
+        parts = []
+        for path in (self.left_path, self.right_path):
+            stat = path.stat()
+            parts.append(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}")
+        parts.append(self.separator)
+        return hashlib.sha256('\0'.join(parts).encode()).hexdigest()[:16]
+    
+    def close(self) -> None:
+        """Release the memory maps."""
+        if self._tables is not None:
+            for table in self._tables:
+                table.close()
+            self._tables = None
@@ -14,16 +14,27 @@ WORDLISTS_DIR = BASE_DIR / 'wordlists'
 HASHES_DIR = BASE_DIR / 'hashes'
 RESULTS_DIR = BASE_DIR / 'results'
 LOGS_DIR = BASE_DIR / 'logs'
+RULES_DIR = BASE_DIR / 'rules'
+CACHE_DIR = BASE_DIR / 'cache'
+TABLES_DIR = BASE_DIR / 'tables'
+POTFILE = Path(os.getenv('POTFILE', str(RESULTS_DIR / 'potfile.db')))
 
 # Create necessary directories
-for directory in [WORDLISTS_DIR, HASHES_DIR, RESULTS_DIR, LOGS_DIR]:
+for directory in [WORDLISTS_DIR, HASHES_DIR, RESULTS_DIR, LOGS_DIR, RULES_DIR]:
     directory.mkdir(exist_ok=True)
 
 # Security settings
 MAX_ATTEMPTS = int(os.getenv('MAX_ATTEMPTS', '1000000'))
 RATE_LIMIT = int(os.getenv('RATE_LIMIT', '1000'))  # attempts per second
 MAX_THREADS = int(os.getenv('MAX_THREADS', '8'))
+MAX_PROCESSES = int(os.getenv('MAX_PROCESSES', str(os.cpu_count() or 1)))
 TIMEOUT = int(os.getenv('TIMEOUT', '300'))  # seconds
+CHECK_BATCH_SIZE = int(os.getenv('CHECK_BATCH_SIZE', '1000'))  # candidates per bulk check
+BCRYPT_BATCH_SIZE = int(os.getenv('BCRYPT_BATCH_SIZE', '64'))  # candidates per bcrypt round
+BRUTE_FORCE_CHUNK = int(os.getenv('BRUTE_FORCE_CHUNK', '100000'))  # candidates per worker task
+CHECKPOINT_INTERVAL = int(os.getenv('CHECKPOINT_INTERVAL', '30'))  # seconds
+MARKOV_THRESHOLD = int(os.getenv('MARKOV_THRESHOLD', '0'))  # likeliest chars per position, 0 for all
+SORT_RUN_RECORDS = int(os.getenv('SORT_RUN_RECORDS', '500000'))  # records sorted in memory per run
 
 # Hash settings
 SUPPORTED_HASHES = {
@@ -85,6 +96,7 @@ VALIDATION_PATTERNS = {
 # Error messages
 ERROR_MESSAGES = {
     'invalid_hash': 'Invalid hash format',
+    'invalid_bcrypt': 'Invalid bcrypt hash format',
     'invalid_password': 'Invalid password format',
     'rate_limit': 'Rate limit exceeded',
     'timeout': 'Operation timed out',
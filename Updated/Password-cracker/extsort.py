@@ -0,0 +1,147 @@
+"""
+External merge sort for byte records.
+
+Records are collected into runs of bounded size, each run is sorted in
+memory and spilled to a temporary file, and the runs are merged with a
+heap. Sorting needs memory for one run however many records there are,
+so tables and wordlists far larger than RAM can be sorted and
+deduplicated.
+"""
+import heapq
+import logging
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import Optional, BinaryIO, Iterable, Iterator, List
+
+from config import SORT_RUN_RECORDS
+
+logger = logging.getLogger(__name__)
+
+# Record length prefix in run files
+LENGTH = struct.Struct('<I')
+
+# Runs merged at once; more runs are merged in several passes
+MERGE_FANIN = 64
+
+def _write_run(path: Path, records: Iterable[bytes]) -> Path:
+    """Write sorted records to a run file."""
+    pack = LENGTH.pack
+    with open(path, 'wb') as f:
+        for record in records:
+            f.write(pack(len(record)))
+            f.write(record)
+    return path
+
+def _read_run(f: BinaryIO) -> Iterator[bytes]:
+    """Read the records of a run file in order."""
+    read = f.read
+    size = LENGTH.size
+    unpack = LENGTH.unpack
+    while True:
+        prefix = read(size)
+        if not prefix:
+            return
+        yield read(unpack(prefix)[0])
+
+class ExternalSorter:
+    """Collects byte records and yields them in sorted order."""
+    
+    def __init__(self, run_size: Optional[int] = None, directory: Optional[Path] = None):
+        """
+        Initialize an empty sorter.
+        
+        Args:
+            run_size: Records sorted in memory at a time, SORT_RUN_RECORDS
+                by default
+            directory: Where to create the temporary run files, the system
+                temporary directory by default
+        """
+        self.run_size = run_size or SORT_RUN_RECORDS
+        self.directory = directory
+        self._run: List[bytes] = []
+        self._runs: List[Path] = []
+        self._tmp: Optional[Path] = None
+        self._files = 0
+    
+    def _new_run_path(self) -> Path:
+        """Get a fresh run file path, creating the temporary directory on first use."""
+        if self._tmp is None:
+            self._tmp = Path(tempfile.mkdtemp(prefix='.sort-', dir=self.directory))
+        self._files += 1
+        return self._tmp / f"run{self._files}"
+    
+    def _spill(self) -> None:
+        """Sort the current run and move it to disk."""
+        self._run.sort()
+        self._runs.append(_write_run(self._new_run_path(), self._run))
+        self._run = []
+    
+    def add(self, record: bytes) -> None:
+        """
+        Add a record.
+        
+        Args:
+            record: Record to sort; records compare as bytes
+        """
+        self._run.append(record)
+        if len(self._run) >= self.run_size:
+            self._spill()
+    
+    def _merge(self, paths: List[Path], memory: List[bytes]) -> Iterator[bytes]:
+        """Merge run files and an in-memory run, closing the files when done."""
+        files = [open(path, 'rb') for path in paths]
+        try:
+            yield from heapq.merge(memory, *(_read_run(f) for f in files))
+        finally:
+            for f in files:
+                f.close()
+            for path in paths:
+                path.unlink(missing_ok=True)
+    
+    def sorted(self) -> Iterator[bytes]:
+        """
+        Yield every record added, in sorted order.
+        
+        The sorter is emptied; its temporary files are removed when the
+        iterator is exhausted or closed, or when the sorter is closed.
+        
+        Returns:
+            Iterator[bytes]: Records in ascending byte order, duplicates kept
+        """
+        run, self._run = self._run, []
+        run.sort()
+        runs, self._runs = self._runs, []
+        if not runs:
+            yield from run
+            return
+        
+        try:
+            # Merge in passes so only MERGE_FANIN run files are open at once
+            while len(runs) >= MERGE_FANIN:
+                merged = []
+                for i in range(0, len(runs), MERGE_FANIN):
+                    group = runs[i:i + MERGE_FANIN]
+                    merged.append(_write_run(self._new_run_path(), self._merge(group, [])))
+                runs = merged
+            
+            logger.debug(f"Merging {len(runs)} sorted runs")
+            yield from self._merge(runs, run)
+        finally:
+            self.close()
+    
+    def close(self) -> None:
+        """Remove the temporary run files."""
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+        self._runs = []
+    
+    def __enter__(self) -> 'ExternalSorter':
+        """Use the sorter in a with block."""
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        """Remove temporary files when the with block ends."""
+        self.close()
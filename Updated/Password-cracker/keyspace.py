@@ -0,0 +1,300 @@
+"""
+Keyspace indexing, masks and checkpoints for resumable brute-force attacks.
+"""
+import hashlib
+import itertools
+import json
+import logging
+import string
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Sequence, Tuple
+
+from config import RESULTS_DIR
+from utils import SecurityError
+
+logger = logging.getLogger(__name__)
+
+class Keyspace:
+    """
+    Candidate space with one charset per position.
+    
+    Candidates are numbered as a mixed-radix integer with the last
+    position least significant, which matches itertools.product order.
+    Any candidate can be generated directly from its index, so work can
+    be split into index ranges and resumed from an offset.
+    """
+    
+    def __init__(self, charsets: Sequence[str]):
+        """
+        Initialize the keyspace.
+        
+        Args:
+            charsets: Charset for each position
+        
+        Raises:
+            SecurityError: If there are no positions or a charset is empty
+        """
+        if not charsets or not all(charsets):
+            raise SecurityError("Keyspace charsets must not be empty")
+        
+        self.charsets: Tuple[str, ...] = tuple(charsets)
+        self.length = len(self.charsets)
+        self.size = 1
+        for charset in self.charsets:
+            self.size *= len(charset)
+    
+    @classmethod
+    def uniform(cls, charset: str, length: int) -> 'Keyspace':
+        """
+        Create a keyspace using the same charset at every position.
+        
+        Args:
+            charset: Charset for all positions
+            length: Candidate length
+        
+        Returns:
+            Keyspace: The keyspace
+        """
+        return cls([charset] * length)
+    
+    def candidate(self, index: int) -> str:
+        """
+        Generate the candidate at an index.
+        
+        Args:
+            index: Index into the keyspace
+        
+        Returns:
+            str: Candidate password
+        
+        Raises:
+            SecurityError: If the index is out of range
+        """
+        if not 0 <= index < self.size:
+            raise SecurityError(f"Keyspace index out of range: {index}")
+        
+        chars = []
+        for charset in reversed(self.charsets):
+            index, digit = divmod(index, len(charset))
+            chars.append(charset[digit])
+        return ''.join(reversed(chars))
+    
+    def index(self, candidate: str) -> int:
+        """
+        Compute the index of a candidate.
+        
+        Args:
+            candidate: Candidate password
+        
+        Returns:
+            int: Index into the keyspace
+        
+        Raises:
+            SecurityError: If the candidate is not in the keyspace
+        """
+        if len(candidate) != self.length:
+            raise SecurityError("Candidate length does not match keyspace")
+        
+        index = 0
+        for char, charset in zip(candidate, self.charsets):
+            digit = charset.find(char)
+            if digit < 0:
+                raise SecurityError("Candidate is not in keyspace")
+            index = index * len(charset) + digit
+        return index
+    
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """
+        Generate candidates [start, stop) in index order.
+        
+        The leading positions are decoded once per block and the trailing
+        positions are enumerated with itertools.product.
+        
+        Args:
+            start: First index
+            stop: Index after the last candidate
+        
+        Returns:
+            Iterator[str]: Candidate passwords
+        """
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        
+        inner = min(self.length, 3)
+        outer = Keyspace(self.charsets[:-inner]) if inner < self.length else None
+        block = self.size // (outer.size if outer else 1)
+        
+        for prefix_index in range(start // block, (stop - 1) // block + 1):
+            prefix = outer.candidate(prefix_index) if outer else ''
+            first = prefix_index * block
+            suffixes = itertools.product(*self.charsets[-inner:])
+            for combo in itertools.islice(suffixes, max(start - first, 0), min(stop - first, block)):
+                yield prefix + ''.join(combo)
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the whole keyspace."""
+        return self.iter_range(0, self.size)
+    
+    def describe(self) -> str:
+        """
+        Describe the keyspace for checkpoint matching.
+        
+        Returns:
+            str: Stable description of the per-position charsets
+        """
+        return hashlib.sha256('\0'.join(self.charsets).encode()).hexdigest()[:16]
+
+# Built-in mask charsets, as in hashcat
+MASK_CHARSETS = {
+    'l': string.ascii_lowercase,
+    'u': string.ascii_uppercase,
+    'd': string.digits,
+    's': ' ' + string.punctuation,
+    'a': string.ascii_lowercase + string.ascii_uppercase + string.digits + ' ' + string.punctuation,
+    'h': string.digits + 'abcdef',
+    'H': string.digits + 'ABCDEF',
+}
+
+def parse_mask(mask: str, custom_charsets: Sequence[Optional[str]] = ()) -> List[str]:
+    """
+    Parse a hashcat-style mask into per-position charsets.
+    
+    ``?l ?u ?d ?s ?a ?h ?H`` are built-in charsets, ``?1`` to ``?4`` refer
+    to custom charsets (which may themselves use built-in charsets), ``??``
+    is a literal '?' and any other character stands for itself.
+    
+    Args:
+        mask: Mask, e.g. ``?u?l?l?l?l?d?d!``
+        custom_charsets: Definitions for ``?1`` to ``?4`` by position; None
+            or '' leaves a charset undefined
+    
+    Returns:
+        List[str]: Charset for each position
+    
+    Raises:
+        SecurityError: If the mask is invalid
+    """
+    positions = []
+    i = 0
+    while i < len(mask):
+        char = mask[i]
+        if char != '?':
+            positions.append(char)
+            i += 1
+            continue
+        
+        if i + 1 == len(mask):
+            raise SecurityError("Mask ends with an unescaped '?'")
+        
+        key = mask[i + 1]
+        if key == '?':
+            positions.append('?')
+        elif key in MASK_CHARSETS:
+            positions.append(MASK_CHARSETS[key])
+        elif key in '1234':
+            number = int(key)
+            if number > len(custom_charsets) or not custom_charsets[number - 1]:
+                raise SecurityError(f"Custom charset ?{key} is not defined")
+            # Expand built-ins in the custom charset, keeping first occurrences
+            chars = ''.join(parse_mask(custom_charsets[number - 1]))
+            positions.append(''.join(dict.fromkeys(chars)))
+        else:
+            raise SecurityError(f"Unknown mask charset: ?{key}")
+        i += 2
+    
+    if not positions or not all(positions):
+        raise SecurityError("Mask must not be empty")
+    return positions
+
+def mask_keyspaces(
+    mask: str,
+    custom_charsets: Sequence[Optional[str]] = (),
+    increment: bool = False,
+    min_length: int = 1
+) -> List[Keyspace]:
+    """
+    Build the keyspaces for a mask attack.
+    
+    Args:
+        mask: Mask, see parse_mask
+        custom_charsets: Definitions for ``?1`` to ``?4``
+        increment: Also try every prefix of the mask, shortest first
+        min_length: Shortest prefix to try when incrementing
+    
+    Returns:
+        List[Keyspace]: Keyspaces in attack order
+    
+    Raises:
+        SecurityError: If the mask is invalid
+    """
+    positions = parse_mask(mask, custom_charsets)
+    if not increment:
+        return [Keyspace(positions)]
+    
+    first = min(max(min_length, 1), len(positions))
+    return [Keyspace(positions[:length]) for length in range(first, len(positions) + 1)]
+
+class Checkpoint:
+    """Brute-force progress for one target, persisted to RESULTS_DIR."""
+    
+    def __init__(self, target_hash: str, algorithm: str, attack: str, directory: Optional[Path] = None):
+        """
+        Initialize the checkpoint.
+        
+        Args:
+            target_hash: Hash being attacked
+            algorithm: Hash algorithm
+            attack: Identifier of the attack configuration
+            directory: Directory to store checkpoints in, RESULTS_DIR by default
+        """
+        self.attack = attack
+        # Fields saved with every progress update
+        self.context: Dict[str, Any] = {}
+        # Each attack on a target keeps its own file, so attacks never clobber each other
+        key = hashlib.sha256(f"{algorithm}:{target_hash}:{attack}".encode()).hexdigest()[:16]
+        self.path = Path(directory or RESULTS_DIR) / f"checkpoint_{algorithm}_{key}.json"
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load saved progress.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Saved progress, or None if there is
+            no checkpoint for this attack
+        """
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint: {str(e)}")
+            return None
+        
+        if state.get('attack') != self.attack:
+            logger.warning("Ignoring checkpoint from a different attack")
+            return None
+        return state
+    
+    def save(self, **progress: Any) -> None:
+        """
+        Save progress atomically.
+        
+        Args:
+            **progress: Progress fields, e.g. length and offset
+        """
+        state = {'attack': self.attack, 'updated': time.time(), **self.context, **progress}
+        tmp_path = self.path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.error(f"Failed to save checkpoint: {str(e)}")
+    
+    def clear(self) -> None:
+        """Remove the checkpoint."""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,243 @@
+"""
+Precomputed lookup tables for unsalted hashes.
+
+A lookup table maps the digest of every word in a wordlist (and optionally
+its rule variants) back to the word. Records are fixed-size digest/index
+pairs sorted by digest, so a memory-mapped table is searched by bisection
+without hashing anything. The words themselves are kept in a string table
+next to the lookup table.
+
+Layout (little-endian)::
+
+    header   magic (8 bytes), algorithm (16 bytes), digest size, record count
+    records  digest + uint64 word index, sorted by digest
+"""
+import hashlib
+import logging
+import mmap
+import struct
+from pathlib import Path
+from typing import Optional, Iterable, Iterator, List
+
+from config import TABLES_DIR
+from extsort import ExternalSorter
+from stringtable import StringTable, temp_path, write_string_table
+from utils import SecurityError
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PWLKUP01'
+HEADER = struct.Struct('<8s16sIQ')
+INDEX = struct.Struct('<Q')
+SUFFIX = '.lut'
+WORDS_SUFFIX = '.words'
+
+def table_path(name: str, algorithm: str, directory: Path = TABLES_DIR) -> Path:
+    """
+    Get the path of a named lookup table.
+    
+    Args:
+        name: Table name, usually the wordlist name
+        algorithm: Hash algorithm
+        directory: Tables directory
+    
+    Returns:
+        Path: Lookup table path
+    """
+    return Path(directory) / f"{name}_{algorithm}{SUFFIX}"
+
+def build_lookup_table(path: Path, words: Iterable[str], algorithm: str) -> int:
+    """
+    Hash words once and write them to a lookup table.
+    
+    Args:
+        path: Destination lookup table path
+        words: Words to precompute
+        algorithm: Unsalted hash algorithm
+    
+    Returns:
+        int: Number of distinct digests stored
+    
+    Raises:
+        SecurityError: If the algorithm is salted or writing fails
+    """
+    if algorithm == 'bcrypt' or algorithm not in hashlib.algorithms_available:
+        raise SecurityError(f"Lookup tables need an unsalted algorithm: {algorithm}")
+    
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    copy = hashlib.new(algorithm).copy
+    pack = INDEX.pack
+    digest_size = hashlib.new(algorithm).digest_size
+    words_path = path.with_suffix(WORDS_SUFFIX)
+    tmp_path = temp_path(path)
+    words_tmp_path = temp_path(words_path)
+    count = 0
+    
+    try:
+        # Records are sorted on disk, so memory stays flat for any wordlist size
+        with ExternalSorter(directory=path.parent) as records:
+            def hashed(source: Iterable[str]) -> Iterator[str]:
+                """Record each word's digest while it is written out."""
+                for index, word in enumerate(source):
+                    h = copy()
+                    h.update(word.encode())
+                    records.add(h.digest() + pack(index))
+                    yield word
+            
+            write_string_table(words_tmp_path, hashed(words))
+            
+            with open(tmp_path, 'wb') as f:
+                f.write(b'\0' * HEADER.size)
+                previous = None
+                for record in records.sorted():
+                    digest = record[:digest_size]
+                    if digest != previous:
+                        f.write(record)
+                        count += 1
+                        previous = digest
+                
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, algorithm.encode(), digest_size, count))
+        
+        # Nothing is replaced until both files are complete, and the table
+        # goes last; lookups verify each word against its digest anyway
+        words_tmp_path.replace(words_path)
+        tmp_path.replace(path)
+    except OSError as e:
+        raise SecurityError(f"Failed to write lookup table: {str(e)}")
+    finally:
+        tmp_path.unlink(missing_ok=True)
+        words_tmp_path.unlink(missing_ok=True)
+    
+    logger.info(f"Precomputed {count} {algorithm} digests into {path}")
+    return count
+
+class LookupTable:
+    """Read-only, memory-mapped lookup table."""
+    
+    def __init__(self, path: Path):
+        """
+        Open a lookup table and its words.
+        
+        Args:
+            path: Lookup table path
+        
+        Raises:
+            SecurityError: If the table or its words are invalid
+        """
+        self.path = Path(path)
+        try:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SecurityError(f"Failed to open lookup table: {str(e)}")
+        
+        try:
+            magic, algorithm, digest_size, count = HEADER.unpack_from(self._mmap)
+        except struct.error:
+            self._mmap.close()
+            raise SecurityError("Invalid lookup table: truncated header")
+        
+        self._record_size = digest_size + INDEX.size
+        if magic != MAGIC or HEADER.size + count * self._record_size != len(self._mmap):
+            self._mmap.close()
+            raise SecurityError("Invalid lookup table")
+        
+        self.algorithm = algorithm.rstrip(b'\0').decode()
+        self.digest_size = digest_size
+        self._count = count
+        try:
+            self._hasher = hashlib.new(self.algorithm)
+        except ValueError:
+            self._mmap.close()
+            raise SecurityError(f"Invalid lookup table: unknown algorithm {self.algorithm}")
+        try:
+            self.words = StringTable(self.path.with_suffix(WORDS_SUFFIX))
+        except SecurityError:
+            self._mmap.close()
+            raise
+    
+    def __len__(self) -> int:
+        """Number of distinct digests."""
+        return self._count
+    
+    def lookup_digest(self, digest: bytes) -> Optional[str]:
+        """
+        Find the word for a raw digest.
+        
+        The word is hashed again before it is returned, so a words file
+        from another build (e.g. one replaced mid-rebuild) never yields a
+        wrong plaintext.
+        
+        Args:
+            digest: Raw digest bytes
+        
+        Returns:
+            Optional[str]: The word, or None if the digest is not in the table
+        """
+        if len(digest) != self.digest_size:
+            return None
+        
+        data = self._mmap
+        size = self._record_size
+        digest_size = self.digest_size
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            start = HEADER.size + mid * size
+            probe = data[start:start + digest_size]
+            if probe < digest:
+                low = mid + 1
+            elif probe > digest:
+                high = mid
+            else:
+                (index,) = INDEX.unpack_from(data, start + digest_size)
+                if index >= len(self.words):
+                    return None
+                word = self.words[index]
+                h = self._hasher.copy()
+                h.update(word.encode())
+                return word if h.digest() == digest else None
+        return None
+    
+    def lookup(self, target_hash: str) -> Optional[str]:
+        """
+        Find the word for a hex hash.
+        
+        Args:
+            target_hash: Hex-encoded hash
+        
+        Returns:
+            Optional[str]: The word, or None if not found or not hex
+        """
+        try:
+            return self.lookup_digest(bytes.fromhex(target_hash))
+        except ValueError:
+            return None
+    
+    def close(self) -> None:
+        """Release the memory maps."""
+        self.words.close()
+        self._mmap.close()
+
+def open_lookup_tables(algorithm: str, directory: Path = TABLES_DIR) -> List[LookupTable]:
+    """
+    Open every lookup table for an algorithm.
+    
+    Unreadable tables are logged and skipped.
+    
+    Args:
+        algorithm: Hash algorithm
+        directory: Tables directory
+    
+    Returns:
+        List[LookupTable]: Open tables, in name order
+    """
+    tables = []
+    for path in sorted(Path(directory).glob(f"*_{algorithm}{SUFFIX}")):
+        try:
+            tables.append(LookupTable(path))
+        except SecurityError as e:
+            logger.warning(f"Skipping lookup table {path.name}: {str(e)}")
+    return tables
@@ -0,0 +1,279 @@
+"""
+Markov-ordered candidate generation.
+
+A model counts, for each position, how often each character follows the
+previous one in a training set of real passwords. A Markov keyspace still
+numbers candidates as a mixed-radix integer, but digit k at a position
+selects the k-th likeliest character given the previous character, so low
+indexes hold the likeliest candidates. Candidates are generated directly
+from their index, so Markov keyspaces split into ranges and resume from
+checkpoints exactly like plain keyspaces.
+"""
+import hashlib
+import logging
+from collections import Counter
+from typing import Optional, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from keyspace import Keyspace
+from utils import SecurityError
+
+logger = logging.getLogger(__name__)
+
+class MarkovModel:
+    """Per-position character transition statistics."""
+    
+    def __init__(self, charset: str, max_length: int = 16):
+        """
+        Initialize an empty model.
+        
+        Args:
+            charset: Characters candidates are drawn from
+            max_length: Positions to keep statistics for
+        
+        Raises:
+            SecurityError: If the charset is empty
+        """
+        if not charset:
+            raise SecurityError("Markov charset must not be empty")
+        
+        self.charset = ''.join(dict.fromkeys(charset))
+        self.max_length = max_length
+        self.trained = 0
+        self._overall = Counter()
+        self._positions: List[Counter] = [Counter() for _ in range(max_length)]
+        # (position, previous character) -> next character counts
+        self._transitions: Dict[Tuple[int, str], Counter] = {}
+    
+    def train(self, words: Iterable[str]) -> 'MarkovModel':
+        """
+        Add passwords to the statistics.
+        
+        Characters outside the charset are not counted but still act as
+        the previous character for the next position.
+        
+        Args:
+            words: Training passwords
+        
+        Returns:
+            MarkovModel: The model, for chaining
+        """
+        allowed = set(self.charset)
+        positions = self._positions
+        transitions = self._transitions
+        
+        for word in words:
+            previous = ''
+            for position, char in enumerate(word[:self.max_length]):
+                if char in allowed:
+                    self._overall[char] += 1
+                    positions[position][char] += 1
+                    key = (position, previous)
+                    if key not in transitions:
+                        transitions[key] = Counter()
+                    transitions[key][char] += 1
+                previous = char
+            self.trained += 1
+        
+        return self
+    
+    def copy(self) -> 'MarkovModel':
+        """
+        Copy the model, so more training leaves this one unchanged.
+        
+        Returns:
+            MarkovModel: An independent model with the same statistics
+        """
+        model = MarkovModel(self.charset, self.max_length)
+        model.trained = self.trained
+        model._overall = self._overall.copy()
+        model._positions = [counts.copy() for counts in self._positions]
+        model._transitions = {key: counts.copy() for key, counts in self._transitions.items()}
+        return model
+    
+    def ordered(self, position: int, previous: str) -> str:
+        """
+        Rank the charset for a position, likeliest first.
+        
+        Characters are ranked by how often they follow the previous
+        character at this position, then by their frequency at this
+        position, then by their frequency anywhere, then by charset order.
+        
+        Args:
+            position: Position in the candidate
+            previous: Character at the previous position ('' at position 0)
+        
+        Returns:
+            str: The charset in rank order
+        """
+        transitions = self._transitions.get((position, previous), {})
+        frequency = self._positions[position] if position < self.max_length else {}
+        rank = {char: i for i, char in enumerate(self.charset)}
+        return ''.join(sorted(
+            self.charset,
+            key=lambda char: (
+                -transitions.get(char, 0),
+                -frequency.get(char, 0),
+                -self._overall[char],
+                rank[char]
+            )
+        ))
+    
+    def keyspace(self, length: int, threshold: Optional[int] = None) -> 'MarkovKeyspace':
+        """
+        Build a Markov-ordered keyspace.
+        
+        Args:
+            length: Candidate length
+            threshold: Keep only the likeliest characters per position;
+                the full charset by default
+        
+        Returns:
+            MarkovKeyspace: The keyspace
+        """
+        width = min(threshold or len(self.charset), len(self.charset))
+        orders = [{'': self.ordered(0, '')[:width]}]
+        for position in range(1, length):
+            orders.append({
+                previous: self.ordered(position, previous)[:width]
+                for previous in self.charset
+            })
+        return MarkovKeyspace(orders)
+
+class MarkovKeyspace(Keyspace):
+    """
+    Keyspace whose per-position order depends on the previous character.
+    
+    Every position has the same number of choices, so the mapping between
+    indexes and candidates stays a bijection and the Keyspace interface
+    (candidate, index, iter_range, describe) is unchanged.
+    """
+    
+    def __init__(self, orders: Sequence[Dict[str, str]]):
+        """
+        Initialize the keyspace.
+        
+        Args:
+            orders: For each position, previous character -> ranked
+                characters ('' is the key at position 0)
+        
+        Raises:
+            SecurityError: If there are no positions or ranks differ in width
+        """
+        if not orders or not orders[0].get(''):
+            raise SecurityError("Markov keyspace needs at least one position")
+        
+        self.orders = tuple(orders)
+        self.radix = len(orders[0][''])
+        if any(len(ranked) != self.radix for order in self.orders for ranked in order.values()):
+            raise SecurityError("Markov keyspace positions must have equal width")
+        
+        self.charsets = tuple(''.join(sorted(set(''.join(order.values())))) for order in self.orders)
+        self.length = len(self.orders)
+        self.size = self.radix ** self.length
+    
+    def _decode(self, index: int, length: int) -> str:
+        """Build the first length characters of the candidate numbered index."""
+        digits = []
+        for _ in range(length):
+            index, digit = divmod(index, self.radix)
+            digits.append(digit)
+        
+        chars = []
+        previous = ''
+        for order, digit in zip(self.orders, reversed(digits)):
+            previous = order[previous][digit]
+            chars.append(previous)
+        return ''.join(chars)
+    
+    def prefix(self, length: int) -> 'MarkovKeyspace':
+        """
+        Build the keyspace of the first length positions.
+        
+        Args:
+            length: Candidate length, at most this keyspace's length
+        
+        Returns:
+            MarkovKeyspace: Keyspace ranking each position like this one
+        """
+        return MarkovKeyspace(self.orders[:length])
+    
+    def candidate(self, index: int) -> str:
+        """
+        Generate the candidate at an index.
+        
+        Args:
+            index: Index into the keyspace
+        
+        Returns:
+            str: Candidate password
+        
+        Raises:
+            SecurityError: If the index is out of range
+        """
+        if not 0 <= index < self.size:
+            raise SecurityError(f"Keyspace index out of range: {index}")
+        return self._decode(index, self.length)
+    
+    def index(self, candidate: str) -> int:
+        """
+        Compute the index of a candidate.
+        
+        Args:
+            candidate: Candidate password
+        
+        Returns:
+            int: Index into the keyspace
+        
+        Raises:
+            SecurityError: If the candidate is not in the keyspace
+        """
+        if len(candidate) != self.length:
+            raise SecurityError("Candidate length does not match keyspace")
+        
+        index = 0
+        previous = ''
+        for order, char in zip(self.orders, candidate):
+            digit = order.get(previous, '').find(char)
+            if digit < 0:
+                raise SecurityError("Candidate is not in keyspace")
+            index = index * self.radix + digit
+            previous = char
+        return index
+    
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """
+        Generate candidates [start, stop) in index order.
+        
+        The prefix is decoded once per block of radix candidates and the
+        last position is read straight from its ranked characters.
+        
+        Args:
+            start: First index
+            stop: Index after the last candidate
+        
+        Returns:
+            Iterator[str]: Candidate passwords
+        """
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        
+        radix = self.radix
+        last = self.orders[-1]
+        for prefix_index in range(start // radix, (stop - 1) // radix + 1):
+            first = prefix_index * radix
+            prefix = self._decode(prefix_index, self.length - 1)
+            ranked = last[prefix[-1] if prefix else '']
+            for char in ranked[max(start - first, 0):min(stop - first, radix)]:
+                yield prefix + char
+    
+    def describe(self) -> str:
+        """
+        Describe the keyspace for checkpoint matching.
+        
+        Returns:
+            str: Stable description of the per-position orderings
+        """
+        parts = ['\0'.join(f"{key}:{order[key]}" for key in sorted(order)) for order in self.orders]
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:16]
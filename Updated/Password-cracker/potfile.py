@@ -0,0 +1,158 @@
+"""
+Persistent store of cracked hashes.
+
+The potfile is a SQLite database keyed by algorithm and hash, so already
+cracked hashes are found with an indexed lookup instead of being attacked
+again. WAL mode and a busy timeout let several cracker processes read and
+write the same potfile concurrently.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Iterable, List
+
+from utils import SecurityError
+
+logger = logging.getLogger(__name__)
+
+# Hashes per query in get_many, below SQLite's bound-parameter limit
+QUERY_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cracked (
+    algorithm TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    password TEXT NOT NULL,
+    cracked_at REAL NOT NULL,
+    PRIMARY KEY (algorithm, hash)
+) WITHOUT ROWID
+"""
+
+def normalize_hash(target_hash: str, algorithm: str) -> str:
+    """
+    Normalize a hash for storage and lookup.
+    
+    Hex digests are case-insensitive; bcrypt hashes are kept as is.
+    
+    Args:
+        target_hash: Hash to normalize
+        algorithm: Hash algorithm
+    
+    Returns:
+        str: Normalized hash
+    """
+    return target_hash if algorithm == 'bcrypt' else target_hash.lower()
+
+class Potfile:
+    """Thread- and process-safe store of cracked hashes."""
+    
+    def __init__(self, path: Path, timeout: float = 30.0):
+        """
+        Open or create a potfile.
+        
+        Args:
+            path: Database path
+            timeout: Seconds to wait for another writer's lock
+        
+        Raises:
+            SecurityError: If the database cannot be opened
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(SCHEMA)
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            raise SecurityError(f"Failed to open potfile: {str(e)}")
+    
+    def get(self, algorithm: str, target_hash: str) -> Optional[str]:
+        """
+        Look up a cracked hash.
+        
+        Args:
+            algorithm: Hash algorithm
+            target_hash: Hash to look up
+        
+        Returns:
+            Optional[str]: Password if the hash was cracked before
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT password FROM cracked WHERE algorithm = ? AND hash = ?',
+                (algorithm, normalize_hash(target_hash, algorithm))
+            ).fetchone()
+        return row[0] if row else None
+    
+    def get_many(self, algorithm: str, hashes: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up many hashes at once.
+        
+        Args:
+            algorithm: Hash algorithm
+            hashes: Hashes to look up
+        
+        Returns:
+            Dict[str, str]: Original hash -> password, for known hashes only
+        """
+        wanted: Dict[str, List[str]] = {}
+        for target_hash in hashes:
+            wanted.setdefault(normalize_hash(target_hash, algorithm), []).append(target_hash)
+        
+        keys = list(wanted)
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), QUERY_CHUNK):
+                chunk = keys[i:i + QUERY_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT hash, password FROM cracked WHERE algorithm = ? "
+                    f"AND hash IN ({', '.join('?' * len(chunk))})",
+                    (algorithm, *chunk)
+                )
+                for key, password in rows:
+                    for target_hash in wanted[key]:
+                        found[target_hash] = password
+        return found
+    
+    def add(self, algorithm: str, target_hash: str, password: str) -> None:
+        """
+        Record a cracked hash immediately.
+        
+        Args:
+            algorithm: Hash algorithm
+            target_hash: Cracked hash
+            password: Its password
+        """
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO cracked VALUES (?, ?, ?, ?)',
+                    (algorithm, normalize_hash(target_hash, algorithm), password, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to record cracked hash: {str(e)}")
+    
+    def passwords(self) -> List[str]:
+        """
+        Get every cracked password, for training candidate generators.
+        
+        Returns:
+            List[str]: Cracked passwords of all algorithms
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT password FROM cracked')]
+    
+    def __len__(self) -> int:
+        """Number of cracked hashes."""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM cracked').fetchone()[0]
+    
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
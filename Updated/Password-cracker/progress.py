@@ -0,0 +1,193 @@
+"""
+Live progress reporting for cracker runs.
+
+A reporter samples a cracker's attempt counter and current phase from a
+background thread at a fixed interval and publishes snapshots with the
+throughput, keyspace percentage and ETA. Nothing is added to the
+candidate-checking path: the crackers only bump their sharded attempt
+counter and record the phase and its size when a phase starts.
+"""
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Any, Callable, Dict, Iterator, TextIO
+
+from config import MAX_ATTEMPTS
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest interval in the smoothed rate
+RATE_SMOOTHING = 0.5
+
+Snapshot = Dict[str, Any]
+
+class ProgressReporter:
+    """Publishes periodic progress snapshots of a running cracker."""
+    
+    def __init__(self, cracker, callback: Callable[[Snapshot], None], interval: float = 1.0):
+        """
+        Initialize the reporter.
+        
+        Args:
+            cracker: BaseCracker to observe
+            callback: Receives every snapshot, on the reporter thread
+            interval: Seconds between snapshots
+        """
+        self.cracker = cracker
+        self.callback = callback
+        self.interval = interval
+        self.rate = 0.0
+        self._started = 0.0
+        self._last_time = 0.0
+        self._last_attempts = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def snapshot(self) -> Snapshot:
+        """
+        Sample the cracker and update the smoothed rate.
+        
+        Returns:
+            Snapshot: Phase, attempts, rate (candidates/s), percent of the
+            phase keyspace and ETA in seconds; percent and ETA are None
+            when the phase size is unknown
+        """
+        now = time.monotonic()
+        attempts = self.cracker.attempts
+        elapsed = now - self._last_time
+        if elapsed > 0 and attempts >= self._last_attempts:
+            current = (attempts - self._last_attempts) / elapsed
+            self.rate = current if not self.rate else (
+                RATE_SMOOTHING * current + (1 - RATE_SMOOTHING) * self.rate
+            )
+        self._last_time = now
+        self._last_attempts = attempts
+        
+        phase, total, done = self.cracker.phase_progress()
+        percent = eta = None
+        if total:
+            percent = round(min(done / total, 1.0) * 100, 2)
+            remaining = min(total - done, MAX_ATTEMPTS - attempts)
+            eta = round(max(remaining, 0) / self.rate, 1) if self.rate > 0 else None
+        
+        return {
+            'phase': phase,
+            'attempts': attempts,
+            'rate': round(self.rate, 1),
+            'percent': percent,
+            'eta': eta,
+            'elapsed': round(now - self._started, 3),
+            'found': bool(self.cracker.found_passwords)
+        }
+    
+    def _publish(self) -> None:
+        """Send one snapshot to the callback, logging callback failures."""
+        try:
+            self.callback(self.snapshot())
+        except Exception as e:
+            logger.error(f"Progress callback failed: {str(e)}")
+    
+    def _run(self) -> None:
+        """Publish snapshots until stopped."""
+        while not self._stop.wait(self.interval):
+            self._publish()
+    
+    def start(self) -> 'ProgressReporter':
+        """
+        Start publishing in a background thread.
+        
+        Returns:
+            ProgressReporter: The reporter, for chaining
+        """
+        self._started = self._last_time = time.monotonic()
+        self._last_attempts = self.cracker.attempts
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='progress', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop publishing and send a final snapshot."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._publish()
+    
+    def __enter__(self) -> 'ProgressReporter':
+        """Start publishing for the duration of a with block."""
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        """Stop publishing when the with block ends."""
+        self.stop()
+
+def format_progress(snapshot: Snapshot) -> str:
+    """
+    Format a snapshot as a one-line status.
+    
+    Args:
+        snapshot: Snapshot from ProgressReporter
+    
+    Returns:
+        str: Human-readable progress line
+    """
+    parts = [
+        snapshot['phase'] or 'starting',
+        f"{snapshot['attempts']:,} tried",
+        f"{snapshot['rate']:,.0f}/s"
+    ]
+    if snapshot['percent'] is not None:
+        parts.append(f"{snapshot['percent']:.2f}%")
+    if snapshot['eta'] is not None:
+        parts.append(f"ETA {time.strftime('%H:%M:%S', time.gmtime(snapshot['eta']))}")
+    return ' | '.join(parts)
+
+def terminal_progress(stream: TextIO = sys.stderr) -> Callable[[Snapshot], None]:
+    """
+    Build a callback that redraws one live progress line.
+    
+    Args:
+        stream: Terminal stream to draw on
+    
+    Returns:
+        Callable[[Snapshot], None]: Progress callback
+    """
+    width = [0]
+    
+    def draw(snapshot: Snapshot) -> None:
+        """Overwrite the previous line with the new snapshot."""
+        line = f"[*] {format_progress(snapshot)}"
+        stream.write('\r' + line.ljust(width[0]))
+        stream.flush()
+        width[0] = len(line)
+    
+    return draw
+
+@contextmanager
+def live_progress(cracker, interval: float = 1.0, stream: TextIO = sys.stderr) -> Iterator[Optional[ProgressReporter]]:
+    """
+    Show a live progress line while a block runs, on terminals only.
+    
+    Args:
+        cracker: BaseCracker to observe
+        interval: Seconds between redraws
+        stream: Terminal stream to draw on
+    
+    Returns:
+        Iterator[Optional[ProgressReporter]]: The reporter, or None when
+        the stream is not a terminal
+    """
+    if not stream.isatty():
+        yield None
+        return
+    
+    try:
+        with ProgressReporter(cracker, terminal_progress(stream), interval) as reporter:
+            yield reporter
+    finally:
+        stream.write('\n')
+        stream.flush()
@@ -0,0 +1,279 @@
+"""
+Rule engine for wordlist mangling.
+
+Rules use a subset of the hashcat rule syntax. Each line of a rule file
+is one rule made of functions applied left to right, for example
+``l sa@ $1`` lowercases a word, replaces every 'a' with '@' and appends
+'1'. Blank lines and lines starting with '#' are ignored.
+"""
+import logging
+from collections import Counter, deque
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List, Tuple
+
+from config import CHECK_BATCH_SIZE
+from utils import SecurityError
+
+logger = logging.getLogger(__name__)
+
+Operation = Tuple[str, Callable[[str], str]]
+
+def _position(char: str) -> int:
+    """Decode a hashcat position argument (0-9, A-Z)."""
+    try:
+        return int(char, 36)
+    except ValueError:
+        raise SecurityError(f"Invalid rule position: {char}")
+
+def _toggle_at(n: int) -> Callable[[str], str]:
+    """Toggle the case of the character at position n."""
+    return lambda w: w[:n] + w[n].swapcase() + w[n + 1:] if n < len(w) else w
+
+def _delete_at(n: int) -> Callable[[str], str]:
+    """Delete the character at position n."""
+    return lambda w: w[:n] + w[n + 1:]
+
+def _truncate_at(n: int) -> Callable[[str], str]:
+    """Truncate the word to n characters."""
+    return lambda w: w[:n]
+
+def _append(char: str) -> Callable[[str], str]:
+    """Append a character."""
+    return lambda w: w + char
+
+def _prepend(char: str) -> Callable[[str], str]:
+    """Prepend a character."""
+    return lambda w: char + w
+
+def _replace(old: str, new: str) -> Callable[[str], str]:
+    """Replace every occurrence of a character."""
+    return lambda w: w.replace(old, new)
+
+def _purge(char: str) -> Callable[[str], str]:
+    """Remove every occurrence of a character."""
+    return lambda w: w.replace(char, '')
+
+# Functions without arguments
+SIMPLE_FUNCTIONS: Dict[str, Callable[[str], str]] = {
+    ':': lambda w: w,
+    'l': str.lower,
+    'u': str.upper,
+    'c': str.capitalize,
+    'C': lambda w: w[:1].lower() + w[1:].upper(),
+    't': str.swapcase,
+    'r': lambda w: w[::-1],
+    'd': lambda w: w + w,
+    'f': lambda w: w + w[::-1],
+    '{': lambda w: w[1:] + w[:1],
+    '}': lambda w: w[-1:] + w[:-1],
+    '[': lambda w: w[1:],
+    ']': lambda w: w[:-1],
+}
+
+# Functions taking character arguments: name -> (argument count, factory)
+ARGUMENT_FUNCTIONS: Dict[str, Tuple[int, Callable[..., Callable[[str], str]]]] = {
+    '$': (1, _append),
+    '^': (1, _prepend),
+    's': (2, _replace),
+    '@': (1, _purge),
+    'T': (1, lambda n: _toggle_at(_position(n))),
+    'D': (1, lambda n: _delete_at(_position(n))),
+    "'": (1, lambda n: _truncate_at(_position(n))),
+}
+
+def compile_rule(rule: str) -> Tuple[Operation, ...]:
+    """
+    Compile a rule into its sequence of operations.
+    
+    Args:
+        rule: Rule text
+    
+    Returns:
+        Tuple[Operation, ...]: (source token, function) pairs
+    
+    Raises:
+        SecurityError: If the rule is empty or invalid
+    """
+    operations = []
+    i = 0
+    while i < len(rule):
+        name = rule[i]
+        if name in ' \t':
+            i += 1
+            continue
+        
+        if name in SIMPLE_FUNCTIONS:
+            operations.append((name, SIMPLE_FUNCTIONS[name]))
+            i += 1
+        elif name in ARGUMENT_FUNCTIONS:
+            arg_count, factory = ARGUMENT_FUNCTIONS[name]
+            args = rule[i + 1:i + 1 + arg_count]
+            if len(args) != arg_count:
+                raise SecurityError(f"Missing argument in rule: {rule}")
+            operations.append((rule[i:i + 1 + arg_count], factory(*args)))
+            i += 1 + arg_count
+        else:
+            raise SecurityError(f"Unknown rule function '{name}' in rule: {rule}")
+    
+    if not operations:
+        raise SecurityError("Empty rule")
+    return tuple(operations)
+
+class RuleEngine:
+    """
+    Compiled set of mangling rules applied as a streaming generator.
+    
+    Rules are stored in a prefix tree keyed by operation, so rules that
+    share leading functions (e.g. every ``l sX?`` substitution) compute
+    the shared prefix once per word. Duplicate variants of a word are
+    dropped before they are yielded.
+    """
+    
+    def __init__(self, rules: Iterable[str]):
+        """
+        Initialize the rule engine.
+        
+        Invalid rules are logged and skipped.
+        
+        Args:
+            rules: Rule lines
+        """
+        self.rules: List[str] = []
+        self._compiled: List[Tuple[Operation, ...]] = []
+        # Node: token -> [function, child node, rule index or None]
+        self._tree: Dict[str, List[Any]] = {}
+        
+        for line in rules:
+            rule = line.strip()
+            if not rule or rule.startswith('#'):
+                continue
+            try:
+                operations = compile_rule(rule)
+            except SecurityError as e:
+                logger.warning(f"Skipping rule: {str(e)}")
+                continue
+            self._add(rule, operations)
+        
+        self.generated = 0
+        self.duplicates = 0
+        self.hits: Counter = Counter()
+        # Recently streamed words, used to attribute hits to rules
+        self._recent_words: deque = deque(maxlen=CHECK_BATCH_SIZE)
+    
+    @classmethod
+    def from_file(cls, rules_path: Path) -> 'RuleEngine':
+        """
+        Load rules from a rule file.
+        
+        Args:
+            rules_path: Path to rule file
+        
+        Returns:
+            RuleEngine: Compiled rule engine
+        
+        Raises:
+            SecurityError: If the file cannot be read
+        """
+        try:
+            with open(rules_path, 'r', encoding='utf-8') as f:
+                return cls(f)
+        except OSError as e:
+            raise SecurityError(f"Failed to load rules: {str(e)}")
+    
+    def _add(self, rule: str, operations: Tuple[Operation, ...]) -> None:
+        """Add a compiled rule to the prefix tree."""
+        index = len(self.rules)
+        self.rules.append(rule)
+        self._compiled.append(operations)
+        
+        node = self._tree
+        for depth, (token, func) in enumerate(operations):
+            entry = node.setdefault(token, [func, {}, None])
+            if depth == len(operations) - 1 and entry[2] is None:
+                entry[2] = index
+            node = entry[1]
+    
+    def __len__(self) -> int:
+        """Number of compiled rules."""
+        return len(self.rules)
+    
+    def apply(self, word: str) -> Iterator[str]:
+        """
+        Generate the unique variants of a word.
+        
+        Args:
+            word: Base word
+        
+        Returns:
+            Iterator[str]: Variants produced by the rules
+        """
+        seen = set()
+        stack = [(self._tree, word)]
+        
+        while stack:
+            node, value = stack.pop()
+            children = []
+            for func, child, rule_index in node.values():
+                result = func(value)
+                if rule_index is not None:
+                    # Counted as produced, so stats stay exact when a match stops iteration
+                    if result in seen:
+                        self.duplicates += 1
+                    else:
+                        seen.add(result)
+                        self.generated += 1
+                        yield result
+                if child:
+                    children.append((child, result))
+            # Visit subtrees in rule-file order
+            stack.extend(reversed(children))
+    
+    def stream(self, words: Iterable[str]) -> Iterator[str]:
+        """
+        Apply every rule to every word.
+        
+        Args:
+            words: Base words
+        
+        Returns:
+            Iterator[str]: Variants of each word in turn
+        """
+        recent = self._recent_words
+        for word in words:
+            recent.append(word)
+            yield from self.apply(word)
+    
+    def record_hit(self, candidate: str) -> Optional[str]:
+        """
+        Attribute a cracked candidate to the rule that produced it.
+        
+        Args:
+            candidate: Cracked password produced by stream()
+        
+        Returns:
+            Optional[str]: The matching rule, if found among recent words
+        """
+        for word in reversed(self._recent_words):
+            for rule, operations in zip(self.rules, self._compiled):
+                value = word
+                for _, func in operations:
+                    value = func(value)
+                if value == candidate:
+                    self.hits[rule] += 1
+                    return rule
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get rule statistics.
+        
+        Returns:
+            Dict[str, Any]: Rule count, variants generated, duplicates
+            dropped and hits per rule
+        """
+        return {
+            'rules': len(self.rules),
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'hits': dict(self.hits.most_common())
+        }
@@ -0,0 +1,293 @@
+"""
+Compact on-disk string tables.
+
+A string table stores strings back to back in one blob followed by an
+index of uint64 offsets, so any entry can be sliced out of a memory map
+without parsing the file. Tables written in sorted order also support
+binary-search membership tests.
+
+Layout (little-endian)::
+
+    header  magic (8 bytes), flags, count, index offset (uint64 each)
+    data    concatenated UTF-8 entries
+    index   count + 1 uint64 offsets into the file
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+import uuid
+from array import array
+from pathlib import Path
+from typing import Optional, Callable, Dict, Iterable, Iterator, Mapping
+
+from utils import SecurityError
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PWSTBL01'
+HEADER = struct.Struct('<8sQQQ')
+FLAG_SORTED = 1
+
+def temp_path(path: Path) -> Path:
+    """
+    Get a unique temporary path next to a file being written atomically.
+    
+    The name is unique per call, so threads of one process building the
+    same file never share a temporary file.
+    
+    Args:
+        path: Destination path
+    
+    Returns:
+        Path: Hidden temporary path in the same directory
+    """
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+
+def write_string_table(path: Path, strings: Iterable[str], sorted_: bool = False) -> int:
+    """
+    Write strings to a table file atomically.
+    
+    Entries are streamed to disk; only the offset index is kept in memory.
+    
+    Args:
+        path: Destination path
+        strings: Entries to store, in order
+        sorted_: Entries are sorted and unique, enabling binary search
+    
+    Returns:
+        int: Number of entries written
+    
+    Raises:
+        SecurityError: If writing fails
+    """
+    path = Path(path)
+    tmp_path = temp_path(path)
+    offsets = array('Q', [HEADER.size])
+    
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(b'\0' * HEADER.size)
+            position = HEADER.size
+            for entry in strings:
+                data = entry.encode()
+                f.write(data)
+                position += len(data)
+                offsets.append(position)
+            
+            # Align the index so it can be cast in place
+            padding = -position % 8
+            f.write(b'\0' * padding)
+            index_offset = position + padding
+            
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            offsets.tofile(f)
+            
+            f.seek(0)
+            f.write(HEADER.pack(
+                MAGIC,
+                FLAG_SORTED if sorted_ else 0,
+                len(offsets) - 1,
+                index_offset
+            ))
+        
+        tmp_path.replace(path)
+        return len(offsets) - 1
+    
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        raise SecurityError(f"Failed to write string table: {str(e)}")
+
+class StringTable:
+    """Read-only, memory-mapped view of a string table file."""
+    
+    def __init__(self, path: Path):
+        """
+        Open a string table.
+        
+        Args:
+            path: Table file path
+        
+        Raises:
+            SecurityError: If the file is not a valid string table
+        """
+        self.path = Path(path)
+        try:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SecurityError(f"Failed to open string table: {str(e)}")
+        
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise SecurityError("Invalid string table: truncated header")
+        
+        magic, flags, count, index_offset = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or index_offset + 8 * (count + 1) > len(self._mmap):
+            self._mmap.close()
+            raise SecurityError("Invalid string table")
+        
+        self.sorted = bool(flags & FLAG_SORTED)
+        self._count = count
+        self._view = memoryview(self._mmap)
+        index = self._view[index_offset:index_offset + 8 * (count + 1)]
+        if sys.byteorder == 'little':
+            self._offsets = index.cast('Q')
+        else:
+            self._offsets = array('Q', index)
+            self._offsets.byteswap()
+    
+    def __len__(self) -> int:
+        """Number of entries."""
+        return self._count
+    
+    def entry(self, index: int) -> memoryview:
+        """
+        Get an entry without copying it out of the memory map.
+        
+        Args:
+            index: Entry index
+        
+        Returns:
+            memoryview: Raw UTF-8 bytes of the entry
+        """
+        if not 0 <= index < self._count:
+            raise IndexError("string table index out of range")
+        return self._view[self._offsets[index]:self._offsets[index + 1]]
+    
+    def __getitem__(self, index: int) -> str:
+        """Get an entry as a string."""
+        if index < 0:
+            index += self._count
+        return bytes(self.entry(index)).decode()
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over entries in table order."""
+        return self.iter_range(0, self._count)
+    
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """
+        Iterate over entries [start, stop) in table order.
+        
+        Args:
+            start: First entry index
+            stop: Index after the last entry
+        
+        Returns:
+            Iterator[str]: Entries as strings
+        """
+        data = self._mmap
+        offsets = self._offsets
+        for i in range(max(start, 0), min(stop, self._count)):
+            yield data[offsets[i]:offsets[i + 1]].decode()
+    
+    def __contains__(self, value: object) -> bool:
+        """
+        Check membership.
+        
+        Sorted tables use binary search; unsorted tables fall back to a
+        linear scan.
+        """
+        if not isinstance(value, str):
+            return False
+        key = value.encode()
+        
+        if not self.sorted:
+            return any(bytes(self.entry(i)) == key for i in range(self._count))
+        
+        data = self._mmap
+        offsets = self._offsets
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            probe = data[offsets[mid]:offsets[mid + 1]]
+            if probe < key:
+                low = mid + 1
+            elif probe > key:
+                high = mid
+            else:
+                return True
+        return False
+    
+    def close(self) -> None:
+        """Release the memory map."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+class CachedTables(Mapping):
+    """
+    Named sorted string tables built lazily and cached on disk.
+    
+    Each table is built on first access by its builder, written to the
+    cache directory and memory-mapped. Later runs map the cached file
+    directly. A table derived from a source file is rebuilt when the
+    source is newer than the cache.
+    """
+    
+    def __init__(
+        self,
+        builders: Dict[str, Callable[[], Iterable[str]]],
+        cache_dir: Path,
+        sources: Optional[Dict[str, Path]] = None,
+        version: int = 1
+    ):
+        """
+        Initialize the table set.
+        
+        Args:
+            builders: Table name -> function producing its entries
+            cache_dir: Directory for cached tables
+            sources: Table name -> source file the table depends on
+            version: Bump to invalidate caches when builders change
+        """
+        self._builders = builders
+        self._cache_dir = Path(cache_dir)
+        self._sources = sources or {}
+        self._version = version
+        self._tables: Dict[str, StringTable] = {}
+    
+    def __getitem__(self, name: str) -> StringTable:
+        """Get a table, building or loading it on first access."""
+        if name not in self._tables:
+            if name not in self._builders:
+                raise KeyError(name)
+            self._tables[name] = self._load(name)
+        return self._tables[name]
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over table names."""
+        return iter(self._builders)
+    
+    def __len__(self) -> int:
+        """Number of tables."""
+        return len(self._builders)
+    
+    def _load(self, name: str) -> StringTable:
+        """Map a cached table, rebuilding it if missing or stale."""
+        path = self._cache_dir / f"{name}_v{self._version}.tbl"
+        source = self._sources.get(name)
+        
+        if path.exists() and not (
+            source is not None and source.exists()
+            and source.stat().st_mtime > path.stat().st_mtime
+        ):
+            try:
+                return StringTable(path)
+            except SecurityError as e:
+                logger.warning(f"Rebuilding corrupt table {name}: {str(e)}")
+        
+        logger.info(f"Building {name} table")
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        write_string_table(path, sorted(set(self._builders[name]())), sorted_=True)
+        return StringTable(path)
+    
+    def close(self) -> None:
+        """Release the memory maps of every loaded table."""
+        for table in self._tables.values():
+            table.close()
+        self._tables.clear()
@@ -0,0 +1,12 @@
+"""
+Shared fixtures for the test suite.
+"""
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture(autouse=True)
+def isolated_potfile(tmp_path):
+    """Keep cracked hashes out of the project's potfile"""
+    with patch('base_cracker.POTFILE', tmp_path / 'potfile.db'):
+        yield tmp_path / 'potfile.db'
@@ -0,0 +1,291 @@
+"""
+Unit tests for advanced_cracker.py
+"""
+import pytest
+import hashlib
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from advanced_cracker import AdvancedCracker, main
+from keyspace import Checkpoint
+from markov import MarkovModel
+from utils import SecurityError
+
+
+class TestAdvancedCracker:
+    """Test suite for AdvancedCracker class"""
+    
+    @pytest.fixture(autouse=True)
+    def no_rate_limit(self):
+        """Check candidates at full speed"""
+        with patch('base_cracker.RATE_LIMIT', 0):
+            yield
+    
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path):
+        """Keep pattern table caches out of the project directory"""
+        with patch('advanced_cracker.CACHE_DIR', tmp_path / 'cache'):
+            yield tmp_path / 'cache'
+    
+    @pytest.fixture(autouse=True)
+    def markov_cache(self):
+        """Start every test without cached Markov models"""
+        with patch.dict('advanced_cracker._markov_cache', clear=True):
+            yield
+    
+    @pytest.fixture
+    def cracker(self):
+        """Create an AdvancedCracker instance"""
+        cracker = AdvancedCracker('md5')
+        cracker.start_time = time.time()
+        return cracker
+    
+    def test_pattern_tables_lazy(self, cracker, cache_dir):
+        """Test pattern tables are only built when first used"""
+        assert not cache_dir.exists()
+        
+        analysis = cracker.analyze_password('19991231')
+        
+        assert analysis['is_date_pattern'] is True
+        assert (cache_dir / 'dates_v1.tbl').exists()
+        assert cracker.analyze_password('qwe')['is_keyboard_pattern'] is True
+    
+    def test_cleanup_closes_pattern_tables(self, cracker):
+        """Test cleanup releases the pattern table memory maps"""
+        dates = cracker.known_patterns['dates']
+        
+        cracker.cleanup()
+        
+        with pytest.raises(ValueError):
+            dates[0]
+    
+    def test_try_patterns(self, cracker):
+        """Test pattern attack checks cached date patterns"""
+        result = cracker._try_patterns(hashlib.md5(b'20240229').hexdigest())
+        
+        assert result == '20240229'
+    
+    def test_try_wordlist_variation(self, cracker):
+        """Test wordlist attack finds common variations"""
+        target = hashlib.md5(b'sunshine123').hexdigest()
+        
+        result = cracker._try_wordlist(target, iter(['password', 'sunshine']))
+        
+        assert result == 'sunshine123'
+    
+    def test_try_wordlist_custom_rules(self, tmp_path):
+        """Test wordlist attack uses the configured rule file"""
+        rules_file = tmp_path / 'custom.rule'
+        rules_file.write_text("r\n^!\n")
+        cracker = AdvancedCracker('md5', rules_path=rules_file)
+        cracker.start_time = time.time()
+        
+        result = cracker._try_wordlist(hashlib.md5(b'!sunshine').hexdigest(), iter(['sunshine']))
+        
+        assert result == '!sunshine'
+        assert cracker.rule_engine.stats()['hits'] == {'^!': 1}
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 100)
+    def test_brute_force_length_process_pool(self, cracker):
+        """Test brute force finds a password across worker processes"""
+        target = hashlib.md5(b'dcba').hexdigest()
+        
+        result = cracker._brute_force_length(target, 4, 'abcd')
+        
+        assert result == 'dcba'
+        assert 0 < cracker.attempts <= 4 ** 4
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 100)
+    @patch('advanced_cracker.MAX_ATTEMPTS', 50)
+    def test_brute_force_length_attempt_budget(self, cracker):
+        """Test brute force never checks more than the attempt budget"""
+        target = hashlib.md5(b'dddd').hexdigest()
+        
+        result = cracker._brute_force_length(target, 4, 'abcd')
+        
+        assert result is None
+        assert cracker.attempts == 50
+    
+    def test_brute_force_length_stop_flag(self, cracker):
+        """Test brute force returns early when stopped"""
+        cracker.stop_flag.set()
+        
+        result = cracker._brute_force_length(hashlib.md5(b'dddd').hexdigest(), 4, 'abcd')
+        
+        assert result is None
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 10)
+    def test_brute_force_length_resume(self, cracker, tmp_path):
+        """Test an interrupted brute force resumes from its checkpoint"""
+        target = hashlib.md5(b'dcba').hexdigest()
+        checkpoint = Checkpoint(target, 'md5', 'test', directory=tmp_path)
+        
+        with patch('advanced_cracker.MAX_ATTEMPTS', 100):
+            assert cracker._brute_force_length(target, 4, 'abcd', checkpoint=checkpoint) is None
+        assert checkpoint.load()['offset'] == 100
+        
+        resumed = AdvancedCracker('md5')
+        resumed.start_time = time.time()
+        progress = checkpoint.load()
+        result = resumed._brute_force_length(
+            target, 4, 'abcd', start=progress['offset'], checkpoint=checkpoint
+        )
+        
+        assert result == 'dcba'
+        assert resumed.attempts <= 4 ** 4 - 100
+        assert checkpoint.load() is None
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 16)
+    def test_try_brute_force_markov_order(self, cracker):
+        """Test Markov ordering reaches likely passwords before lexicographic order"""
+        target = hashlib.md5(b'dcba').hexdigest()
+        model = MarkovModel('abcd').train(['dcba1234', 'dcbadcba'])
+        
+        result = cracker._try_brute_force(target, 'abcd', markov=model.keyspace(8))
+        
+        assert result == 'dcba'
+        assert cracker.attempts <= 2 * 16
+    
+    def test_train_markov(self, cracker, tmp_path):
+        """Test the Markov model learns from the wordlist and the potfile"""
+        wordlist = tmp_path / 'words.txt'
+        wordlist.write_text('zebra123\nzigzag99\n')
+        cracker.potfile.add('md5', hashlib.md5(b'zz').hexdigest(), 'zz')
+        
+        model = cracker.train_markov(wordlist, 'abz')
+        
+        assert model.trained == 3
+        assert model.ordered(0, '')[0] == 'z'
+    
+    def test_train_markov_caches_wordlist(self, cracker, tmp_path):
+        """Test the wordlist is read once while potfile changes still count"""
+        wordlist = tmp_path / 'words.txt'
+        wordlist.write_text('zebra123\nzigzag99\n')
+        cracker.train_markov(wordlist, 'abz')
+        cracker.potfile.add('md5', hashlib.md5(b'aa').hexdigest(), 'aa')
+        
+        with patch.object(cracker, 'load_wordlist') as load_wordlist:
+            model = cracker.train_markov(wordlist, 'abz')
+        
+        load_wordlist.assert_not_called()
+        assert model.trained == 3
+    
+    def test_crack_hash_wordlist(self, cracker, tmp_path):
+        """Test a wordlist hit returns without training a Markov model"""
+        wordlist = tmp_path / 'words.txt'
+        wordlist.write_text('password\nsunshine\n')
+        target = hashlib.md5(b'sunshine123').hexdigest()
+        
+        with patch('keyspace.RESULTS_DIR', tmp_path):
+            with patch.object(cracker, 'train_markov') as train_markov:
+                result = cracker.crack_hash(target, wordlist)
+        
+        assert result == 'sunshine123'
+        train_markov.assert_not_called()
+        assert cracker.potfile.get('md5', target) == 'sunshine123'
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 10)
+    def test_crack_hash_resume_after_potfile_change(self, cracker, tmp_path):
+        """Test a resumed attack keeps its Markov order when the potfile grows"""
+        wordlist = tmp_path / 'words.txt'
+        wordlist.write_text('zzzz9999\nzzzzzzzz\n')
+        charset = cracker.character_sets['lowercase'] + cracker.character_sets['digits']
+        keyspace = cracker.train_markov(wordlist, charset).keyspace(4)
+        password = keyspace.candidate(500)
+        target = hashlib.md5(password.encode()).hexdigest()
+        
+        with patch('keyspace.RESULTS_DIR', tmp_path):
+            with patch.object(AdvancedCracker, '_try_brute_force', return_value=None):
+                earlier = AdvancedCracker('md5')
+                assert earlier.crack_hash(target, wordlist) is None
+            budget = earlier.attempts + 100
+            with patch('base_cracker.MAX_ATTEMPTS', budget), patch('advanced_cracker.MAX_ATTEMPTS', budget):
+                assert cracker.crack_hash(target, wordlist) is None
+            
+            for word in ['a1a1', 'b2b2', 'c3c3']:
+                cracker.potfile.add('md5', hashlib.md5(word.encode()).hexdigest(), word)
+            assert cracker.train_markov(wordlist, charset).keyspace(4).index(password) != 500
+            
+            resumed = AdvancedCracker('md5')
+            with patch.object(resumed, '_try_wordlist') as try_wordlist:
+                result = resumed.crack_hash(target, wordlist, resume=True)
+        
+        assert result == password
+        try_wordlist.assert_not_called()
+        # Up to two chunks per worker may still be in flight when it is found
+        assert resumed.attempts <= 500 - 100 + 2 * 2 * 10
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 500)
+    def test_crack_mask(self, cracker, tmp_path):
+        """Test a mask attack finds a structured password"""
+        target = hashlib.md5(b'Ab7!').hexdigest()
+        
+        with patch('keyspace.RESULTS_DIR', tmp_path):
+            result = cracker.crack_mask(target, '?u?l?1!', ['?d'], increment=True, min_length=3)
+        
+        assert result == 'Ab7!'
+        assert cracker.found_passwords == {target: 'Ab7!'}
+        assert cracker.attempts <= 26 * 26 * 10 * 2
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 50)
+    def test_crack_combinator(self, cracker, tmp_path):
+        """Test a combinator attack joins a wordlist with a pattern table"""
+        wordlist = tmp_path / 'words.txt'
+        wordlist.write_text('sunshine\npassword\nsunshine\n')
+        target = hashlib.md5(b'password_qwe').hexdigest()
+        
+        with patch('keyspace.RESULTS_DIR', tmp_path):
+            result = cracker.crack_combinator(target, str(wordlist), 'keyboard_patterns', '_')
+        
+        assert result == 'password_qwe'
+        assert cracker.found_passwords == {target: 'password_qwe'}
+        assert cracker.attempts <= 2 * len(cracker.known_patterns['keyboard_patterns'])
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    @patch('advanced_cracker.BRUTE_FORCE_CHUNK', 10)
+    def test_crack_combinator_resume(self, cracker, tmp_path):
+        """Test an interrupted combinator attack resumes from its checkpoint"""
+        left = tmp_path / 'left.txt'
+        left.write_text('\n'.join(f"left{i:04d}" for i in range(20)))
+        right = tmp_path / 'right.txt'
+        right.write_text('\n'.join(f"right{i:03d}" for i in range(10)))
+        target = hashlib.md5(b'left0019right009').hexdigest()
+        
+        with patch('keyspace.RESULTS_DIR', tmp_path):
+            with patch('advanced_cracker.MAX_ATTEMPTS', 100):
+                assert cracker.crack_combinator(target, str(left), str(right)) is None
+            
+            resumed = AdvancedCracker('md5')
+            result = resumed.crack_combinator(target, str(left), str(right), resume=True)
+        
+        assert result == 'left0019right009'
+        assert resumed.attempts <= 200 - 100
+    
+    def test_crack_combinator_missing(self, cracker, tmp_path):
+        """Test a missing wordlist is reported"""
+        with pytest.raises(SecurityError):
+            cracker.crack_combinator(hashlib.md5(b'x').hexdigest(), str(tmp_path / 'missing.txt'), 'dates')
+    
+    @patch('advanced_cracker.MAX_PROCESSES', 2)
+    def test_main_mask_custom_charset_by_position(self, capsys):
+        """Test -2 defines ?2 on the command line without -1"""
+        target = hashlib.md5(b'ba').hexdigest()
+        argv = ['advanced_cracker.py', 'mask', '-a', 'md5', '-t', target, '-m', '?2?2', '-2', 'ab']
+        
+        with patch('sys.argv', argv):
+            main()
+        
+        assert 'Password found: ba' in capsys.readouterr().out
+    
+    def test_crack_mask_invalid(self, cracker):
+        """Test invalid masks are rejected"""
+        with pytest.raises(SecurityError):
+            cracker.crack_mask(hashlib.md5(b'x').hexdigest(), '?q')
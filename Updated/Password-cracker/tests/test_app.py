@@ -1,8 +1,10 @@
 import pytest
-from web.app import app, analyze_password, generate_hash, crack_hash
+from web.app import app, analyze_password, generate_hash, crack_hash, security
+import io
 import json
 import hashlib
 import bcrypt
+import time
 
 @pytest.fixture
 def client():
@@ -198,6 +200,31 @@ def test_sql_injection_protection(client):
     data = json.loads(response.data)
     assert 'error' in data
 
+def test_nested_injection_protection(client):
+    """Test nested JSON values and repeated query parameters are scanned"""
+    security.rate_limit_store.clear()
+    
+    response = client.post('/api/analyze',
+                          json={'password': 'Valid123!', 'meta': {'tags': ['ok', '<script>x</script>']}},
+                          content_type='application/json')
+    assert response.status_code == 400
+    
+    response = client.get('/?q=fine&q=javascript:alert(1)')
+    assert response.status_code == 400
+    
+    response = client.get('/?q=fine')
+    assert response.status_code == 200
+
+def test_injection_patterns_update(client):
+    """Test pattern list changes take effect on the next request"""
+    security.rate_limit_store.clear()
+    security.xss_patterns.append(r'forbiddenword')
+    try:
+        assert client.get('/?q=forbiddenword').status_code == 400
+    finally:
+        security.xss_patterns.remove(r'forbiddenword')
+    assert client.get('/?q=forbiddenword').status_code == 200
+
 def test_static_files(client):
     """Test static file serving"""
     response = client.get('/static/css/style.css')
@@ -248,4 +275,173 @@ def test_hash_verification():
     # Test SHA-256
     result = generate_hash(password, 'sha256')
     expected_hash = hashlib.sha256(password.encode()).hexdigest()
-    assert result['hash'] == expected_hash 
\ No newline at end of file
+    assert result['hash'] == expected_hash
+
+def test_jobs_endpoints(client):
+    """Test queueing, polling and cancelling crack jobs"""
+    security.rate_limit_store.clear()
+    
+    response = client.post('/api/jobs',
+                          json={'hash': hashlib.md5(b'password').hexdigest(), 'algorithm': 'md5'},
+                          content_type='application/json')
+    assert response.status_code == 202
+    job = json.loads(response.data)
+    assert job['status'] in ('queued', 'running', 'done')
+    assert response.headers['Location'].endswith(f"/api/jobs/{job['id']}")
+    
+    for _ in range(500):
+        job = json.loads(client.get(f"/api/jobs/{job['id']}").data)
+        if job['status'] == 'done':
+            break
+        time.sleep(0.01)
+    assert job['found'] is True
+    assert job['password'] == 'password'
+    
+    response = client.get('/api/jobs')
+    assert job['id'] in [listed['id'] for listed in json.loads(response.data)['jobs']]
+    
+    response = client.delete(f"/api/jobs/{job['id']}")
+    assert json.loads(response.data)['status'] == 'done'
+    
+    assert client.get('/api/jobs/unknown').status_code == 404
+    assert client.delete('/api/jobs/unknown').status_code == 404
+    
+    response = client.post('/api/jobs', json={'hash': 'abc', 'algorithm': 'md5'})
+    assert response.status_code == 400
+    response = client.post('/api/jobs', json={})
+    assert response.status_code == 400
+
+def test_job_events_stream(client):
+    """Test the server-sent event stream ends with the final job state"""
+    security.rate_limit_store.clear()
+    
+    response = client.post('/api/jobs',
+                          json={'hash': hashlib.md5(b'password').hexdigest(), 'algorithm': 'md5'},
+                          content_type='application/json')
+    job = json.loads(response.data)
+    
+    response = client.get(f"/api/jobs/{job['id']}/events")
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    
+    events = [chunk for chunk in response.get_data(as_text=True).split('\n\n') if chunk.startswith('event:')]
+    name, data = events[-1].split('\n')
+    assert name == 'event: end'
+    assert json.loads(data[len('data: '):])['password'] == 'password'
+    
+    assert client.get('/api/jobs/unknown/events').status_code == 404
+
+def test_analyze_batch(client):
+    """Test batch analysis streams one result line per password"""
+    security.rate_limit_store.clear()
+    
+    body = '\n'.join([
+        json.dumps('Test123!@#'),
+        json.dumps({'password': 'short'}),
+        '',
+        'not json',
+        json.dumps(''),
+        json.dumps('Test123!@#')
+    ])
+    response = client.post('/api/analyze/batch', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['index'] for line in lines] == [0, 1, 2, 3, 4]
+    assert lines[0]['result'] == analyze_password('Test123!@#')
+    assert lines[4]['result'] == lines[0]['result']
+    assert lines[1]['result']['length'] == 5
+    assert 'error' in lines[2] and 'error' in lines[3]
+
+def test_analyze_batch_json_array(client):
+    """Test batch analysis accepts a JSON array and rejects other bodies"""
+    security.rate_limit_store.clear()
+    
+    response = client.post('/api/analyze/batch', json=['Test123!@#', {'password': 'Another1!'}])
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['result']['strength'] for line in lines] == ['Very Strong', 'Very Strong']
+    
+    response = client.post('/api/analyze/batch', json={'password': 'Test123!@#'})
+    assert response.status_code == 400
+
+def test_analyze_batch_rate_cost(client):
+    """Test batches are charged to the rate limit by size"""
+    security.rate_limit_store.clear()
+    unit = app.view_functions['analyze_batch'].rate_limit_bytes
+    body = '\n'.join(json.dumps(f'Password{i}!') for i in range(3 * unit // 10))
+    
+    response = client.post('/api/analyze/batch', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == 3 * unit // 10
+    
+    # Only a few of the 100 requests per minute remain after the batch
+    charged = -(-len(body) // unit)
+    assert 1 < charged < security.rate_limit_max_requests
+    allowed = 0
+    while client.get('/').status_code == 200:
+        allowed += 1
+    assert allowed == security.rate_limit_max_requests - charged
+    security.rate_limit_store.clear()
+
+def test_analyze_batch_special_characters(client):
+    """Test passwords with quotes, '#' and '--' are analyzed in both formats"""
+    security.rate_limit_store.clear()
+    passwords = ["O'Brien2024", 'Pass#word--1', '<script>x</script>', "a' OR '1'='1"]
+    
+    response = client.post('/api/analyze/batch', json=passwords)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['result'] for line in lines] == [analyze_password(password) for password in passwords]
+    
+    body = '\n'.join(json.dumps(password) for password in passwords)
+    response = client.post('/api/analyze/batch', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == lines
+    
+    # The query string is still scanned
+    response = client.post("/api/analyze/batch?next=javascript:alert(1)", json=passwords)
+    assert response.status_code == 400
+
+def test_analyze_batch_too_large(client, monkeypatch):
+    """Test a batch charged more than the whole rate limit is refused as too large"""
+    security.rate_limit_store.clear()
+    monkeypatch.setattr(security, 'rate_limit_max_requests', 2)
+    unit = app.view_functions['analyze_batch'].rate_limit_bytes
+    
+    response = client.post('/api/analyze/batch', data=b' ' * (2 * unit + 1), content_type='application/x-ndjson')
+    assert response.status_code == 413
+    assert client.get('/').status_code == 200
+    security.rate_limit_store.clear()
+
+def test_analyze_batch_streamed_rate_cost(client, monkeypatch):
+    """Test a body without Content-Length is charged as it is read"""
+    security.rate_limit_store.clear()
+    monkeypatch.setattr(security, 'rate_limit_max_requests', 5)
+    unit = app.view_functions['analyze_batch'].rate_limit_bytes
+    count = 3 * unit // 18
+    body = '\n'.join(json.dumps(f'Password{i:05d}!') for i in range(count)).encode()
+    assert -(-len(body) // unit) == 3
+    
+    def post(data):
+        # A chunked upload: the server terminates the stream, there is no Content-Length
+        return client.post(
+            '/api/analyze/batch', content_type='application/x-ndjson',
+            environ_overrides={'wsgi.input': io.BytesIO(data), 'wsgi.input_terminated': True}
+        )
+    
+    response = post(body)
+    assert response.status_code == 200
+    assert response.request.content_length is None
+    assert len(response.get_data(as_text=True).splitlines()) == count
+    assert client.get('/').status_code == 200
+    assert client.get('/').status_code == 200
+    assert client.get('/').status_code == 429
+    
+    # Reading stops with an error line once the client runs out of requests
+    security.rate_limit_store.clear()
+    response = post(body + b'\n' + body)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[-1] == {'error': 'Rate limit exceeded'}
+    assert len(lines) < 2 * count
+    security.rate_limit_store.clear()
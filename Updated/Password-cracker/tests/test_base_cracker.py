@@ -7,9 +7,11 @@ from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 import threading
 import json
+import hashlib
 
 from base_cracker import BaseCracker
-from utils import SecurityError
+from wordlist import compile_wordlist
+from utils import SecurityError, TokenBucket
 from config import MAX_ATTEMPTS, TIMEOUT, SUPPORTED_HASHES
 
 
@@ -53,7 +55,7 @@ class TestBaseCrackerClass:
         assert isinstance(cracker.stop_flag, threading.Event)
         assert isinstance(cracker.lock, threading.Lock)
         assert isinstance(cracker.found_passwords, dict)
-        assert isinstance(cracker.rate_limiter, threading.Semaphore)
+        assert isinstance(cracker.rate_limiter, TokenBucket)
         
         # Test invalid algorithm
         with pytest.raises(SecurityError) as exc_info:
@@ -85,6 +87,14 @@ class TestBaseCrackerClass:
             with pytest.raises(SecurityError):
                 cracker.validate_hash(hash_value)
     
+    def test_validate_bcrypt_hash(self):
+        """Test bcrypt hashes are validated with the bcrypt pattern"""
+        cracker = TestBaseCracker('bcrypt')
+        
+        assert cracker.validate_hash('$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBAQNxKxJ5J5Hy') is True
+        with pytest.raises(SecurityError):
+            cracker.validate_hash('5f4dcc3b5aa765d61d8327deb882cf99')
+    
     @patch('base_cracker.verify_password')
     def test_check_password(self, mock_verify, cracker):
         """Test password checking"""
@@ -110,6 +120,43 @@ class TestBaseCrackerClass:
         result = cracker.check_password('password', 'test_hash')
         assert result is False
     
+    @patch('base_cracker.log_security_event')
+    def test_check_passwords(self, mock_log, cracker):
+        """Test bulk password checking"""
+        target = hashlib.sha256(b'letmein1').hexdigest()
+        cracker.start_time = time.time()
+        
+        result = cracker.check_passwords(iter(['password1', 'letmein1', 'admin123']), target)
+        
+        assert result == 'letmein1'
+        assert cracker.attempts == 2
+        # One summary event per batch rather than per candidate
+        mock_log.assert_called_once()
+        assert mock_log.call_args[0][0] == 'password_batch'
+        assert mock_log.call_args[0][1]['checked'] == 2
+    
+    @patch('base_cracker.CHECK_BATCH_SIZE', 2)
+    @patch('base_cracker.log_security_event')
+    def test_check_passwords_batches(self, mock_log, cracker):
+        """Test bulk checking splits candidates into batches"""
+        target = hashlib.sha256(b'notfound').hexdigest()
+        cracker.start_time = time.time()
+        
+        result = cracker.check_passwords(['p1', 'p2', 'p3', 'p4', 'p5'], target)
+        
+        assert result is None
+        assert cracker.attempts == 5
+        assert mock_log.call_count == 3
+    
+    def test_check_passwords_stop_flag(self, cracker):
+        """Test bulk checking honours the stop flag"""
+        cracker.stop_flag.set()
+        
+        result = cracker.check_passwords(['password1'], hashlib.sha256(b'password1').hexdigest())
+        
+        assert result is None
+        assert cracker.attempts == 0
+    
     @patch('base_cracker.secure_file_operation')
     def test_load_wordlist(self, mock_file_op, cracker):
         """Test wordlist loading"""
@@ -133,6 +180,52 @@ class TestBaseCrackerClass:
             cracker.load_wordlist(Path("test.txt"))
         assert "Failed to load wordlist" in str(exc_info.value)
     
+    def test_iter_wordlist(self, cracker, tmp_path):
+        """Test lazy wordlist streaming"""
+        wordlist = tmp_path / "stream_wordlist.txt"
+        wordlist.write_bytes(b"password1\n\n  letmein123  \nshort\n\xff\xfe\xfd\xfc\xfb\xfa\xf9\xf8\nsunshine9\n")
+        
+        passwords = cracker.iter_wordlist(wordlist)
+        
+        # Nothing is materialized up front
+        assert not isinstance(passwords, list)
+        assert list(passwords) == ['password1', 'letmein123', 'sunshine9']
+    
+    def test_load_wordlist_stream(self, cracker, tmp_path):
+        """Test streaming mode of load_wordlist"""
+        wordlist = tmp_path / "stream_wordlist.txt"
+        wordlist.write_text("password1\npassword2\n")
+        
+        passwords = cracker.load_wordlist(wordlist, stream=True)
+        
+        assert next(iter(passwords)) == 'password1'
+    
+    def test_iter_wordlist_missing_file(self, cracker, tmp_path):
+        """Test streaming a missing wordlist fails before iteration"""
+        with pytest.raises(SecurityError) as exc_info:
+            cracker.load_wordlist(tmp_path / "missing.txt", stream=True)
+        assert "Failed to load wordlist" in str(exc_info.value)
+    
+    def test_load_wordlist_compiled(self, cracker, tmp_path):
+        """Test an up-to-date compiled copy is read instead of the text wordlist"""
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_text("password1\npassword2\npassword1\n")
+        compile_wordlist(wordlist)
+        
+        assert list(cracker.load_wordlist(wordlist, stream=True)) == ['password1', 'password2']
+        assert cracker.load_wordlist(wordlist) == ['password1', 'password2']
+        assert cracker.load_wordlist(tmp_path / "words.pwl") == ['password1', 'password2']
+    
+    def test_phase_progress(self, cracker):
+        """Test phase progress counts attempts since the phase began"""
+        assert cracker.phase_progress() == (None, None, 0)
+        
+        cracker.count_attempts(7)
+        cracker.begin_phase('brute force', total=100, done=20)
+        cracker.count_attempts(5)
+        
+        assert cracker.phase_progress() == ('brute force', 100, 25)
+    
     def test_check_timeout(self, cracker):
         """Test timeout checking"""
         # No timeout initially
@@ -217,14 +310,14 @@ class TestBaseCrackerClass:
         assert len(cracker.found_passwords) == 0
     
     def test_rate_limiting(self, cracker):
-        """Test rate limiting functionality"""
-        # Acquire rate limiter multiple times
-        initial_count = cracker.rate_limiter._value
+        """Test candidate checks are charged to the rate limiter"""
+        cracker.start_time = time.time()
         
-        with cracker.rate_limiter:
-            assert cracker.rate_limiter._value == initial_count - 1
+        with patch.object(cracker.rate_limiter, 'acquire') as mock_acquire:
+            cracker.check_passwords(['p1', 'p2', 'p3'], hashlib.sha256(b'none').hexdigest())
+            cracker.check_password('password1', hashlib.sha256(b'none').hexdigest())
         
-        assert cracker.rate_limiter._value == initial_count
+        assert [c.args for c in mock_acquire.call_args_list] == [(3,), ()]
     
     def test_thread_safety(self, cracker):
         """Test thread safety with lock"""
@@ -245,6 +338,22 @@ class TestBaseCrackerClass:
         
         assert cracker.attempts == 10
     
+    def test_count_attempts_threads(self, cracker):
+        """Test attempt counts from worker threads are combined"""
+        threads = [
+            threading.Thread(target=lambda: [cracker.count_attempts(2) for _ in range(1000)])
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert cracker.attempts == 8000
+        
+        cracker.attempts = 0
+        assert cracker.attempts == 0
+    
     def test_abstract_method_implementation(self):
         """Test that abstract method must be implemented"""
         with pytest.raises(TypeError):
@@ -6,8 +6,11 @@ from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock, mock_open
 import sys
 import time
+import hashlib
+import bcrypt
 
 from basic_cracker import BasicCracker, main
+from lookup_table import build_lookup_table, table_path
 from utils import SecurityError
 from config import WORDLISTS_DIR, RESULTS_DIR
 
@@ -45,70 +48,66 @@ class TestBasicCracker:
         assert cracker.attempts == 0
         assert cracker.start_time == 0
     
-    @patch.object(BasicCracker, 'validate_hash')
     @patch.object(BasicCracker, 'load_wordlist')
-    @patch.object(BasicCracker, 'check_password')
-    def test_crack_hash_success(self, mock_check, mock_load, mock_validate, cracker):
+    def test_crack_hash_success(self, mock_load, cracker):
         """Test successful hash cracking"""
-        mock_validate.return_value = True
+        target = hashlib.sha256(b'123456').hexdigest()
         mock_load.return_value = ['password', '123456', 'admin']
-        mock_check.side_effect = [False, True, False]  # Second password matches
         
-        result = cracker.crack_hash('test_hash', Path('wordlist.txt'))
+        result = cracker.crack_hash(target, Path('wordlist.txt'))
         
         assert result == '123456'
-        assert 'test_hash' in cracker.found_passwords
-        assert cracker.found_passwords['test_hash'] == '123456'
-        mock_validate.assert_called_once_with('test_hash')
+        assert target in cracker.found_passwords
+        assert cracker.found_passwords[target] == '123456'
         mock_load.assert_called_once()
-        assert mock_check.call_count == 2
+        assert cracker.attempts == 2
     
-    @patch.object(BasicCracker, 'validate_hash')
     @patch.object(BasicCracker, 'load_wordlist')
-    @patch.object(BasicCracker, 'check_password')
-    def test_crack_hash_not_found(self, mock_check, mock_load, mock_validate, cracker):
+    def test_crack_hash_not_found(self, mock_load, cracker):
         """Test hash cracking when password not found"""
-        mock_validate.return_value = True
+        target = hashlib.sha256(b'unknown').hexdigest()
         mock_load.return_value = ['password', '123456', 'admin']
-        mock_check.return_value = False  # No matches
         
-        result = cracker.crack_hash('test_hash', Path('wordlist.txt'))
+        result = cracker.crack_hash(target, Path('wordlist.txt'))
         
         assert result is None
-        assert 'test_hash' not in cracker.found_passwords
-        assert mock_check.call_count == 3
+        assert target not in cracker.found_passwords
+        assert cracker.attempts == 3
     
-    @patch.object(BasicCracker, 'validate_hash')
     @patch.object(BasicCracker, 'load_wordlist')
-    @patch.object(BasicCracker, 'check_password')
     @patch.object(BasicCracker, 'check_timeout')
-    def test_crack_hash_timeout(self, mock_timeout, mock_check, mock_load, mock_validate, cracker):
+    def test_crack_hash_timeout(self, mock_timeout, mock_load, cracker):
         """Test hash cracking with timeout"""
-        mock_validate.return_value = True
         mock_load.return_value = ['password', '123456', 'admin']
-        mock_check.return_value = False
-        mock_timeout.side_effect = [False, True]  # Timeout on second check
+        mock_timeout.return_value = True
         
-        result = cracker.crack_hash('test_hash', Path('wordlist.txt'))
+        result = cracker.crack_hash(hashlib.sha256(b'admin').hexdigest(), Path('wordlist.txt'))
         
         assert result is None
-        assert mock_check.call_count == 1
+        assert cracker.attempts == 0
     
-    @patch.object(BasicCracker, 'validate_hash')
     @patch.object(BasicCracker, 'load_wordlist')
-    @patch.object(BasicCracker, 'check_password')
     @patch.object(BasicCracker, 'check_attempts')
-    def test_crack_hash_max_attempts(self, mock_attempts, mock_check, mock_load, mock_validate, cracker):
+    def test_crack_hash_max_attempts(self, mock_attempts, mock_load, cracker):
         """Test hash cracking with max attempts reached"""
-        mock_validate.return_value = True
         mock_load.return_value = ['password', '123456', 'admin']
-        mock_check.return_value = False
-        mock_attempts.side_effect = [False, True]  # Max attempts on second check
+        mock_attempts.return_value = True
         
-        result = cracker.crack_hash('test_hash', Path('wordlist.txt'))
+        result = cracker.crack_hash(hashlib.sha256(b'admin').hexdigest(), Path('wordlist.txt'))
         
         assert result is None
-        assert mock_check.call_count == 1
+        assert cracker.attempts == 0
+    
+    @patch('base_cracker.MAX_ATTEMPTS', 2)
+    @patch.object(BasicCracker, 'load_wordlist')
+    def test_crack_hash_attempt_budget(self, mock_load, cracker):
+        """Test the attempt budget is enforced exactly within a batch"""
+        mock_load.return_value = ['password', '123456', 'admin']
+        
+        result = cracker.crack_hash(hashlib.sha256(b'admin').hexdigest(), Path('wordlist.txt'))
+        
+        assert result is None
+        assert cracker.attempts == 2
     
     @patch.object(BasicCracker, 'validate_hash')
     def test_crack_hash_invalid_hash(self, mock_validate, cracker):
@@ -131,33 +130,121 @@ class TestBasicCracker:
         assert "Failed to crack hash" in str(exc_info.value)
     
     @patch('basic_cracker.secure_file_operation')
-    @patch.object(BasicCracker, 'crack_hash')
+    @patch.object(BasicCracker, 'load_wordlist')
     @patch.object(BasicCracker, 'save_results')
-    def test_crack_multiple_success(self, mock_save, mock_crack, mock_file_op, cracker):
+    def test_crack_multiple_success(self, mock_save, mock_load, mock_file_op, cracker):
         """Test cracking multiple hashes successfully"""
-        mock_file_op.return_value = "hash1\nhash2\nhash3\n"
-        mock_crack.side_effect = ['password1', None, 'password3']
+        hash1 = hashlib.sha256(b'password1').hexdigest()
+        hash2 = hashlib.sha256(b'notinlist').hexdigest()
+        hash3 = hashlib.sha256(b'password3').hexdigest()
+        mock_file_op.return_value = f"{hash1}\n{hash2}\n{hash3}\n"
+        mock_load.return_value = ['password1', 'password2', 'password3']
         
         cracker.crack_multiple(Path('hashes.txt'), Path('wordlist.txt'))
         
-        assert mock_crack.call_count == 3
+        # The wordlist is walked once for all targets
+        mock_load.assert_called_once()
+        assert cracker.attempts == 3
         assert len(cracker.found_passwords) == 2
-        assert cracker.found_passwords['hash1'] == 'password1'
-        assert cracker.found_passwords['hash3'] == 'password3'
+        assert cracker.found_passwords[hash1] == 'password1'
+        assert cracker.found_passwords[hash3] == 'password3'
         mock_save.assert_called_once()
     
     @patch('basic_cracker.secure_file_operation')
-    @patch.object(BasicCracker, 'crack_hash')
-    def test_crack_multiple_no_results(self, mock_crack, mock_file_op, cracker):
+    @patch.object(BasicCracker, 'load_wordlist')
+    def test_crack_multiple_no_results(self, mock_load, mock_file_op, cracker):
         """Test cracking multiple hashes with no results"""
-        mock_file_op.return_value = "hash1\nhash2\n"
-        mock_crack.return_value = None
+        mock_file_op.return_value = (
+            f"{hashlib.sha256(b'unknown1').hexdigest()}\n"
+            f"{hashlib.sha256(b'unknown2').hexdigest()}\n"
+        )
+        mock_load.return_value = ['password1', 'password2']
         
         cracker.crack_multiple(Path('hashes.txt'), Path('wordlist.txt'))
         
-        assert mock_crack.call_count == 2
+        assert cracker.attempts == 2
         assert len(cracker.found_passwords) == 0
     
+    @patch('basic_cracker.secure_file_operation')
+    @patch.object(BasicCracker, 'load_wordlist')
+    def test_crack_multiple_stops_when_all_found(self, mock_load, mock_file_op, cracker):
+        """Test multi-target attack stops once every target is cracked"""
+        target = hashlib.sha256(b'password1').hexdigest()
+        mock_file_op.return_value = f"{target}\n{target.upper()}\n"
+        mock_load.return_value = ['password1', 'password2', 'password3']
+        
+        with patch.object(cracker, 'save_results'):
+            cracker.crack_multiple(Path('hashes.txt'), Path('wordlist.txt'))
+        
+        assert cracker.attempts == 1
+        assert cracker.found_passwords[target] == 'password1'
+        assert cracker.found_passwords[target.upper()] == 'password1'
+    
+    @patch('basic_cracker.secure_file_operation')
+    @patch.object(BasicCracker, 'load_wordlist')
+    @patch.object(BasicCracker, 'save_results')
+    def test_crack_multiple_bcrypt(self, mock_save, mock_load, mock_file_op):
+        """Test bcrypt hashes are cracked per salt group"""
+        cracker = BasicCracker('bcrypt')
+        salt = bcrypt.gensalt(4)
+        shared = bcrypt.hashpw(b'password1', salt).decode()
+        other = bcrypt.hashpw(b'letmein1', bcrypt.gensalt(5)).decode()
+        mock_file_op.return_value = f"{other}\n{shared}\n{shared}\nnot_a_hash\n"
+        mock_load.side_effect = lambda *args, **kwargs: iter(['password1', 'letmein1', 'admin123'])
+        
+        with patch('bcrypt_scheduler.MAX_PROCESSES', 1):
+            cracker.crack_multiple(Path('hashes.txt'), Path('wordlist.txt'))
+        
+        assert cracker.found_passwords == {shared: 'password1', other: 'letmein1'}
+        assert mock_load.call_count == 2
+        # Attempts add up across salt groups
+        assert cracker.attempts == 6
+    
+    @patch('basic_cracker.secure_file_operation')
+    @patch.object(BasicCracker, 'load_wordlist')
+    def test_crack_multiple_lookup_table(self, mock_load, mock_file_op, cracker, tmp_path):
+        """Test precomputed tables are checked before the wordlist"""
+        known = hashlib.sha256(b'password1').hexdigest()
+        unknown = hashlib.sha256(b'letmein1').hexdigest()
+        build_lookup_table(table_path('common', 'sha256', tmp_path), ['password1'], 'sha256')
+        mock_file_op.return_value = f"{known}\n{unknown}\n"
+        mock_load.return_value = ['letmein1']
+        
+        with patch('base_cracker.TABLES_DIR', tmp_path), patch.object(cracker, 'save_results'):
+            cracker.crack_multiple(Path('hashes.txt'), Path('wordlist.txt'))
+        
+        assert cracker.found_passwords == {known: 'password1', unknown: 'letmein1'}
+        assert cracker.attempts == 1
+    
+    @patch('basic_cracker.secure_file_operation')
+    @patch.object(BasicCracker, 'load_wordlist')
+    def test_crack_multiple_skips_potfile(self, mock_load, mock_file_op, cracker):
+        """Test hashes cracked by an earlier run are not attacked again"""
+        known = hashlib.sha256(b'password1').hexdigest()
+        unknown = hashlib.sha256(b'unknown1').hexdigest()
+        cracker.potfile.add('sha256', known, 'password1')
+        mock_file_op.return_value = f"{known.upper()}\n{unknown}\n"
+        mock_load.return_value = ['password1', 'password2']
+        
+        with patch.object(cracker, 'save_results'):
+            cracker.crack_multiple(Path('hashes.txt'), Path('wordlist.txt'))
+        
+        assert cracker.found_passwords == {known.upper(): 'password1'}
+        assert cracker.attempts == 2
+    
+    def test_crack_hash_records_potfile(self, cracker, tmp_path):
+        """Test cracked hashes are written to the potfile and reused"""
+        wordlist = tmp_path / "wordlist.txt"
+        wordlist.write_text("password1\nletmein123\n")
+        target = hashlib.sha256(b'letmein123').hexdigest()
+        
+        assert cracker.crack_hash(target, wordlist) == 'letmein123'
+        assert cracker.potfile.get('sha256', target) == 'letmein123'
+        
+        rerun = BasicCracker('sha256')
+        assert rerun.crack_hash(target, tmp_path / "missing.txt") == 'letmein123'
+        assert rerun.attempts == 0
+    
     @patch('basic_cracker.secure_file_operation')
     def test_crack_multiple_file_error(self, mock_file_op, cracker):
         """Test cracking multiple hashes with file error"""
@@ -173,7 +260,9 @@ class TestBasicCracker:
         
         with patch.object(cracker, 'validate_hash'):
             with patch.object(cracker, 'load_wordlist', return_value=['password']):
-                result = cracker.crack_hash('test_hash', Path('wordlist.txt'))
+                result = cracker.crack_hash(
+                    hashlib.sha256(b'password').hexdigest(), Path('wordlist.txt')
+                )
         
         assert result is None
 
@@ -252,6 +341,22 @@ class TestMainFunction:
         """Test main function in crack mode with hash file"""
         main()
         mock_crack_multiple.assert_called_once()
+        assert all(isinstance(arg, Path) for arg in mock_crack_multiple.call_args.args)
+    
+    def test_main_crack_mode_file_end_to_end(self, tmp_path, capsys):
+        """Test a hash file is cracked from the command line"""
+        hashes = tmp_path / 'hashes.txt'
+        hashes.write_text(hashlib.md5(b'password1').hexdigest() + '\n')
+        wordlist = tmp_path / 'words.txt'
+        wordlist.write_text('letmein123\npassword1\n')
+        argv = ['basic_cracker.py', 'crack', '-a', 'md5', '-f', str(hashes), '-w', str(wordlist)]
+        
+        with patch('sys.argv', argv), patch('basic_cracker.RESULTS_DIR', tmp_path):
+            main()
+        
+        assert 'Error' not in capsys.readouterr().out
+        (results,) = tmp_path.glob('cracked_*.json')
+        assert 'password1' in results.read_text()
     
     @patch('sys.argv', ['basic_cracker.py', 'crack'])
     def test_main_crack_mode_no_input(self, capsys):
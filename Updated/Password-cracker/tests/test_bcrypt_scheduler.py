@@ -0,0 +1,65 @@
+"""
+Unit tests for bcrypt_scheduler.py
+"""
+import pytest
+import bcrypt
+
+from bcrypt_scheduler import BcryptScheduler, group_bcrypt_hashes
+
+
+@pytest.fixture(scope='module')
+def hashes():
+    """Create bcrypt hashes at two costs, two sharing a salt"""
+    salt = bcrypt.gensalt(5)
+    return {
+        'shared1': bcrypt.hashpw(b'password1', salt).decode(),
+        'shared2': bcrypt.hashpw(b'letmein1', salt).decode(),
+        'cheap': bcrypt.hashpw(b'admin123', bcrypt.gensalt(4)).decode(),
+    }
+
+
+class TestGroupBcryptHashes:
+    """Test suite for salt grouping"""
+    
+    def test_groups_by_salt_cheapest_first(self, hashes):
+        """Test targets are grouped by salt and ordered by cost"""
+        groups = group_bcrypt_hashes([hashes['shared1'], hashes['cheap'], hashes['shared2']])
+        
+        assert [group.cost for group in groups] == [4, 5]
+        assert [len(group) for group in groups] == [1, 2]
+        assert groups[1].salt == hashes['shared1'].encode()[:29]
+    
+    def test_duplicate_targets(self, hashes):
+        """Test duplicate hashes share one checksum entry"""
+        groups = group_bcrypt_hashes([hashes['cheap'], hashes['cheap']])
+        
+        assert len(groups) == 1
+        assert len(groups[0]) == 2
+        assert len(groups[0].targets) == 1
+
+
+class TestBcryptScheduler:
+    """Test suite for BcryptScheduler class"""
+    
+    @pytest.mark.parametrize('processes', [1, 2])
+    def test_check_group(self, hashes, processes):
+        """Test one pass cracks every target in a salt group"""
+        group = group_bcrypt_hashes([hashes['shared1'], hashes['shared2']])[0]
+        
+        with BcryptScheduler(processes) as scheduler:
+            found = scheduler.check(group, ['admin123', 'letmein1', 'qwerty12', 'password1'])
+        
+        assert sorted(found) == [
+            ('letmein1', [hashes['shared2']]),
+            ('password1', [hashes['shared1']])
+        ]
+        assert not group.targets
+    
+    def test_check_no_match(self, hashes):
+        """Test targets stay outstanding when nothing matches"""
+        group = group_bcrypt_hashes([hashes['cheap']])[0]
+        
+        with BcryptScheduler(1) as scheduler:
+            assert scheduler.check(group, ['password1']) == []
+        
+        assert len(group) == 1
@@ -0,0 +1,47 @@
+"""
+Unit tests for benchmark.py
+"""
+import pytest
+
+from benchmark import BENCHMARKS, run_benchmarks, compare_results
+from config import SUPPORTED_HASHES
+from utils import SecurityError
+
+
+class TestBenchmarks:
+    """Test suite for the benchmark harness"""
+    
+    def test_covers_supported_hashes(self):
+        """Test every supported algorithm has a benchmark"""
+        for algorithm in SUPPORTED_HASHES:
+            assert f"verify_{algorithm}" in BENCHMARKS
+    
+    def test_run_benchmarks(self):
+        """Test benchmarks report items, time and rate"""
+        report = run_benchmarks(['verify_md5', 'wordlist_load', 'rules'], scale=0.001)
+        
+        assert list(report['results']) == ['verify_md5', 'wordlist_load', 'rules']
+        for result in report['results'].values():
+            assert result['items'] > 0
+            assert result['seconds'] >= 0
+            assert result['rate'] >= 0
+        assert report['scale'] == 0.001
+    
+    def test_unknown_benchmark(self):
+        """Test unknown benchmark names are rejected"""
+        with pytest.raises(SecurityError):
+            run_benchmarks(['nonexistent'])
+    
+    def test_compare_results(self):
+        """Test slowdowns beyond the tolerance are reported"""
+        baseline = {'results': {'fast': {'rate': 1000.0}, 'slow': {'rate': 1000.0}}}
+        report = {'results': {
+            'fast': {'rate': 900.0},
+            'slow': {'rate': 500.0},
+            'new': {'rate': 10.0}
+        }}
+        
+        regressions = compare_results(report, baseline, tolerance=0.2)
+        
+        assert len(regressions) == 1
+        assert regressions[0].startswith('slow:')
@@ -0,0 +1,67 @@
+"""
+Unit tests for combinator.py
+"""
+import pickle
+import pytest
+
+from combinator import CombinatorKeyspace
+from stringtable import write_string_table
+from utils import SecurityError
+
+
+class TestCombinatorKeyspace:
+    """Test suite for CombinatorKeyspace class"""
+    
+    @pytest.fixture
+    def tables(self, tmp_path):
+        """Write left and right word tables"""
+        left = tmp_path / 'left.tbl'
+        right = tmp_path / 'right.tbl'
+        write_string_table(left, ['red', 'blue', 'green'])
+        write_string_table(right, ['cat', 'dog'])
+        return left, right
+    
+    def test_cross_product(self, tables):
+        """Test candidates are the left-major cross product"""
+        keyspace = CombinatorKeyspace(*tables, separator='-')
+        
+        assert keyspace.size == 6
+        assert list(keyspace) == ['red-cat', 'red-dog', 'blue-cat', 'blue-dog', 'green-cat', 'green-dog']
+        assert keyspace.candidate(3) == 'blue-dog'
+        with pytest.raises(SecurityError):
+            keyspace.candidate(6)
+        keyspace.close()
+    
+    def test_iter_range(self, tables):
+        """Test ranges agree with the full product at every boundary"""
+        keyspace = CombinatorKeyspace(*tables)
+        full = list(keyspace)
+        
+        for start, stop in [(0, 1), (1, 4), (3, 6), (5, 9), (4, 2)]:
+            assert list(keyspace.iter_range(start, stop)) == full[start:stop]
+        keyspace.close()
+    
+    def test_pickle_reopens_tables(self, tables):
+        """Test a pickled keyspace maps its tables again"""
+        keyspace = CombinatorKeyspace(*tables)
+        copy = pickle.loads(pickle.dumps(keyspace))
+        keyspace.close()
+        
+        assert copy.candidate(5) == 'greendog'
+        copy.close()
+    
+    def test_empty_side(self, tables, tmp_path):
+        """Test an empty wordlist is rejected"""
+        empty = tmp_path / 'empty.tbl'
+        write_string_table(empty, [])
+        
+        with pytest.raises(SecurityError):
+            CombinatorKeyspace(tables[0], empty)
+    
+    def test_describe(self, tables):
+        """Test the description depends on the separator"""
+        plain = CombinatorKeyspace(*tables)
+        joined = CombinatorKeyspace(*tables, separator='_')
+        
+        assert plain.describe() == CombinatorKeyspace(*tables).describe()
+        assert plain.describe() != joined.describe()
@@ -0,0 +1,55 @@
+"""
+Unit tests for extsort.py
+"""
+import random
+from unittest.mock import patch
+
+from extsort import ExternalSorter
+
+
+class TestExternalSorter:
+    """Test suite for ExternalSorter class"""
+
+    def test_in_memory(self, tmp_path):
+        """Test records fitting in one run are sorted without touching disk"""
+        sorter = ExternalSorter(run_size=10, directory=tmp_path)
+        for record in (b'pear', b'apple', b'fig', b'apple'):
+            sorter.add(record)
+        
+        assert list(sorter.sorted()) == [b'apple', b'apple', b'fig', b'pear']
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_spilled_runs(self, tmp_path):
+        """Test records across many runs are merged in order and cleaned up"""
+        records = [random.randbytes(random.randint(0, 12)) for _ in range(1000)]
+        
+        with ExternalSorter(run_size=37, directory=tmp_path) as sorter:
+            for record in records:
+                sorter.add(record)
+            
+            assert list(sorter.sorted()) == sorted(records)
+        
+        assert list(tmp_path.iterdir()) == []
+    
+    @patch('extsort.MERGE_FANIN', 4)
+    def test_multi_pass_merge(self, tmp_path):
+        """Test runs beyond the merge fan-in are merged in several passes"""
+        records = [f'{i:05d}'.encode() for i in range(500)]
+        random.shuffle(records)
+        
+        with ExternalSorter(run_size=10, directory=tmp_path) as sorter:
+            for record in records:
+                sorter.add(record)
+            
+            assert list(sorter.sorted()) == sorted(records)
+    
+    def test_close_removes_runs(self, tmp_path):
+        """Test closing an unread sorter removes its run files"""
+        sorter = ExternalSorter(run_size=2, directory=tmp_path)
+        for record in (b'c', b'b', b'a'):
+            sorter.add(record)
+        assert list(tmp_path.iterdir())
+        
+        sorter.close()
+        
+        assert list(tmp_path.iterdir()) == []
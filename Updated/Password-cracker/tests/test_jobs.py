@@ -0,0 +1,150 @@
+"""
+Unit tests for web/jobs.py
+"""
+import hashlib
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from web.jobs import JobManager, JobQueueFull
+from utils import SecurityError
+
+
+def wait_for(job, timeout=10.0):
+    """Wait until a job leaves the active states"""
+    deadline = time.time() + timeout
+    while job.status in ('queued', 'running') and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class TestJobManager:
+    """Test suite for JobManager class"""
+    
+    @pytest.fixture
+    def wordlist(self, tmp_path):
+        """Create a small wordlist"""
+        path = tmp_path / 'words.txt'
+        path.write_text('sunshine1\npassword1\nletmein123\n')
+        return path
+    
+    @pytest.fixture
+    def manager(self, wordlist):
+        """Create a job manager using the small wordlist"""
+        manager = JobManager(max_concurrent=1, max_queued=1, wordlist=wordlist)
+        yield manager
+        manager.shutdown()
+    
+    def test_job_finds_password(self, manager):
+        """Test a basic job cracks a hash on a worker thread"""
+        job = manager.submit(hashlib.md5(b'password1').hexdigest(), 'md5')
+        
+        assert manager.get(job.id) is job
+        wait_for(job)
+        
+        result = job.to_dict()
+        assert result['status'] == 'done'
+        assert result['found'] is True
+        assert result['password'] == 'password1'
+        assert result['attempts'] == 2
+        assert result['error'] is None
+    
+    def test_job_not_found(self, manager):
+        """Test an exhausted wordlist finishes without a password"""
+        job = wait_for(manager.submit(hashlib.md5(b'missing').hexdigest(), 'md5'))
+        
+        assert job.status == 'done'
+        assert job.password is None
+        assert job.attempts == 3
+    
+    def test_invalid_requests(self, manager):
+        """Test bad algorithms, modes and hashes are rejected up front"""
+        with pytest.raises(SecurityError):
+            manager.submit(hashlib.md5(b'x').hexdigest(), 'whirlpool')
+        with pytest.raises(SecurityError):
+            manager.submit(hashlib.md5(b'x').hexdigest(), 'md5', 'quantum')
+        with pytest.raises(SecurityError):
+            manager.submit('not-a-hash', 'md5')
+        assert manager.list() == []
+    
+    def test_queue_limit_and_cancel(self, manager):
+        """Test active jobs are capped and queued jobs can be cancelled"""
+        started = threading.Event()
+        release = threading.Event()
+        
+        def blocking_crack(cracker, target_hash, wordlist_path):
+            started.set()
+            release.wait(5)
+            return None
+        
+        with patch('basic_cracker.BasicCracker.crack_hash', blocking_crack):
+            running = manager.submit(hashlib.md5(b'a').hexdigest(), 'md5')
+            assert started.wait(5)
+            queued = manager.submit(hashlib.md5(b'b').hexdigest(), 'md5')
+            
+            with pytest.raises(JobQueueFull):
+                manager.submit(hashlib.md5(b'c').hexdigest(), 'md5')
+            
+            assert manager.cancel(queued.id).status == 'cancelled'
+            assert manager.cancel('unknown') is None
+            
+            manager.cancel(running.id)
+            assert running.cracker is None or running.cracker.stop_flag.is_set()
+            release.set()
+            wait_for(running)
+        
+        assert running.status == 'cancelled'
+        assert [job.id for job in manager.list()] == [queued.id, running.id]
+    
+    def test_cracker_construction_fails(self, manager):
+        """Test a job whose cracker cannot be built fails instead of staying queued"""
+        with patch.dict('web.jobs.CRACKERS', {'basic': Mock(side_effect=SecurityError('no wordlist'))}):
+            job = wait_for(manager.submit(hashlib.md5(b'a').hexdigest(), 'md5'))
+        
+        assert job.status == 'failed'
+        assert job.error == 'Crack failed'
+        assert job.finished is not None
+    
+    def test_cancelled_while_building_cracker(self, manager):
+        """Test a job cancelled during cracker construction is cleaned up and never runs"""
+        building = threading.Event()
+        release = threading.Event()
+        cracker = Mock()
+        
+        def build(algorithm):
+            building.set()
+            release.wait(5)
+            return cracker
+        
+        with patch.dict('web.jobs.CRACKERS', {'basic': build}):
+            job = manager.submit(hashlib.md5(b'a').hexdigest(), 'md5')
+            assert building.wait(5)
+            assert manager.cancel(job.id).status == 'cancelled'
+            release.set()
+            manager.shutdown()
+        
+        assert job.status == 'cancelled'
+        cracker.crack_hash.assert_not_called()
+        cracker.cleanup.assert_called_once()
+    
+    def test_watch(self, manager):
+        """Test watching a job ends with its final state and progress"""
+        job = manager.submit(hashlib.md5(b'letmein123').hexdigest(), 'md5')
+        
+        states = [state for state in manager.watch(job.id, heartbeat=0.05) if state is not None]
+        
+        assert states[-1]['status'] == 'done'
+        assert states[-1]['password'] == 'letmein123'
+        assert states[-1]['progress']['phase'] == 'wordlist'
+        assert states[-1]['progress']['attempts'] == 3
+        assert list(manager.watch('unknown')) == []
+    
+    def test_retention(self, manager):
+        """Test finished jobs are forgotten after the retention period"""
+        job = wait_for(manager.submit(hashlib.md5(b'password1').hexdigest(), 'md5'))
+        manager.retention = 0
+        job.finished -= 1
+        
+        assert manager.list() == []
+        assert manager.get(job.id) is None
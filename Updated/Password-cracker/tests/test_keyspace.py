@@ -0,0 +1,150 @@
+"""
+Unit tests for keyspace.py
+"""
+import pytest
+import itertools
+
+from keyspace import Keyspace, Checkpoint, MASK_CHARSETS, parse_mask, mask_keyspaces
+from utils import SecurityError
+
+
+class TestKeyspace:
+    """Test suite for Keyspace class"""
+    
+    def test_size(self):
+        """Test keyspace size is the product of charset sizes"""
+        keyspace = Keyspace(['ab', '0123', 'xyz'])
+        assert keyspace.size == 2 * 4 * 3
+        assert Keyspace.uniform('abc', 4).size == 3 ** 4
+    
+    def test_empty_charset(self):
+        """Test empty keyspaces are rejected"""
+        with pytest.raises(SecurityError):
+            Keyspace([])
+        with pytest.raises(SecurityError):
+            Keyspace(['ab', ''])
+    
+    def test_candidate_and_index_round_trip(self):
+        """Test mixed-radix decoding matches itertools.product order"""
+        charsets = ['Aa', '0123', '!?', 'xyz']
+        keyspace = Keyspace(charsets)
+        full = [''.join(c) for c in itertools.product(*charsets)]
+        
+        for index, expected in enumerate(full):
+            assert keyspace.candidate(index) == expected
+            assert keyspace.index(expected) == index
+        
+        with pytest.raises(SecurityError):
+            keyspace.candidate(keyspace.size)
+        with pytest.raises(SecurityError):
+            keyspace.index('B0!x')
+    
+    def test_iter_range_matches_product_order(self):
+        """Test index ranges decode to the itertools.product ordering"""
+        keyspace = Keyspace.uniform('abcde', 5)
+        full = [''.join(c) for c in itertools.product('abcde', repeat=5)]
+        
+        for start, stop in [(0, len(full)), (7, 900), (124, 126), (3000, 5000), (10, 10)]:
+            assert list(keyspace.iter_range(start, stop)) == full[start:stop]
+    
+    def test_iter_short_keyspace(self):
+        """Test keyspaces shorter than the product block"""
+        assert list(Keyspace(['ab', 'cd'])) == ['ac', 'ad', 'bc', 'bd']
+
+
+class TestMask:
+    """Test suite for mask parsing"""
+    
+    def test_parse_mask(self):
+        """Test built-in charsets, literals and escapes"""
+        positions = parse_mask('?u?l?d?s!??')
+        
+        assert positions == [
+            MASK_CHARSETS['u'], MASK_CHARSETS['l'], MASK_CHARSETS['d'], MASK_CHARSETS['s'], '!', '?'
+        ]
+    
+    def test_custom_charsets(self):
+        """Test custom charsets expand built-ins without duplicates"""
+        positions = parse_mask('?1?2', ['?dab', 'xyx'])
+        
+        assert positions == ['0123456789ab', 'xy']
+    
+    def test_custom_charsets_by_position(self):
+        """Test a custom charset may be defined without the ones before it"""
+        assert parse_mask('?2', [None, 'ab']) == ['ab']
+        
+        with pytest.raises(SecurityError):
+            parse_mask('?1', [None, 'ab'])
+    
+    @pytest.mark.parametrize('mask', ['', '?l?', '?x', '?2', '?3'])
+    def test_invalid_mask(self, mask):
+        """Test malformed masks and undefined charsets are rejected"""
+        with pytest.raises(SecurityError):
+            parse_mask(mask, ['?d'])
+    
+    def test_mask_keyspace(self):
+        """Test a mask becomes one per-position keyspace"""
+        keyspaces = mask_keyspaces('?u?l?d?d!')
+        
+        assert len(keyspaces) == 1
+        assert keyspaces[0].size == 26 * 26 * 10 * 10
+        assert keyspaces[0].candidate(0) == 'Aa00!'
+    
+    def test_increment(self):
+        """Test increment mode yields every prefix from the minimum length"""
+        keyspaces = mask_keyspaces('?d?d?d?d', increment=True, min_length=2)
+        
+        assert [k.length for k in keyspaces] == [2, 3, 4]
+        assert [k.size for k in keyspaces] == [100, 1000, 10000]
+
+
+class TestCheckpoint:
+    """Test suite for Checkpoint class"""
+    
+    def test_save_and_load(self, tmp_path):
+        """Test progress round-trips through the checkpoint file"""
+        checkpoint = Checkpoint('abc123', 'md5', 'attack1', directory=tmp_path)
+        assert checkpoint.load() is None
+        
+        checkpoint.save(length=5, offset=1200)
+        state = checkpoint.load()
+        
+        assert state['length'] == 5
+        assert state['offset'] == 1200
+    
+    def test_context_saved_with_progress(self, tmp_path):
+        """Test context fields are written with every save"""
+        checkpoint = Checkpoint('abc123', 'md5', 'attack1', directory=tmp_path)
+        checkpoint.context['markov'] = [{'': 'ba'}]
+        
+        checkpoint.save(length=1, offset=1)
+        
+        assert checkpoint.load()['markov'] == [{'': 'ba'}]
+    
+    def test_mismatched_attack_ignored(self, tmp_path):
+        """Test a checkpoint from another attack configuration is ignored"""
+        Checkpoint('abc123', 'md5', 'attack1', directory=tmp_path).save(length=5, offset=10)
+        
+        assert Checkpoint('abc123', 'md5', 'attack2', directory=tmp_path).load() is None
+    
+    def test_attacks_kept_apart(self, tmp_path):
+        """Test attacks on the same target do not overwrite each other's progress"""
+        mask = Checkpoint('abc123', 'md5', 'mask:1', directory=tmp_path)
+        combinator = Checkpoint('abc123', 'md5', 'combinator:2', directory=tmp_path)
+        
+        mask.save(length=5, offset=10)
+        combinator.save(length=2, offset=99)
+        
+        assert mask.path != combinator.path
+        assert mask.load()['offset'] == 10
+        assert combinator.load()['offset'] == 99
+    
+    def test_clear(self, tmp_path):
+        """Test clearing removes saved progress"""
+        checkpoint = Checkpoint('abc123', 'md5', 'attack1', directory=tmp_path)
+        checkpoint.save(length=5, offset=10)
+        
+        checkpoint.clear()
+        checkpoint.clear()
+        
+        assert checkpoint.load() is None
@@ -0,0 +1,108 @@
+"""
+Unit tests for lookup_table.py
+"""
+import pytest
+import hashlib
+from unittest.mock import patch
+
+from lookup_table import LookupTable, build_lookup_table, open_lookup_tables, table_path
+from utils import SecurityError
+
+
+class TestLookupTable:
+    """Test suite for precomputed lookup tables"""
+    
+    @pytest.fixture
+    def table(self, tmp_path):
+        """Build a small sha256 lookup table"""
+        path = table_path('words', 'sha256', tmp_path)
+        build_lookup_table(path, iter(['password', 'letmein', 'password', 'sunshine']), 'sha256')
+        table = LookupTable(path)
+        yield table
+        table.close()
+    
+    def test_lookup(self, table):
+        """Test every precomputed word is found by its hash"""
+        for word in ['password', 'letmein', 'sunshine']:
+            assert table.lookup(hashlib.sha256(word.encode()).hexdigest()) == word
+    
+    def test_lookup_uppercase_hex(self, table):
+        """Test uppercase hex hashes are found"""
+        assert table.lookup(hashlib.sha256(b'letmein').hexdigest().upper()) == 'letmein'
+    
+    def test_lookup_missing(self, table):
+        """Test unknown, malformed and wrong-size hashes are not found"""
+        assert table.lookup(hashlib.sha256(b'unknown').hexdigest()) is None
+        assert table.lookup('not hex') is None
+        assert table.lookup(hashlib.md5(b'password').hexdigest()) is None
+    
+    def test_duplicates_removed(self, table):
+        """Test repeated words are stored once"""
+        assert len(table) == 3
+        assert table.algorithm == 'sha256'
+    
+    @patch('extsort.SORT_RUN_RECORDS', 7)
+    def test_build_spills_sorted_runs(self, tmp_path):
+        """Test tables larger than one sort run are built from runs on disk"""
+        words = [f'word{i % 50}' for i in range(200)]
+        path = table_path('big', 'md5', tmp_path)
+        
+        assert build_lookup_table(path, iter(words), 'md5') == 50
+        
+        table = LookupTable(path)
+        try:
+            for i in range(50):
+                assert table.lookup(hashlib.md5(f'word{i}'.encode()).hexdigest()) == f'word{i}'
+        finally:
+            table.close()
+        assert not list(tmp_path.glob('.sort-*'))
+    
+    def test_mismatched_words_not_returned(self, tmp_path):
+        """Test a words file from another build never yields a wrong plaintext"""
+        path = table_path('words', 'md5', tmp_path)
+        build_lookup_table(path, ['password', 'letmein'], 'md5')
+        stale = path.read_bytes()
+        build_lookup_table(path, ['letmein', 'password', 'sunshine'], 'md5')
+        path.write_bytes(stale)
+        
+        table = LookupTable(path)
+        try:
+            assert table.lookup(hashlib.md5(b'password').hexdigest()) is None
+            assert table.lookup(hashlib.md5(b'letmein').hexdigest()) is None
+        finally:
+            table.close()
+    
+    def test_failed_rebuild_keeps_table(self, tmp_path):
+        """Test a rebuild that fails leaves the previous table and words in place"""
+        path = table_path('words', 'md5', tmp_path)
+        build_lookup_table(path, ['password'], 'md5')
+        
+        def failing():
+            yield 'letmein'
+            raise OSError('disk full')
+        
+        with pytest.raises(SecurityError):
+            build_lookup_table(path, failing(), 'md5')
+        
+        table = LookupTable(path)
+        try:
+            assert table.lookup(hashlib.md5(b'password').hexdigest()) == 'password'
+        finally:
+            table.close()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['words_md5.lut', 'words_md5.words']
+    
+    def test_salted_algorithm(self, tmp_path):
+        """Test bcrypt tables are rejected"""
+        with pytest.raises(SecurityError):
+            build_lookup_table(tmp_path / 'words_bcrypt.lut', ['password'], 'bcrypt')
+    
+    def test_open_lookup_tables(self, tmp_path):
+        """Test only valid tables for the algorithm are opened"""
+        build_lookup_table(table_path('a', 'md5', tmp_path), ['password'], 'md5')
+        build_lookup_table(table_path('b', 'sha1', tmp_path), ['password'], 'sha1')
+        table_path('corrupt', 'md5', tmp_path).write_bytes(b'garbage')
+        
+        tables = open_lookup_tables('md5', tmp_path)
+        
+        assert [table.path.name for table in tables] == ['a_md5.lut']
+        tables[0].close()
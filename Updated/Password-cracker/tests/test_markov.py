@@ -0,0 +1,110 @@
+"""
+Unit tests for markov.py
+"""
+import pytest
+
+from markov import MarkovModel, MarkovKeyspace
+from utils import SecurityError
+
+
+class TestMarkovModel:
+    """Test suite for MarkovModel class"""
+    
+    def test_empty_charset(self):
+        """Test an empty charset is rejected"""
+        with pytest.raises(SecurityError):
+            MarkovModel('')
+    
+    def test_ordered_by_transitions(self):
+        """Test characters are ranked by how often they follow the previous one"""
+        model = MarkovModel('abc0').train(['cab0', 'cb', 'ca0', 'Xa'])
+        
+        assert model.trained == 4
+        assert model.ordered(0, '') == 'cab0'
+        assert model.ordered(1, 'c') == 'abc0'
+        assert model.ordered(1, 'X') == 'abc0'
+        assert model.ordered(3, 'b') == '0acb'
+    
+    def test_untrained_keeps_charset_order(self):
+        """Test an untrained model falls back to charset order"""
+        model = MarkovModel('abc')
+        
+        assert model.ordered(3, 'a') == 'abc'
+        assert list(model.keyspace(2)) == [a + b for a in 'abc' for b in 'abc']
+    
+    def test_keyspace_threshold(self):
+        """Test a threshold keeps only the likeliest characters"""
+        model = MarkovModel('abcd').train(['dc', 'dc', 'db'])
+        keyspace = model.keyspace(2, threshold=2)
+        
+        assert keyspace.size == 4
+        assert list(keyspace)[:2] == ['dc', 'db']
+    
+    def test_copy_is_independent(self):
+        """Test training a copy leaves the original model unchanged"""
+        model = MarkovModel('ab').train(['ab'])
+        
+        copy = model.copy().train(['ba', 'ba'])
+        
+        assert copy.trained == 3
+        assert copy.ordered(0, '') == 'ba'
+        assert model.trained == 1
+        assert model.ordered(0, '') == 'ab'
+
+
+class TestMarkovKeyspace:
+    """Test suite for MarkovKeyspace class"""
+    
+    @pytest.fixture
+    def keyspace(self):
+        """Create a trained three-character keyspace"""
+        model = MarkovModel('abc01').train(['ab1', 'ba0', 'ab0', 'c10'])
+        return model.keyspace(3)
+    
+    def test_bijection(self, keyspace):
+        """Test every index maps to a distinct candidate and back"""
+        candidates = [keyspace.candidate(i) for i in range(keyspace.size)]
+        
+        assert keyspace.size == 5 ** 3
+        assert len(set(candidates)) == keyspace.size
+        for index, candidate in enumerate(candidates):
+            assert keyspace.index(candidate) == index
+    
+    def test_likeliest_first(self, keyspace):
+        """Test the most frequent training word comes first"""
+        assert keyspace.candidate(0) == 'ab0'
+    
+    def test_iter_range_matches_candidates(self, keyspace):
+        """Test ranges agree with candidate at every boundary"""
+        full = list(keyspace)
+        
+        for start, stop in [(0, 1), (3, 17), (4, 5), (24, 26), (100, 500)]:
+            assert list(keyspace.iter_range(start, stop)) == full[start:stop]
+    
+    def test_out_of_range(self, keyspace):
+        """Test invalid indexes and candidates are rejected"""
+        with pytest.raises(SecurityError):
+            keyspace.candidate(keyspace.size)
+        with pytest.raises(SecurityError):
+            keyspace.index('abz')
+        with pytest.raises(SecurityError):
+            keyspace.index('ab')
+    
+    def test_prefix_matches_shorter_keyspace(self):
+        """Test a prefix ranks candidates like a keyspace built at that length"""
+        model = MarkovModel('abc01').train(['ab1', 'ba0', 'ab0', 'c10'])
+        
+        assert list(model.keyspace(3).prefix(2)) == list(model.keyspace(2))
+    
+    def test_describe_depends_on_order(self):
+        """Test differently trained keyspaces have different descriptions"""
+        first = MarkovModel('ab').train(['ab']).keyspace(2)
+        second = MarkovModel('ab').train(['ba']).keyspace(2)
+        
+        assert first.describe() != second.describe()
+        assert first.describe() == MarkovModel('ab').train(['ab']).keyspace(2).describe()
+    
+    def test_unequal_widths(self):
+        """Test positions must offer the same number of choices"""
+        with pytest.raises(SecurityError):
+            MarkovKeyspace([{'': 'ab'}, {'a': 'ab', 'b': 'a'}])
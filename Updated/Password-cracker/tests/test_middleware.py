@@ -0,0 +1,224 @@
+"""
+Unit tests for web/middleware.py
+"""
+import threading
+import pytest
+from flask import Flask
+
+from web.middleware import (
+    SWEEP_EVERY, CachedBlacklist, SQLiteBlacklist, SQLiteRateLimiter, SQLiteState, SecurityMiddleware,
+    SlidingWindowLimiter, create_state_stores
+)
+
+
+class TestSlidingWindowLimiter:
+    """Test suite for SlidingWindowLimiter class"""
+    
+    def test_limit_within_window(self):
+        """Test requests beyond the limit are refused and not counted"""
+        limiter = SlidingWindowLimiter()
+        
+        assert all(limiter.allow('1.2.3.4', 3, 60, now=0.0) for _ in range(3))
+        assert not limiter.allow('1.2.3.4', 3, 60, now=1.0)
+        assert limiter.allow('5.6.7.8', 3, 60, now=1.0)
+    
+    def test_cost(self):
+        """Test a request may count as several against the limit"""
+        limiter = SlidingWindowLimiter()
+        
+        assert limiter.allow('ip', 10, 60, now=0.0, cost=8)
+        assert not limiter.allow('ip', 10, 60, now=0.0, cost=3)
+        assert limiter.allow('ip', 10, 60, now=0.0, cost=2)
+        assert not limiter.allow('ip', 10, 60, now=0.0)
+    
+    def test_sliding_window(self):
+        """Test the previous window counts in proportion to its overlap"""
+        limiter = SlidingWindowLimiter()
+        for _ in range(10):
+            limiter.allow('ip', 10, 60, now=30.0)
+        
+        # A quarter into the next window, 7.5 of the previous 10 still count
+        assert sum(limiter.allow('ip', 10, 60, now=75.0) for _ in range(10)) == 2
+        # Two windows later the old requests no longer count
+        assert sum(limiter.allow('ip', 10, 60, now=200.0) for _ in range(20)) == 10
+    
+    def test_bounded_clients(self):
+        """Test the least recently seen clients are forgotten beyond capacity"""
+        limiter = SlidingWindowLimiter(max_tracked=3)
+        for ip in ('a', 'b', 'c'):
+            limiter.allow(ip, 10, 60, now=0.0)
+        limiter.allow('a', 10, 60, now=1.0)
+        limiter.allow('d', 10, 60, now=2.0)
+        
+        assert len(limiter) == 3
+        assert 'b' not in limiter
+        assert 'a' in limiter
+    
+    def test_idle_clients_expire(self):
+        """Test clients idle for two windows are forgotten"""
+        limiter = SlidingWindowLimiter()
+        limiter.allow('old', 10, 60, now=0.0)
+        limiter.allow('new', 10, 60, now=130.0)
+        
+        assert 'old' not in limiter
+        assert len(limiter) == 1
+    
+    def test_thread_safety(self):
+        """Test concurrent requests never exceed the limit"""
+        limiter = SlidingWindowLimiter()
+        allowed = []
+        
+        def hammer():
+            allowed.extend(limiter.allow('ip', 500, 60, now=10.0) for _ in range(200))
+        
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sum(allowed) == 500
+
+
+class TestSharedState:
+    """Test suite for the SQLite state backend"""
+    
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Path of a state database shared by several workers"""
+        return tmp_path / 'security.db'
+    
+    def test_limit_shared_between_workers(self, db_path):
+        """Test every worker counts against the same limit"""
+        workers = [SQLiteRateLimiter(SQLiteState(db_path)) for _ in range(3)]
+        
+        allowed = [worker.allow('1.2.3.4', 10, 60, now=5.0) for _ in range(5) for worker in workers]
+        
+        assert sum(allowed) == 10
+        assert workers[0].allow('5.6.7.8', 10, 60, now=5.0)
+    
+    def test_sliding_window(self, db_path):
+        """Test the SQLite limiter matches the in-memory one"""
+        memory = SlidingWindowLimiter()
+        shared = SQLiteRateLimiter(SQLiteState(db_path))
+        
+        for now in (30.0, 30.0, 75.0, 75.0, 75.0, 100.0, 200.0, 200.0):
+            assert shared.allow('ip', 2, 60, now=now) == memory.allow('ip', 2, 60, now=now)
+    
+    def test_cost(self, db_path):
+        """Test the SQLite limiter charges request costs"""
+        limiter = SQLiteRateLimiter(SQLiteState(db_path))
+        
+        assert limiter.allow('ip', 10, 60, now=0.0, cost=8)
+        assert not limiter.allow('ip', 10, 60, now=0.0, cost=3)
+        assert limiter.allow('ip', 10, 60, now=0.0, cost=2)
+        assert not limiter.allow('ip', 10, 60, now=0.0)
+    
+    def test_sweep_and_clear(self, db_path):
+        """Test idle and excess clients are forgotten"""
+        limiter = SQLiteRateLimiter(SQLiteState(db_path), max_tracked=100)
+        for i in range(SWEEP_EVERY):
+            limiter.allow(f'10.0.0.{i}', 10, 60, now=0.0 if i < 50 else 200.0 + i / 1000)
+        
+        assert len(limiter) == 100
+        assert '10.0.0.0' not in limiter
+        assert f'10.0.0.{SWEEP_EVERY - 101}' not in limiter
+        assert f'10.0.0.{SWEEP_EVERY - 1}' in limiter
+        
+        limiter.clear()
+        assert len(limiter) == 0
+    
+    def test_blacklist_shared_between_workers(self, db_path):
+        """Test blocking an IP on one worker blocks it on the others"""
+        first = SQLiteBlacklist(SQLiteState(db_path), refresh=0)
+        second = SQLiteBlacklist(SQLiteState(db_path), refresh=60)
+        assert '1.2.3.4' not in second
+        
+        first.add('1.2.3.4')
+        assert '1.2.3.4' in first
+        # The other worker sees it once its cached copy expires
+        assert '1.2.3.4' not in second
+        second._loaded = float('-inf')
+        assert '1.2.3.4' in second
+        
+        second.discard('1.2.3.4')
+        assert '1.2.3.4' not in first
+        assert len(second) == 0
+    
+    def test_blacklist_backend_must_implement_storage(self):
+        """Test a blacklist backend without storage methods cannot be created"""
+        class ReadOnlyBlacklist(CachedBlacklist):
+            def _load(self):
+                return set()
+        
+        with pytest.raises(TypeError):
+            CachedBlacklist()
+        with pytest.raises(TypeError):
+            ReadOnlyBlacklist()
+    
+    def test_create_state_stores(self, db_path):
+        """Test backends are built from settings"""
+        store, blacklist = create_state_stores({'backend': 'memory'}, max_tracked=5)
+        assert isinstance(store, SlidingWindowLimiter) and store.max_tracked == 5
+        assert isinstance(blacklist, set)
+        
+        store, blacklist = create_state_stores({'backend': 'sqlite', 'path': str(db_path)})
+        assert isinstance(store, SQLiteRateLimiter)
+        assert isinstance(blacklist, SQLiteBlacklist)
+        
+        with pytest.raises(ValueError):
+            create_state_stores({'backend': 'unknown'})
+
+
+class TestSecurityHeaders:
+    """Test suite for the precomputed security headers"""
+    
+    @pytest.fixture
+    def security(self):
+        """Create an app with one default view and one overriding view"""
+        app = Flask(__name__)
+        security = SecurityMiddleware(app)
+        
+        @app.route('/plain')
+        def plain():
+            return 'plain'
+        
+        @app.route('/embeddable')
+        @security.override_headers({'X-Frame-Options': 'SAMEORIGIN', 'Permissions-Policy': None})
+        def embeddable():
+            return 'embeddable'
+        
+        return security
+    
+    def test_default_headers(self, security):
+        """Test every response carries the security headers"""
+        response = security.app.test_client().get('/plain')
+        
+        assert response.headers['X-Frame-Options'] == 'DENY'
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+        assert "default-src 'self'" in response.headers['Content-Security-Policy']
+    
+    def test_route_overrides(self, security):
+        """Test a view's overrides replace or drop headers for that view only"""
+        client = security.app.test_client()
+        
+        response = client.get('/embeddable')
+        assert response.headers['X-Frame-Options'] == 'SAMEORIGIN'
+        assert 'Permissions-Policy' not in response.headers
+        assert response.headers['X-Content-Type-Options'] == 'nosniff'
+        
+        assert client.get('/plain').headers['X-Frame-Options'] == 'DENY'
+    
+    def test_policy_update_rebuilds_headers(self, security):
+        """Test the cached headers follow update_csp_policy"""
+        client = security.app.test_client()
+        block = security._security_headers()
+        assert client.get('/embeddable').headers['Content-Security-Policy'] == block[0][1]
+        
+        security.update_csp_policy({'img-src': ['https://example.com'], 'manifest-src': ["'self'"]})
+        
+        for path in ('/plain', '/embeddable'):
+            csp = client.get(path).headers['Content-Security-Policy']
+            assert 'https://example.com' in csp
+            assert "manifest-src 'self'" in csp
+        assert security._security_headers() is security._security_headers()
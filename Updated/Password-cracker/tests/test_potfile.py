@@ -0,0 +1,84 @@
+"""
+Unit tests for potfile.py
+"""
+import pytest
+import multiprocessing
+
+from potfile import Potfile
+
+
+def _write_entries(path, start, count):
+    """Add entries to a shared potfile from a child process"""
+    potfile = Potfile(path)
+    for i in range(start, start + count):
+        potfile.add('md5', f"{i:032x}", f"password{i}")
+    potfile.close()
+
+
+class TestPotfile:
+    """Test suite for Potfile class"""
+    
+    @pytest.fixture
+    def potfile(self, tmp_path):
+        """Create an empty potfile"""
+        potfile = Potfile(tmp_path / 'potfile.db')
+        yield potfile
+        potfile.close()
+    
+    def test_add_and_get(self, potfile):
+        """Test a cracked hash is found case-insensitively"""
+        potfile.add('md5', 'ABCDEF0123456789ABCDEF0123456789', 'password1')
+        
+        assert potfile.get('md5', 'abcdef0123456789abcdef0123456789') == 'password1'
+        assert potfile.get('sha1', 'abcdef0123456789abcdef0123456789') is None
+        assert len(potfile) == 1
+    
+    def test_add_keeps_first(self, potfile):
+        """Test re-adding a hash keeps the original entry"""
+        potfile.add('md5', 'a' * 32, 'first')
+        potfile.add('md5', 'a' * 32, 'second')
+        
+        assert potfile.get('md5', 'a' * 32) == 'first'
+    
+    def test_bcrypt_case_sensitive(self, potfile):
+        """Test bcrypt hashes are stored as is"""
+        target = '$2b$04$abcdefghijklmnopqrstuuABCDEFGHIJKLMNOPQRSTUVWXYZ01234'
+        potfile.add('bcrypt', target, 'password1')
+        
+        assert potfile.get('bcrypt', target) == 'password1'
+        assert potfile.get('bcrypt', target.lower()) is None
+    
+    def test_get_many(self, potfile):
+        """Test bulk lookups return only known hashes under their original spelling"""
+        for i in range(1200):
+            potfile.add('md5', f"{i:032x}", f"password{i}")
+        wanted = [f"{i:032X}" for i in range(0, 1500, 3)]
+        
+        found = potfile.get_many('md5', wanted)
+        
+        assert len(found) == 400
+        assert f"{1497:032X}" not in found
+        assert found[f"{3:032X}"] == 'password3'
+    
+    def test_persistence(self, tmp_path):
+        """Test entries survive reopening"""
+        Potfile(tmp_path / 'pot.db').add('sha256', 'b' * 64, 'password1')
+        
+        assert Potfile(tmp_path / 'pot.db').get('sha256', 'b' * 64) == 'password1'
+    
+    def test_concurrent_writers(self, tmp_path):
+        """Test several processes can write the same potfile"""
+        path = tmp_path / 'shared.db'
+        Potfile(path).close()
+        
+        workers = [
+            multiprocessing.Process(target=_write_entries, args=(path, i * 100, 100))
+            for i in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert len(Potfile(path)) == 400
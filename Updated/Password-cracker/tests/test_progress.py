@@ -0,0 +1,99 @@
+"""
+Unit tests for progress.py
+"""
+import io
+import time
+import pytest
+
+from basic_cracker import BasicCracker
+from progress import ProgressReporter, format_progress, live_progress, terminal_progress
+
+
+class TestProgressReporter:
+    """Test suite for ProgressReporter class"""
+    
+    @pytest.fixture
+    def cracker(self):
+        """Create a cracker to observe"""
+        return BasicCracker('md5')
+    
+    def test_snapshot(self, cracker):
+        """Test rate, percent and ETA are derived from the phase"""
+        reporter = ProgressReporter(cracker, lambda snapshot: None)
+        reporter.start()
+        reporter.stop()
+        
+        cracker.begin_phase('brute force', total=1000, done=100)
+        cracker.count_attempts(400)
+        snapshot = reporter.snapshot()
+        
+        assert snapshot['phase'] == 'brute force'
+        assert snapshot['attempts'] == 400
+        assert snapshot['rate'] > 0
+        assert snapshot['percent'] == 50.0
+        assert snapshot['eta'] == pytest.approx(500 / snapshot['rate'], abs=0.1)
+        assert snapshot['found'] is False
+    
+    def test_unknown_total(self, cracker):
+        """Test phases of unknown size report no percent or ETA"""
+        cracker.begin_phase('wordlist')
+        cracker.count_attempts(10)
+        snapshot = ProgressReporter(cracker, lambda snapshot: None).snapshot()
+        
+        assert snapshot['percent'] is None
+        assert snapshot['eta'] is None
+    
+    def test_publishes_until_stopped(self, cracker):
+        """Test snapshots are published periodically and once more on stop"""
+        snapshots = []
+        
+        with ProgressReporter(cracker, snapshots.append, interval=0.01):
+            cracker.count_attempts(5)
+            time.sleep(0.1)
+            cracker.count_attempts(5)
+        
+        assert len(snapshots) >= 2
+        assert snapshots[-1]['attempts'] == 10
+    
+    def test_callback_errors_are_contained(self, cracker):
+        """Test a failing callback does not stop the reporter"""
+        def broken(snapshot):
+            raise ValueError("broken")
+        
+        reporter = ProgressReporter(cracker, broken, interval=0.01).start()
+        time.sleep(0.05)
+        reporter.stop()
+
+
+class TestProgressOutput:
+    """Test suite for progress formatting"""
+    
+    def test_format_progress(self):
+        """Test the one-line status includes every known figure"""
+        line = format_progress({
+            'phase': 'mask (length 6)', 'attempts': 1234567, 'rate': 250000.0,
+            'percent': 12.5, 'eta': 3725.0, 'elapsed': 5.0, 'found': False
+        })
+        
+        assert line == 'mask (length 6) | 1,234,567 tried | 250,000/s | 12.50% | ETA 01:02:05'
+    
+    def test_terminal_progress(self):
+        """Test the live line is redrawn in place"""
+        stream = io.StringIO()
+        draw = terminal_progress(stream)
+        snapshot = {'phase': 'wordlist', 'attempts': 5, 'rate': 1.0, 'percent': None, 'eta': None}
+        
+        draw(snapshot)
+        draw(dict(snapshot, phase='patterns'))
+        
+        assert stream.getvalue().count('\r') == 2
+        assert '\n' not in stream.getvalue()
+    
+    def test_live_progress_needs_terminal(self):
+        """Test nothing is drawn when the stream is not a terminal"""
+        stream = io.StringIO()
+        
+        with live_progress(BasicCracker('md5'), stream=stream) as reporter:
+            assert reporter is None
+        
+        assert stream.getvalue() == ''
@@ -0,0 +1,115 @@
+"""
+Unit tests for rules.py
+"""
+import pytest
+
+from rules import RuleEngine, compile_rule
+from utils import SecurityError
+
+
+class TestCompileRule:
+    """Test suite for rule compilation"""
+    
+    @pytest.mark.parametrize('rule,word,expected', [
+        (':', 'Password', 'Password'),
+        ('l', 'PassWord', 'password'),
+        ('u', 'password', 'PASSWORD'),
+        ('c', 'pASSWORD', 'Password'),
+        ('C', 'password', 'pASSWORD'),
+        ('t', 'PassWord', 'pASSwORD'),
+        ('T0', 'password', 'Password'),
+        ('r', 'abc', 'cba'),
+        ('d', 'abc', 'abcabc'),
+        ('f', 'abc', 'abccba'),
+        ('{', 'abc', 'bca'),
+        ('}', 'abc', 'cab'),
+        ('[', 'abc', 'bc'),
+        (']', 'abc', 'ab'),
+        ('D1', 'abc', 'ac'),
+        ("'2", 'abc', 'ab'),
+        ('$1 $2', 'abc', 'abc12'),
+        ('^x', 'abc', 'xabc'),
+        ('sa@', 'banana', 'b@n@n@'),
+        ('@a', 'banana', 'bnn'),
+        ('l sa@ $!', 'BANANA', 'b@n@n@!'),
+        ('$ ', 'abc', 'abc '),
+    ])
+    def test_functions(self, rule, word, expected):
+        """Test each rule function"""
+        value = word
+        for _, func in compile_rule(rule):
+            value = func(value)
+        assert value == expected
+    
+    @pytest.mark.parametrize('rule', ['', 'x', '$', 'sa', 'T?'])
+    def test_invalid_rules(self, rule):
+        """Test invalid rules are rejected"""
+        with pytest.raises(SecurityError):
+            compile_rule(rule)
+
+
+class TestRuleEngine:
+    """Test suite for RuleEngine class"""
+    
+    def test_apply_drops_duplicates(self):
+        """Test duplicate variants of a word are yielded once"""
+        engine = RuleEngine([':', 'l', 'l sz2', '$1'])
+        
+        variants = list(engine.apply('abc'))
+        
+        assert variants == ['abc', 'abc1']
+        assert engine.generated == 2
+        assert engine.duplicates == 2
+    
+    def test_stats_when_stopped_early(self):
+        """Test stats count the variants produced before iteration stops"""
+        engine = RuleEngine([':', 'l', 'l sz2', '$1'])
+        variants = engine.apply('abc')
+        
+        assert next(variants) == 'abc'
+        assert (engine.generated, engine.duplicates) == (1, 0)
+        assert next(variants) == 'abc1'
+        assert (engine.generated, engine.duplicates) == (2, 1)
+        assert list(variants) == []
+        assert (engine.generated, engine.duplicates) == (2, 2)
+    
+    def test_skips_comments_and_invalid_rules(self):
+        """Test comments, blank lines and invalid rules are skipped"""
+        engine = RuleEngine(['# comment', '', 'u', 'bogus!', '$1'])
+        
+        assert engine.rules == ['u', '$1']
+    
+    def test_stream_is_lazy(self):
+        """Test variants are generated as words are consumed"""
+        def words():
+            yield 'abc'
+            raise AssertionError('consumed too far')
+        
+        stream = RuleEngine([':', 'u']).stream(words())
+        
+        assert next(stream) == 'abc'
+        assert next(stream) == 'ABC'
+    
+    def test_record_hit(self):
+        """Test cracked candidates are attributed to their rule"""
+        engine = RuleEngine([':', 'c $1', 'u'])
+        list(engine.stream(['alpha', 'bravo']))
+        
+        assert engine.record_hit('Bravo1') == 'c $1'
+        assert engine.record_hit('unknown') is None
+        assert engine.stats()['hits'] == {'c $1': 1}
+    
+    def test_from_file(self, tmp_path):
+        """Test loading rules from a file"""
+        rules_file = tmp_path / 'test.rule'
+        rules_file.write_text("# test rules\n:\n$!\n")
+        
+        engine = RuleEngine.from_file(rules_file)
+        
+        assert len(engine) == 2
+        assert list(engine.apply('abc')) == ['abc', 'abc!']
+    
+    def test_from_missing_file(self, tmp_path):
+        """Test loading a missing rule file fails"""
+        with pytest.raises(SecurityError):
+            RuleEngine.from_file(tmp_path / 'missing.rule')
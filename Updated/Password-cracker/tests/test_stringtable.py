@@ -0,0 +1,171 @@
+"""
+Unit tests for stringtable.py
+"""
+import os
+import threading
+import pytest
+
+from stringtable import StringTable, CachedTables, temp_path, write_string_table
+from utils import SecurityError
+
+
+class TestStringTable:
+    """Test suite for string table files"""
+    
+    def test_round_trip(self, tmp_path):
+        """Test entries are read back in order"""
+        path = tmp_path / 'words.tbl'
+        entries = ['password', 'letmein', '', 'sunshine', 'pässwörd']
+        
+        assert write_string_table(path, iter(entries)) == len(entries)
+        table = StringTable(path)
+        
+        assert len(table) == len(entries)
+        assert list(table) == entries
+        assert table[1] == 'letmein'
+        assert table[-1] == 'pässwörd'
+        assert bytes(table.entry(0)) == b'password'
+        assert not table.sorted
+        table.close()
+    
+    def test_iter_range(self, tmp_path):
+        """Test ranges are clamped to the table"""
+        path = tmp_path / 'words.tbl'
+        write_string_table(path, ['a', 'bb', 'ccc', 'dddd'])
+        table = StringTable(path)
+        
+        assert list(table.iter_range(1, 3)) == ['bb', 'ccc']
+        assert list(table.iter_range(-2, 2)) == ['a', 'bb']
+        assert list(table.iter_range(3, 10)) == ['dddd']
+        assert list(table.iter_range(3, 1)) == []
+        table.close()
+    
+    def test_sorted_membership(self, tmp_path):
+        """Test binary-search membership on sorted tables"""
+        path = tmp_path / 'sorted.tbl'
+        entries = sorted({'delta', 'alpha', 'charlie', 'bravo', 'echo'})
+        write_string_table(path, entries, sorted_=True)
+        
+        table = StringTable(path)
+        
+        assert table.sorted
+        for entry in entries:
+            assert entry in table
+        assert 'foxtrot' not in table
+        assert 'alph' not in table
+        assert 42 not in table
+    
+    def test_unsorted_membership(self, tmp_path):
+        """Test membership falls back to a scan on unsorted tables"""
+        path = tmp_path / 'unsorted.tbl'
+        write_string_table(path, ['zulu', 'alpha'])
+        
+        table = StringTable(path)
+        
+        assert 'alpha' in table
+        assert 'bravo' not in table
+    
+    def test_empty_table(self, tmp_path):
+        """Test an empty table"""
+        path = tmp_path / 'empty.tbl'
+        write_string_table(path, [], sorted_=True)
+        
+        table = StringTable(path)
+        
+        assert len(table) == 0
+        assert list(table) == []
+        assert 'anything' not in table
+    
+    def test_invalid_file(self, tmp_path):
+        """Test opening a file that is not a string table"""
+        path = tmp_path / 'bogus.tbl'
+        path.write_bytes(b'not a table at all, just some bytes')
+        
+        with pytest.raises(SecurityError):
+            StringTable(path)
+
+
+    def test_concurrent_writers(self, tmp_path):
+        """Test threads writing the same table never share a temporary file"""
+        path = tmp_path / "table.bin"
+        barrier = threading.Barrier(2)
+        
+        def entries(prefix):
+            yield f"{prefix}-first"
+            barrier.wait(5)
+            yield f"{prefix}-second"
+        
+        threads = [
+            threading.Thread(target=write_string_table, args=(path, entries(prefix)))
+            for prefix in ('a', 'b')
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        table = StringTable(path)
+        assert list(table) in (['a-first', 'a-second'], ['b-first', 'b-second'])
+        table.close()
+        assert temp_path(path) != temp_path(path)
+        assert [p.name for p in tmp_path.iterdir()] == ['table.bin']
+
+
+class TestCachedTables:
+    """Test suite for CachedTables class"""
+    
+    def test_built_lazily_and_cached(self, tmp_path):
+        """Test tables are built on first access and reused from disk"""
+        calls = []
+        
+        def build():
+            calls.append(1)
+            return ['b', 'a', 'b']
+        
+        tables = CachedTables({'letters': build}, tmp_path)
+        assert calls == []
+        
+        assert list(tables['letters']) == ['a', 'b']
+        assert 'a' in tables['letters']
+        assert len(calls) == 1
+        
+        # A new instance maps the cached file without rebuilding
+        again = CachedTables({'letters': build}, tmp_path)
+        assert list(again['letters']) == ['a', 'b']
+        assert len(calls) == 1
+    
+    def test_rebuilt_when_source_changes(self, tmp_path):
+        """Test tables are rebuilt when their source file is newer"""
+        source = tmp_path / 'words.txt'
+        source.write_text("alpha\n")
+        
+        def build():
+            return source.read_text().split()
+        
+        tables = CachedTables({'words': build}, tmp_path, sources={'words': source})
+        assert list(tables['words']) == ['alpha']
+        
+        source.write_text("bravo\n")
+        cached = next(tmp_path.glob('words_v1.tbl'))
+        stamp = cached.stat().st_mtime
+        os.utime(source, (stamp + 10, stamp + 10))
+        
+        tables = CachedTables({'words': build}, tmp_path, sources={'words': source})
+        assert list(tables['words']) == ['bravo']
+    
+    def test_close(self, tmp_path):
+        """Test closing releases loaded tables and later access maps them again"""
+        tables = CachedTables({'letters': lambda: ['a']}, tmp_path)
+        first = tables['letters']
+        
+        tables.close()
+        
+        with pytest.raises(ValueError):
+            first[0]
+        assert list(tables['letters']) == ['a']
+        tables.close()
+    
+    def test_unknown_table(self, tmp_path):
+        """Test unknown table names raise KeyError"""
+        with pytest.raises(KeyError):
+            CachedTables({}, tmp_path)['missing']
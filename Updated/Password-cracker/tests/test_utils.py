@@ -0,0 +1,187 @@
+"""
+Unit tests for utils.py
+"""
+import pytest
+from unittest.mock import patch
+import hashlib
+import bcrypt
+import threading
+import time
+
+from utils import SecurityError, ShardedCounter, TokenBucket, hash_many, process_context, verify_many
+
+
+class TestHashMany:
+    """Test suite for batch hashing"""
+    
+    @pytest.mark.parametrize('algorithm', ['md5', 'sha1', 'sha256', 'sha512'])
+    def test_raw_digests(self, algorithm):
+        """Test digests match hashlib for each algorithm"""
+        passwords = ['password', 'letmein', '']
+        
+        digests = hash_many(passwords, algorithm)
+        
+        assert digests == [hashlib.new(algorithm, p.encode()).digest() for p in passwords]
+    
+    def test_buffer_input(self):
+        """Test a newline-separated buffer is split into candidates"""
+        digests = hash_many(b'alpha\nbravo\r\ncharlie', 'md5')
+        
+        assert digests == [hashlib.md5(w).digest() for w in (b'alpha', b'bravo', b'charlie')]
+    
+    def test_threads_preserve_order(self):
+        """Test threaded hashing returns digests in input order"""
+        passwords = [f'password{i}' for i in range(101)]
+        
+        assert hash_many(passwords, 'sha256', threads=4) == hash_many(passwords, 'sha256')
+    
+    def test_bcrypt(self):
+        """Test bcrypt hashes verify against their passwords"""
+        hashes = hash_many(['secret'], 'bcrypt')
+        
+        assert bcrypt.checkpw(b'secret', hashes[0])
+    
+    @pytest.mark.parametrize('algorithm', ['rot13', 'shake_128', 'sha3_256'])
+    def test_unsupported_algorithm(self, algorithm):
+        """Test algorithms outside SUPPORTED_HASHES are rejected"""
+        with pytest.raises(SecurityError):
+            hash_many(['password'], algorithm)
+
+
+class TestVerifyMany:
+    """Test suite for batch verification"""
+    
+    def test_first_match_index(self):
+        """Test the index of the matching candidate is returned"""
+        target = hashlib.sha256(b'letmein').hexdigest()
+        
+        assert verify_many(['password', 'letmein', 'admin'], target) == 1
+        assert verify_many(['password', 'admin'], target) is None
+    
+    def test_uppercase_hash(self):
+        """Test hex hashes are matched case-insensitively"""
+        target = hashlib.md5(b'admin').hexdigest().upper()
+        
+        assert verify_many(['admin'], target, 'md5') == 0
+    
+    def test_invalid_hash(self):
+        """Test non-hex hashes are rejected"""
+        with pytest.raises(SecurityError):
+            verify_many(['password'], 'not_a_hash', 'md5')
+    
+    @pytest.mark.parametrize('threads', [0, 3])
+    def test_bcrypt(self, threads):
+        """Test bcrypt verification with and without threads"""
+        target = bcrypt.hashpw(b'admin', bcrypt.gensalt(4)).decode()
+        
+        assert verify_many(['password', 'letmein', 'admin', 'qwerty'], target, 'bcrypt', threads) == 2
+    
+    def test_bcrypt_stops_after_match(self):
+        """Test threaded bcrypt verification stops checking once a match is found"""
+        target = bcrypt.hashpw(b'admin', bcrypt.gensalt(4)).decode()
+        passwords = ['admin'] + [f'password{i}' for i in range(39)]
+        checkpw = bcrypt.checkpw
+        calls = []
+        
+        def counting_checkpw(password, hashed):
+            calls.append(password)
+            return checkpw(password, hashed)
+        
+        with patch('utils.bcrypt.checkpw', counting_checkpw):
+            assert verify_many(passwords, target, 'bcrypt', threads=2) == 0
+        
+        assert len(calls) < len(passwords) // 2
+
+
+class TestProcessContext:
+    """Test suite for process_context"""
+    
+    def test_never_forks(self):
+        """Test worker pools are not forked from a possibly multithreaded caller"""
+        assert process_context().get_start_method() in ('forkserver', 'spawn')
+
+
+def _drain(bucket, tokens):
+    """Charge a shared bucket from a child process"""
+    bucket.acquire(tokens)
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket class"""
+    
+    def test_burst_then_throttle(self):
+        """Test a full bucket admits a burst and then throttles"""
+        bucket = TokenBucket(1000)
+        
+        started = time.monotonic()
+        assert bucket.acquire(1000)
+        assert bucket.acquire(200)
+        
+        assert time.monotonic() - started >= 0.15
+    
+    def test_non_blocking(self):
+        """Test non-blocking acquire fails instead of waiting"""
+        bucket = TokenBucket(10)
+        
+        assert bucket.acquire(10, block=False)
+        assert not bucket.acquire(5, block=False)
+    
+    def test_oversized_batch(self):
+        """Test a batch larger than the bucket is admitted and repaid"""
+        bucket = TokenBucket(100)
+        
+        assert bucket.acquire(150, block=False)
+        assert not bucket.acquire(1, block=False)
+    
+    def test_disabled(self):
+        """Test a zero rate never limits"""
+        bucket = TokenBucket(0)
+        
+        assert not bucket.enabled
+        for _ in range(1000):
+            assert bucket.acquire(10 ** 6, block=False)
+    
+    def test_shared_between_processes(self):
+        """Test tokens taken in a child process are gone in the parent"""
+        bucket = TokenBucket(10)
+        
+        child = process_context().Process(target=_drain, args=(bucket, 10))
+        child.start()
+        child.join()
+        
+        assert child.exitcode == 0
+        assert not bucket.acquire(5, block=False)
+
+
+class TestShardedCounter:
+    """Test suite for ShardedCounter class"""
+    
+    def test_concurrent_adds(self):
+        """Test increments from many threads are all counted"""
+        counter = ShardedCounter()
+        
+        def work():
+            for _ in range(10000):
+                counter.add()
+        
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert counter.value == 80000
+    
+    def test_reset(self):
+        """Test reset discards every shard"""
+        counter = ShardedCounter(5)
+        counter.add(10)
+        
+        thread = threading.Thread(target=counter.add, args=(3,))
+        thread.start()
+        thread.join()
+        assert counter.value == 18
+        
+        counter.reset(2)
+        counter.add()
+        assert counter.value == 3
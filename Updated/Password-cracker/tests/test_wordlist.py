@@ -0,0 +1,116 @@
+"""
+Unit tests for wordlist.py
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+from wordlist import (
+    compile_wordlist,
+    compiled_path,
+    ensure_compiled,
+    is_compiled,
+    iter_compiled,
+    iter_valid_lines,
+    resolve_wordlist
+)
+from utils import SecurityError
+
+
+class TestCompileWordlist:
+    """Test suite for wordlist compilation"""
+    
+    @pytest.fixture
+    def wordlist(self, tmp_path):
+        """Create a text wordlist with duplicates and invalid lines"""
+        path = tmp_path / "words.txt"
+        path.write_bytes(
+            b"sunshine1\npassword1\n\nshort\npassword1\n  letmein123  \n"
+            b"\xff\xfe\xfd\xfc\xfb\xfa\xf9\xf8\npassword1\nletmein123\n"
+        )
+        return path
+    
+    def test_iter_valid_lines(self, wordlist):
+        """Test text streaming validates but keeps duplicates"""
+        assert list(iter_valid_lines(wordlist)) == [
+            'sunshine1', 'password1', 'password1', 'letmein123', 'password1', 'letmein123'
+        ]
+    
+    def test_compile_dedups_in_order(self, wordlist):
+        """Test compilation drops invalid lines and duplicates"""
+        count = compile_wordlist(wordlist)
+        
+        assert count == 3
+        assert is_compiled(compiled_path(wordlist))
+        assert not is_compiled(wordlist)
+        assert list(iter_compiled(compiled_path(wordlist))) == ['sunshine1', 'password1', 'letmein123']
+    
+    def test_compile_by_frequency(self, wordlist, tmp_path):
+        """Test frequency order puts the most common words first"""
+        dest = tmp_path / "out" / "freq.pwl"
+        
+        compile_wordlist(wordlist, dest, by_frequency=True)
+        
+        assert list(iter_compiled(dest)) == ['password1', 'letmein123', 'sunshine1']
+    
+    @patch('extsort.SORT_RUN_RECORDS', 5)
+    def test_compile_spills_sorted_runs(self, tmp_path):
+        """Test wordlists larger than one sort run compile with the same order"""
+        words = [f'password{i % 7}x' * (1 + i % 2) for i in range(60)]
+        path = tmp_path / "big.txt"
+        path.write_text('\n'.join(words) + '\n')
+        
+        compile_wordlist(path)
+        compile_wordlist(path, tmp_path / "freq.pwl", by_frequency=True)
+        
+        distinct = list(dict.fromkeys(words))
+        assert list(iter_compiled(compiled_path(path))) == distinct
+        counts = {word: words.count(word) for word in distinct}
+        assert list(iter_compiled(tmp_path / "freq.pwl")) == sorted(distinct, key=lambda word: -counts[word])
+        assert not list(tmp_path.glob('.sort-*'))
+    
+    def test_compile_compiled(self, wordlist):
+        """Test compiling a compiled wordlist is rejected"""
+        compile_wordlist(wordlist)
+        
+        with pytest.raises(SecurityError):
+            compile_wordlist(compiled_path(wordlist))
+    
+    def test_compile_missing(self, tmp_path):
+        """Test compiling a missing wordlist fails"""
+        with pytest.raises(SecurityError):
+            compile_wordlist(tmp_path / "missing.txt")
+    
+    def test_resolve_wordlist(self, wordlist):
+        """Test only an up-to-date compiled copy replaces the text wordlist"""
+        assert resolve_wordlist(wordlist) == wordlist
+        
+        compile_wordlist(wordlist)
+        assert resolve_wordlist(wordlist) == compiled_path(wordlist)
+        assert resolve_wordlist(compiled_path(wordlist)) == compiled_path(wordlist)
+        
+        stat = compiled_path(wordlist).stat()
+        os.utime(wordlist, (stat.st_atime, stat.st_mtime + 10))
+        assert resolve_wordlist(wordlist) == wordlist
+    
+    def test_iter_compiled_invalid(self, wordlist):
+        """Test a text file is not accepted as a compiled wordlist"""
+        with pytest.raises(SecurityError):
+            iter_compiled(wordlist)
+    
+    def test_ensure_compiled(self, wordlist, tmp_path):
+        """Test text wordlists are compiled into the cache once"""
+        cache = tmp_path / "cache"
+        
+        cached = ensure_compiled(wordlist, cache)
+        assert cached.parent == cache
+        assert list(iter_compiled(cached)) == ['sunshine1', 'password1', 'letmein123']
+        mtime = cached.stat().st_mtime_ns
+        assert ensure_compiled(wordlist, cache) == cached
+        assert cached.stat().st_mtime_ns == mtime
+        
+        compile_wordlist(wordlist)
+        assert ensure_compiled(wordlist, cache) == compiled_path(wordlist)
+        
+        with pytest.raises(SecurityError):
+            ensure_compiled(tmp_path / "missing.txt", cache)
@@ -1,15 +1,20 @@
 """
 Utility functions for the Password Cracker project.
 """
+import os
+import multiprocessing
+import threading
+import math
 import re
 import logging
 import hashlib
 import bcrypt
 import time
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterator, Iterable, List, Union
 from pathlib import Path
 import json
-from config import VALIDATION_PATTERNS, ERROR_MESSAGES
+from config import VALIDATION_PATTERNS, ERROR_MESSAGES, SUPPORTED_HASHES
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -103,28 +108,264 @@ def verify_password(password: str, hashed: str, algorithm: str = 'sha256') -> bo
         logger.error(f"Error verifying password: {str(e)}")
         raise SecurityError(f"Password verification failed: {str(e)}")
 
-def rate_limit(func):
+Candidates = Union[Iterable[Union[str, bytes]], bytes, bytearray, memoryview]
+
+def _candidate_bytes(passwords: Candidates) -> List[bytes]:
+    """Normalize candidates to a list of encoded passwords."""
+    if isinstance(passwords, (bytes, bytearray, memoryview)):
+        return bytes(passwords).splitlines()
+    return [p.encode() if isinstance(p, str) else p for p in passwords]
+
+def _split(items: List[Any], parts: int) -> List[List[Any]]:
+    """Split a list into at most parts contiguous slices."""
+    size = -(-len(items) // parts) or 1
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _digest_all(passwords: List[bytes], algorithm: str) -> List[bytes]:
+    """Hash encoded passwords with one prebuilt hash object."""
+    if algorithm == 'bcrypt':
+        hashpw, gensalt = bcrypt.hashpw, bcrypt.gensalt
+        return [hashpw(password, gensalt()) for password in passwords]
+    
+    copy = hashlib.new(algorithm).copy
+    digests = []
+    append = digests.append
+    for password in passwords:
+        h = copy()
+        h.update(password)
+        append(h.digest())
+    return digests
+
+def hash_many(passwords: Candidates, algorithm: str = 'sha256', threads: int = 0) -> List[bytes]:
+    """
+    Hash many passwords in one tight loop.
+    
+    The algorithm is resolved once and every candidate is hashed from a
+    copy of a prebuilt hash object. Candidates are not validated, so this
+    is meant for bulk work over already validated input.
+    
+    Args:
+        passwords: Passwords as str or bytes, or a newline-separated buffer
+        algorithm: Hash algorithm to use
+        threads: Worker threads; 0 hashes on the calling thread. Threads
+            only pay off for bcrypt and inputs over 2 KiB, where the hash
+            functions release the GIL
+    
+    Returns:
+        List[bytes]: Raw digests (bcrypt hashes for bcrypt), in input order
+    
+    Raises:
+        SecurityError: If the algorithm is unsupported
+    """
+    algorithm = algorithm.lower()
+    if algorithm not in SUPPORTED_HASHES:
+        raise SecurityError(f"Unsupported algorithm: {algorithm}")
+    
+    encoded = _candidate_bytes(passwords)
+    if threads <= 1 or len(encoded) < 2:
+        return _digest_all(encoded, algorithm)
+    
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        chunks = executor.map(_digest_all, _split(encoded, threads), [algorithm] * threads)
+        return [digest for chunk in chunks for digest in chunk]
+
+def verify_many(
+    passwords: Candidates,
+    hashed: str,
+    algorithm: str = 'sha256',
+    threads: int = 0
+) -> Optional[int]:
     """
-    Decorator to implement rate limiting.
+    Find the first of many passwords matching a hash.
     
     Args:
-        func: Function to decorate
+        passwords: Passwords as str or bytes, or a newline-separated buffer
+        hashed: The hash to verify against
+        algorithm: Hash algorithm used
+        threads: Worker threads, as for hash_many
     
     Returns:
-        Decorated function
+        Optional[int]: Index of the first matching password, or None
+    
+    Raises:
+        SecurityError: If the algorithm or hash is invalid
+    """
+    encoded = _candidate_bytes(passwords)
+    
+    if algorithm == 'bcrypt':
+        target = hashed.encode()
+        chunks = _split(encoded, threads) if threads > 1 else [encoded]
+        # Lowest chunk with a match so far; chunks after it stop early
+        matched = [len(chunks)]
+        lock = threading.Lock()
+        
+        def first_match(number: int, chunk: List[bytes]) -> Optional[int]:
+            for i, password in enumerate(chunk):
+                if matched[0] < number:
+                    return None
+                if bcrypt.checkpw(password, target):
+                    with lock:
+                        matched[0] = min(matched[0], number)
+                    return i
+            return None
+        
+        if len(chunks) < 2:
+            return first_match(0, encoded)
+        
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [executor.submit(first_match, number, chunk) for number, chunk in enumerate(chunks)]
+            offset = 0
+            for chunk, future in zip(chunks, futures):
+                index = future.result()
+                if index is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    return offset + index
+                offset += len(chunk)
+        return None
+    
+    try:
+        target = bytes.fromhex(hashed)
+    except ValueError as e:
+        raise SecurityError(f"Invalid target hash: {str(e)}")
+    
+    digests = hash_many(encoded, algorithm, threads)
+    try:
+        return digests.index(target)
+    except ValueError:
+        return None
+
+def process_context() -> multiprocessing.context.BaseContext:
     """
-    last_call = {}
+    Get the start method for worker process pools.
     
-    def wrapper(*args, **kwargs):
-        current_time = time.time()
-        if func.__name__ in last_call:
-            time_diff = current_time - last_call[func.__name__]
-            if time_diff < 1.0:  # 1 second minimum between calls
-                raise SecurityError(ERROR_MESSAGES['rate_limit'])
-        last_call[func.__name__] = current_time
-        return func(*args, **kwargs)
+    Pools are started from web job threads too, and forking a
+    multithreaded process can leave children deadlocked on locks held by
+    other threads. Workers are therefore started by a fork server where
+    available, and spawned otherwise; never forked from the caller.
     
-    return wrapper
+    Returns:
+        multiprocessing.context.BaseContext: Context to create pools and
+        shared primitives with
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by threads and processes.
+    
+    The bucket state lives in shared memory behind a multiprocessing lock,
+    so worker processes created with the bucket draw from the same budget.
+    Callers charge whole batches at once; a batch larger than the bucket
+    is admitted when the bucket is full and leaves it in debt, which later
+    callers wait out. A rate of zero or less disables limiting.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket, initially full.
+        
+        Args:
+            rate: Tokens added per second; <= 0 disables limiting
+            capacity: Maximum burst size, one second of tokens by default
+        """
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        context = process_context()
+        self._lock = context.Lock()
+        # [available tokens, time of last refill]
+        self._state = context.RawArray('d', [self.capacity, time.monotonic()])
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the bucket limits anything."""
+        return self.rate > 0
+    
+    def acquire(self, tokens: float = 1, block: bool = True) -> bool:
+        """
+        Take tokens from the bucket.
+        
+        Args:
+            tokens: Number of tokens, e.g. the size of a batch
+            block: Wait until the tokens are available
+        
+        Returns:
+            bool: True if the tokens were taken
+        """
+        if self.rate <= 0:
+            return True
+        
+        needed = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                state = self._state
+                available = min(self.capacity, state[0] + (now - state[1]) * self.rate)
+                state[1] = now
+                if available >= needed:
+                    state[0] = available - tokens
+                    return True
+                state[0] = available
+                wait = (needed - available) / self.rate
+            
+            if not block:
+                return False
+            time.sleep(wait)
+
+class ShardedCounter:
+    """
+    Counter with one shard per thread, combined when read.
+    
+    Each thread only ever writes its own shard, so increments take no lock
+    and threads never contend on the hot path. Reads sum the shards, which
+    is cheap enough to do once per batch.
+    """
+    
+    def __init__(self, value: int = 0):
+        """
+        Initialize the counter.
+        
+        Args:
+            value: Starting value
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: List[List[int]] = []
+        self._base = value
+    
+    def add(self, count: int = 1) -> None:
+        """
+        Add to the calling thread's shard.
+        
+        Args:
+            count: Amount to add
+        """
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = [0]
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        shard[0] += count
+    
+    @property
+    def value(self) -> int:
+        """Sum of all shards."""
+        return self._base + sum(shard[0] for shard in tuple(self._shards))
+    
+    def reset(self, value: int = 0) -> None:
+        """
+        Set the counter, discarding all shard counts.
+        
+        Args:
+            value: New value
+        """
+        with self._lock:
+            for shard in self._shards:
+                shard[0] = 0
+            self._base = value
 
 def secure_file_operation(file_path: Path, mode: str = 'r') -> Any:
     """
@@ -156,6 +397,38 @@ def secure_file_operation(file_path: Path, mode: str = 'r') -> Any:
         logger.error(f"File operation error: {str(e)}")
         raise SecurityError(f"File operation failed: {str(e)}")
 
+def stream_file_lines(file_path: Path, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """
+    Stream stripped, non-empty lines from a file without reading it whole.
+    
+    The file is read through a buffer of ``chunk_size`` bytes, so memory
+    use stays flat regardless of file size.
+    
+    Args:
+        file_path: Path to the file
+        chunk_size: Read buffer size in bytes
+    
+    Returns:
+        Iterator[bytes]: Lines with surrounding whitespace removed
+    
+    Raises:
+        SecurityError: If the file is missing or unreadable
+    """
+    if not file_path.exists():
+        raise SecurityError(ERROR_MESSAGES['file_not_found'])
+    
+    if not os.access(file_path, os.R_OK):
+        raise SecurityError(ERROR_MESSAGES['permission_denied'])
+    
+    def read_lines() -> Iterator[bytes]:
+        with open(file_path, 'rb', buffering=chunk_size) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+    
+    return read_lines()
+
 def sanitize_output(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Sanitize output data to prevent sensitive information leakage.
@@ -1,7 +1,7 @@
 """
 Flask web application for the Password Cracker project.
 """
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, abort, render_template, request, jsonify, send_from_directory, stream_with_context, url_for
 from werkzeug.security import generate_password_hash, check_password_hash
 import hashlib
 import bcrypt
@@ -9,8 +9,11 @@ import os
 import logging
 from logging.handlers import RotatingFileHandler
 import json
-from typing import Dict, Any, Optional
-from middleware import SecurityMiddleware
+from typing import Dict, Any, Iterable, Iterator, Optional
+from middleware import RateLimitExceeded, SecurityMiddleware, create_state_stores
+from jobs import JobManager, JobQueueFull
+# jobs puts the project root on sys.path
+from utils import SecurityError
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -33,7 +36,28 @@ with open('config.json', 'r') as f:
     config = json.load(f)
 
 # Initialize security middleware
-security = SecurityMiddleware(app)
+rate_limit_store, ip_blacklist = create_state_stores(
+    config['security']['state'],
+    max_tracked=config['security']['rate_limit']['max_tracked']
+)
+security = SecurityMiddleware(app, rate_limit_store, ip_blacklist)
+security.rate_limit_window = config['security']['rate_limit']['window']
+security.rate_limit_max_requests = config['security']['rate_limit']['max_requests']
+
+# Background crack jobs
+jobs = JobManager(
+    max_concurrent=config['jobs']['max_concurrent'],
+    max_queued=config['jobs']['max_queued'],
+    retention=config['jobs']['retention'],
+    progress_interval=config['jobs']['progress_interval'],
+    algorithms=config['security']['hash']['allowed_algorithms']
+)
+
+# Batch analysis: accepted NDJSON media types, result lines per streamed
+# chunk and distinct passwords whose results are reused within a batch
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl')
+BATCH_CHUNK = 256
+BATCH_CACHE_SIZE = 10000
 
 # Known hashes for demo mode (DO NOT USE IN PRODUCTION)
 DEMO_HASHES = {
@@ -159,6 +183,53 @@ def crack_hash(hash_value: str, algorithm: str = 'md5') -> Dict[str, Any]:
         'algorithm': algorithm
     }
 
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[Any]:
+    """Parse NDJSON lazily, yielding None for lines that are not valid JSON"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def analyze_many(items: Iterable[Any]) -> Iterator[str]:
+    """Analyze a batch of passwords, yielding NDJSON result lines in chunks"""
+    max_items = config['analyze_batch']['max_items']
+    # Exports repeat common passwords; each distinct one is analyzed once
+    cache: Dict[str, str] = {}
+    lines = []
+    
+    try:
+        for index, item in enumerate(items):
+            if index >= max_items:
+                lines.append(json.dumps({'index': index, 'error': f'Batch is limited to {max_items} passwords'}) + '\n')
+                break
+            
+            password = item.get('password') if isinstance(item, dict) else item
+            if not password or not isinstance(password, str):
+                lines.append(json.dumps({'index': index, 'error': 'Password is required'}) + '\n')
+            else:
+                result = cache.get(password)
+                if result is None:
+                    result = json.dumps(analyze_password(password))
+                    if len(cache) < BATCH_CACHE_SIZE:
+                        cache[password] = result
+                lines.append(f'{{"index": {index}, "result": {result}}}\n')
+            
+            if len(lines) >= BATCH_CHUNK:
+                yield ''.join(lines)
+                lines = []
+    except RateLimitExceeded:
+        lines.append(json.dumps({'error': 'Rate limit exceeded'}) + '\n')
+    except Exception as e:
+        app.logger.error(f'Error in batch analysis: {str(e)}')
+        lines.append(json.dumps({'error': 'Internal server error'}) + '\n')
+    
+    if lines:
+        yield ''.join(lines)
+
 @app.route('/')
 def index():
     """Serve the main page"""
@@ -178,6 +249,27 @@ def analyze():
         app.logger.error(f'Error in analyze endpoint: {str(e)}')
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/analyze/batch', methods=['POST'])
+@security.charge_by_size(config['analyze_batch']['bytes_per_request'])
+@security.skip_body_scan
+def analyze_batch():
+    """API endpoint streaming the analysis of many passwords as NDJSON"""
+    # Passwords legitimately contain quotes, '#' and '--', so neither
+    # format goes through the injection scan
+    if request.mimetype in NDJSON_TYPES:
+        items = iter_ndjson(security.metered_body())
+    else:
+        try:
+            items = json.loads(b''.join(security.metered_body()))
+        except RateLimitExceeded:
+            abort(429)
+        except ValueError:
+            items = None
+        if not isinstance(items, list):
+            return jsonify({'error': 'Expected a JSON array or NDJSON body'}), 400
+    
+    return Response(stream_with_context(analyze_many(items)), mimetype='application/x-ndjson')
+
 @app.route('/api/hash', methods=['POST'])
 def hash_password():
     """API endpoint for password hashing"""
@@ -208,6 +300,67 @@ def crack():
         app.logger.error(f'Error in crack endpoint: {str(e)}')
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """API endpoint for queueing a background crack job"""
+    try:
+        data = request.get_json()
+        if not data or 'hash' not in data:
+            return jsonify({'error': 'Hash is required'}), 400
+        
+        job = jobs.submit(data['hash'], data.get('algorithm', 'md5'), data.get('mode', 'basic'))
+        response = jsonify(job.to_dict())
+        response.status_code = 202
+        response.headers['Location'] = url_for('get_job', job_id=job.id)
+        return response
+    except SecurityError as e:
+        return jsonify({'error': str(e)}), 400
+    except JobQueueFull:
+        return jsonify({'error': 'Too many active jobs, try again later'}), 503
+    except Exception as e:
+        app.logger.error(f'Error in jobs endpoint: {str(e)}')
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """API endpoint listing retained crack jobs"""
+    return jsonify({'jobs': [job.to_dict() for job in jobs.list()]})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """API endpoint for polling a crack job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent event stream of a crack job's progress"""
+    if jobs.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def stream():
+        for state in jobs.watch(job_id):
+            if state is None:
+                yield ': keep-alive\n\n'
+            else:
+                event = 'progress' if state['status'] in ('queued', 'running') else 'end'
+                yield f"event: {event}\ndata: {json.dumps(state)}\n\n"
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """API endpoint for cancelling a crack job"""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/static/<path:filename>')
 def serve_static(filename):
     """Serve static files"""
@@ -0,0 +1,302 @@
+"""
+Background crack jobs for the web API.
+
+Cracks can take minutes, so the API only queues them: a bounded thread
+pool runs BasicCracker or AdvancedCracker outside the request thread and
+clients poll or watch the job for progress and the result.
+"""
+import logging
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# The crackers live in the project root, one level above the web app
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+from advanced_cracker import AdvancedCracker
+from basic_cracker import BasicCracker
+from config import SUPPORTED_HASHES, WORDLISTS_DIR
+from progress import ProgressReporter
+from utils import SecurityError, validate_input
+
+logger = logging.getLogger(__name__)
+
+# Cracker class for each job mode
+CRACKERS = {
+    'basic': BasicCracker,
+    'advanced': AdvancedCracker
+}
+
+# Jobs in these states still hold a worker slot or a queue slot
+ACTIVE_STATES = ('queued', 'running')
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be queued"""
+
+class CrackJob:
+    """A single crack request and its outcome"""
+    
+    def __init__(self, target_hash: str, algorithm: str, mode: str):
+        self.id = uuid.uuid4().hex
+        self.target_hash = target_hash
+        self.algorithm = algorithm
+        self.mode = mode
+        self.status = 'queued'
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.password: Optional[str] = None
+        self.error: Optional[str] = None
+        self.cracker = None
+        self.future: Optional[Future] = None
+        self.progress: Optional[Dict[str, Any]] = None
+        # Bumped on every status or progress change, for watchers
+        self.version = 0
+        self.changed = threading.Condition()
+        self._attempts = 0
+    
+    def touch(self) -> None:
+        """Wake everyone watching the job"""
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+    
+    def report(self, snapshot: Dict[str, Any]) -> None:
+        """Store a progress snapshot from the job's reporter"""
+        self.progress = snapshot
+        self.touch()
+    
+    @property
+    def attempts(self) -> int:
+        """Candidates checked so far, live while the job runs"""
+        cracker = self.cracker
+        return cracker.attempts if cracker is not None else self._attempts
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for the API"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'hash': self.target_hash,
+            'algorithm': self.algorithm,
+            'mode': self.mode,
+            'found': self.password is not None,
+            'password': self.password,
+            'attempts': self.attempts,
+            'elapsed': round(self.elapsed, 3),
+            'created': self.created,
+            'error': self.error,
+            'progress': self.progress
+        }
+
+class JobManager:
+    """Runs crack jobs on a bounded worker pool"""
+    
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        max_queued: int = 10,
+        retention: float = 3600,
+        wordlist: Path = WORDLISTS_DIR / 'common_passwords.txt',
+        algorithms: Iterable[str] = SUPPORTED_HASHES,
+        progress_interval: float = 1.0
+    ):
+        """
+        Create the job manager.
+        
+        Args:
+            max_concurrent: Jobs cracking at the same time
+            max_queued: Jobs waiting for a worker beyond those running
+            retention: Seconds finished jobs are kept for polling
+            wordlist: Server-side wordlist every job uses
+            algorithms: Algorithms clients may request
+            progress_interval: Seconds between progress snapshots
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.retention = retention
+        self.wordlist = Path(wordlist)
+        self.algorithms = set(algorithms) & set(SUPPORTED_HASHES)
+        self.progress_interval = progress_interval
+        self._jobs: Dict[str, CrackJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='crack-job')
+    
+    def submit(self, target_hash: str, algorithm: str = 'md5', mode: str = 'basic') -> CrackJob:
+        """
+        Validate and queue a crack job.
+        
+        Args:
+            target_hash: Hash to crack
+            algorithm: Hash algorithm
+            mode: 'basic' for a dictionary attack, 'advanced' for rules,
+                patterns and brute force
+        
+        Returns:
+            CrackJob: The queued job
+        
+        Raises:
+            SecurityError: If the request is invalid
+            JobQueueFull: If too many jobs are already active
+        """
+        if algorithm not in self.algorithms:
+            raise SecurityError(f"Unsupported algorithm: {algorithm}")
+        if mode not in CRACKERS:
+            raise SecurityError(f"Unsupported mode: {mode}")
+        validate_input(target_hash, 'bcrypt' if algorithm == 'bcrypt' else 'hash')
+        
+        job = CrackJob(target_hash, algorithm, mode)
+        with self._lock:
+            self._prune()
+            active = sum(1 for existing in self._jobs.values() if existing.status in ACTIVE_STATES)
+            if active >= self.max_concurrent + self.max_queued:
+                raise JobQueueFull("Too many active jobs")
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job)
+        
+        logger.info(f"Queued {mode} crack job {job.id} for {algorithm} hash")
+        return job
+    
+    def get(self, job_id: str) -> Optional[CrackJob]:
+        """Look up a job by id"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def list(self) -> List[CrackJob]:
+        """All retained jobs, newest first"""
+        with self._lock:
+            self._prune()
+            return sorted(self._jobs.values(), key=lambda job: job.created, reverse=True)
+    
+    def cancel(self, job_id: str) -> Optional[CrackJob]:
+        """
+        Cancel a job.
+        
+        Queued jobs are cancelled immediately; running jobs are told to
+        stop and become 'cancelled' once their cracker returns.
+        
+        Args:
+            job_id: Job to cancel
+        
+        Returns:
+            Optional[CrackJob]: The job, or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == 'queued':
+                job.status = 'cancelled'
+                job.finished = time.time()
+                job.future.cancel()
+            elif job.status == 'running':
+                job.cracker.stop_flag.set()
+        job.touch()
+        return job
+    
+    def watch(self, job_id: str, heartbeat: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Follow a job until it finishes.
+        
+        Args:
+            job_id: Job to follow
+            heartbeat: Seconds to wait for a change before yielding None
+        
+        Returns:
+            Iterator[Optional[Dict[str, Any]]]: The serialized job after
+            each change, ending with its final state, or None when nothing
+            changed within the heartbeat
+        """
+        job = self.get(job_id)
+        if job is None:
+            return
+        
+        seen = -1
+        while True:
+            with job.changed:
+                if job.version == seen:
+                    job.changed.wait(heartbeat)
+                current = job.version
+            
+            if current == seen:
+                yield None
+                continue
+            
+            seen = current
+            state = job.to_dict()
+            yield state
+            if state['status'] not in ACTIVE_STATES:
+                return
+    
+    def shutdown(self) -> None:
+        """Cancel every active job and stop the worker pool"""
+        with self._lock:
+            job_ids = [job.id for job in self._jobs.values() if job.status in ACTIVE_STATES]
+        for job_id in job_ids:
+            self.cancel(job_id)
+        self._executor.shutdown(wait=True)
+    
+    def _prune(self) -> None:
+        """Forget finished jobs past their retention; caller holds the lock"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished is not None and job.finished < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def _run(self, job: CrackJob) -> None:
+        """Crack one job on a worker thread"""
+        with self._lock:
+            if job.status != 'queued':
+                return
+        
+        cracker, reporter = None, None
+        status, password, error = 'failed', None, None
+        try:
+            cracker = CRACKERS[job.mode](job.algorithm)
+            with self._lock:
+                if job.status != 'queued':
+                    # Cancelled while the cracker was being built
+                    return
+                job.cracker = cracker
+                job.status = 'running'
+                job.started = time.time()
+            job.touch()
+            
+            reporter = ProgressReporter(cracker, job.report, self.progress_interval).start()
+            password = cracker.crack_hash(job.target_hash, self.wordlist)
+            status = 'cancelled' if password is None and cracker.stop_flag.is_set() else 'done'
+        except Exception as e:
+            logger.error(f"Crack job {job.id} failed: {str(e)}")
+            error = 'Crack failed'
+        finally:
+            if reporter is not None:
+                reporter.stop()
+            with self._lock:
+                if job.status in ('queued', 'running'):
+                    job._attempts = cracker.attempts if cracker is not None else 0
+                    job.cracker = None
+                    job.password = password
+                    job.error = error
+                    job.status = status
+                    job.finished = time.time()
+            job.touch()
+            if cracker is not None:
+                cracker.cleanup()
+        
+        logger.info(f"Crack job {job.id} finished: {status}")
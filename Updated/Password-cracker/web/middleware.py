@@ -1,11 +1,398 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from functools import wraps
-from flask import request, abort, make_response
+from flask import current_app, request, abort, make_response
+from pathlib import Path
+import os
 import re
+import sqlite3
+import threading
 import time
-from typing import Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, Set, Tuple, Union
+
+# Shared state tables; every web worker on the host opens the same file
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    client TEXT PRIMARY KEY,
+    window INTEGER NOT NULL,
+    current INTEGER NOT NULL,
+    previous INTEGER NOT NULL,
+    seen REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rate_limits_seen ON rate_limits (seen);
+CREATE TABLE IF NOT EXISTS blacklist (
+    ip TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+# Response headers as (name, value) pairs
+HeaderBlock = Tuple[Tuple[str, str], ...]
+
+# New clients between sweeps of idle rate limit rows
+SWEEP_EVERY = 256
+
+def roll_window(stored: int, count: int, previous: int, window: int) -> Tuple[int, int]:
+    """Move a client's counts from fixed window stored into window, returning (count, previous)"""
+    if stored == window:
+        return count, previous
+    return 0, count if stored == window - 1 else 0
+
+def sliding_count(current: int, previous: int, now: float, window: float) -> float:
+    """Requests in the sliding window: the previous window counts for the part still overlapped"""
+    return current + previous * (1 - (now % window) / window)
+
+class SlidingWindowLimiter:
+    """Per-client request counter over a sliding window, in fixed memory"""
+
+    def __init__(self, max_tracked: int = 10000):
+        """
+        Create the limiter.
+        
+        Args:
+            max_tracked: Clients tracked at once; the least recently seen
+                client is forgotten first
+        """
+        self.max_tracked = max_tracked
+        # client -> [window number, requests in it, requests in the window before]
+        self._counters: 'OrderedDict[str, List[int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str, limit: int, window: float, now: Optional[float] = None, cost: int = 1) -> bool:
+        """
+        Count a request if the client has room for it under its limit.
+        
+        The sliding window count is the current fixed window's count plus
+        the previous window's count weighted by how much of it the sliding
+        window still overlaps, so each check is O(1).
+        
+        Args:
+            key: Client identifier
+            limit: Requests allowed per window
+            window: Window length in seconds
+            now: Current time, for tests
+            cost: Requests this request counts as
+        
+        Returns:
+            bool: True if the request is allowed and was counted
+        """
+        now = time.time() if now is None else now
+        current = int(now // window)
+        
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = [current, 0, 0]
+                self._evict(current)
+            else:
+                self._counters.move_to_end(key)
+                counter[1], counter[2] = roll_window(counter[0], counter[1], counter[2], current)
+                counter[0] = current
+            
+            if sliding_count(counter[1], counter[2], now, window) + cost > limit:
+                return False
+            counter[1] += cost
+            return True
+
+    def _evict(self, current: int) -> None:
+        """Forget idle clients and any beyond capacity; caller holds the lock"""
+        counters = self._counters
+        while counters:
+            key, counter = next(iter(counters.items()))
+            # Clients idle for two windows no longer affect their limit
+            if len(counters) <= self.max_tracked and counter[0] >= current - 1:
+                break
+            del counters[key]
+
+    def clear(self) -> None:
+        """Forget every client"""
+        with self._lock:
+            self._counters.clear()
+
+    def __len__(self) -> int:
+        """Clients currently tracked"""
+        return len(self._counters)
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a client is tracked"""
+        return key in self._counters
+
+class SQLiteState:
+    """Connection to the state database, reopened after a fork"""
+
+    def __init__(self, path: Path, timeout: float = 5.0):
+        """
+        Open or create the state database.
+        
+        Args:
+            path: Database path, shared by every worker
+            timeout: Seconds to wait for another worker's write lock
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection().executescript(STATE_SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """Get this process's connection; call with the lock held after setup"""
+        # Workers forked from a preloaded app must not share the parent's handle
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(
+                str(self.path), timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._pid = os.getpid()
+        return self._conn
+
+class SQLiteRateLimiter:
+    """Sliding window rate limiter shared by every worker through SQLite"""
+
+    def __init__(self, state: SQLiteState, max_tracked: int = 10000):
+        """
+        Create the limiter.
+        
+        Args:
+            state: Shared state database
+            max_tracked: Clients tracked at once; the least recently seen
+                clients are forgotten first
+        """
+        self.state = state
+        self.max_tracked = max_tracked
+        self._new_clients = 0
+
+    def allow(self, key: str, limit: int, window: float, now: Optional[float] = None, cost: int = 1) -> bool:
+        """Count a request if the client is under its limit, as SlidingWindowLimiter.allow"""
+        now = time.time() if now is None else now
+        current = int(now // window)
+        
+        with self.state.lock:
+            conn = self.state.connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT window, current, previous FROM rate_limits WHERE client = ?', (key,)
+                ).fetchone()
+                count, previous = roll_window(row[0], row[1], row[2], current) if row else (0, 0)
+                allowed = sliding_count(count, previous, now, window) + cost <= limit
+                conn.execute(
+                    'INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)',
+                    (key, current, count + cost if allowed else count, previous, now)
+                )
+                conn.execute('COMMIT')
+            except sqlite3.Error:
+                conn.execute('ROLLBACK')
+                raise
+            
+            if row is None:
+                self._new_clients += 1
+                if self._new_clients % SWEEP_EVERY == 0:
+                    self._sweep(conn, current)
+        
+        return allowed
+
+    def _sweep(self, conn: sqlite3.Connection, current: int) -> None:
+        """Forget idle clients and any beyond capacity; caller holds the lock"""
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM rate_limits WHERE window < ?', (current - 1,))
+            conn.execute(
+                'DELETE FROM rate_limits WHERE client IN ('
+                'SELECT client FROM rate_limits ORDER BY seen '
+                'LIMIT max((SELECT COUNT(*) FROM rate_limits) - ?, 0))',
+                (self.max_tracked,)
+            )
+
+    def clear(self) -> None:
+        """Forget every client"""
+        with self.state.lock:
+            self.state.connection().execute('DELETE FROM rate_limits')
+
+    def __len__(self) -> int:
+        """Clients currently tracked"""
+        with self.state.lock:
+            return self.state.connection().execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a client is tracked"""
+        with self.state.lock:
+            return self.state.connection().execute(
+                'SELECT 1 FROM rate_limits WHERE client = ?', (key,)
+            ).fetchone() is not None
+
+class RedisRateLimiter:
+    """Sliding window rate limiter shared through a Redis-compatible server"""
+
+    def __init__(self, client: Any, prefix: str = 'ratelimit:'):
+        """
+        Create the limiter.
+        
+        Args:
+            client: redis-py compatible client
+            prefix: Key prefix for the counters
+        """
+        self.client = client
+        self.prefix = prefix
+
+    def allow(self, key: str, limit: int, window: float, now: Optional[float] = None, cost: int = 1) -> bool:
+        """Count a request if the client is under its limit, as SlidingWindowLimiter.allow"""
+        now = time.time() if now is None else now
+        current = int(now // window)
+        current_key = f"{self.prefix}{key}:{current}"
+        
+        # Counters expire on their own once they leave the sliding window
+        pipe = self.client.pipeline()
+        pipe.get(f"{self.prefix}{key}:{current - 1}")
+        pipe.incrby(current_key, cost)
+        pipe.expire(current_key, int(window * 2) + 1)
+        previous, count, _ = pipe.execute()
+        
+        if sliding_count(count, int(previous or 0), now, window) > limit:
+            self.client.decrby(current_key, cost)
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Forget every client"""
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+class CachedBlacklist(ABC):
+    """Set of blocked IPs in shared storage, read through a short-lived local copy"""
+
+    def __init__(self, refresh: float = 1.0):
+        """
+        Create the blacklist.
+        
+        Args:
+            refresh: Seconds another worker's change may take to be seen
+        """
+        self.refresh = refresh
+        self._cached: Set[str] = set()
+        self._loaded = float('-inf')
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _load(self) -> Set[str]:
+        """Read every blocked IP from storage"""
+        pass
+
+    @abstractmethod
+    def _store(self, ip: str, blocked: bool) -> None:
+        """Add an IP to or remove it from storage"""
+        pass
+
+    def _current(self) -> Set[str]:
+        """The local copy, reloaded once it is older than refresh"""
+        now = time.monotonic()
+        if now - self._loaded >= self.refresh:
+            with self._lock:
+                if now - self._loaded >= self.refresh:
+                    self._cached = self._load()
+                    self._loaded = now
+        return self._cached
+
+    def add(self, ip: str) -> None:
+        """Block an IP on every worker"""
+        self._store(ip, True)
+        self._loaded = float('-inf')
+
+    def discard(self, ip: str) -> None:
+        """Unblock an IP on every worker"""
+        self._store(ip, False)
+        self._loaded = float('-inf')
+
+    def __contains__(self, ip: str) -> bool:
+        """Check whether an IP is blocked"""
+        return ip in self._current()
+
+    def __iter__(self):
+        """Iterate over the blocked IPs"""
+        return iter(set(self._current()))
+
+    def __len__(self) -> int:
+        """Number of blocked IPs"""
+        return len(self._current())
+
+class SQLiteBlacklist(CachedBlacklist):
+    """Blacklist shared by every worker through SQLite"""
+
+    def __init__(self, state: SQLiteState, refresh: float = 1.0):
+        """Create the blacklist on a shared state database"""
+        super().__init__(refresh)
+        self.state = state
+
+    def _load(self) -> Set[str]:
+        """Read every blocked IP from the database"""
+        with self.state.lock:
+            return {ip for ip, in self.state.connection().execute('SELECT ip FROM blacklist')}
+
+    def _store(self, ip: str, blocked: bool) -> None:
+        """Add an IP to or remove it from the database"""
+        query = 'INSERT OR IGNORE INTO blacklist VALUES (?)' if blocked else 'DELETE FROM blacklist WHERE ip = ?'
+        with self.state.lock:
+            self.state.connection().execute(query, (ip,))
+
+class RedisBlacklist(CachedBlacklist):
+    """Blacklist shared through a Redis-compatible server"""
+
+    def __init__(self, client: Any, key: str = 'blacklist', refresh: float = 1.0):
+        """Create the blacklist on a redis-py compatible client"""
+        super().__init__(refresh)
+        self.client = client
+        self.key = key
+
+    def _load(self) -> Set[str]:
+        """Read every blocked IP from the server"""
+        return {ip.decode() if isinstance(ip, bytes) else ip for ip in self.client.smembers(self.key)}
+
+    def _store(self, ip: str, blocked: bool) -> None:
+        """Add an IP to or remove it from the server's set"""
+        if blocked:
+            self.client.sadd(self.key, ip)
+        else:
+            self.client.srem(self.key, ip)
+
+def create_state_stores(settings: Dict[str, Any], max_tracked: int = 10000) -> Tuple[Any, Any]:
+    """
+    Build the rate limit store and IP blacklist for a state backend.
+    
+    'memory' keeps state in each worker process; 'sqlite' shares it between
+    the workers on one host through a database file; 'redis' shares it
+    between hosts (requires the redis package).
+    
+    Args:
+        settings: Backend settings: backend, path, url and blacklist_refresh
+        max_tracked: Clients the rate limiter tracks at once
+    
+    Returns:
+        Tuple[Any, Any]: Rate limit store and blacklist
+    
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = settings.get('backend', 'memory')
+    refresh = settings.get('blacklist_refresh', 1.0)
+    
+    if backend == 'memory':
+        return SlidingWindowLimiter(max_tracked), set()
+    if backend == 'sqlite':
+        state = SQLiteState(settings['path'])
+        return SQLiteRateLimiter(state, max_tracked), SQLiteBlacklist(state, refresh)
+    if backend == 'redis':
+        import redis
+        client = redis.Redis.from_url(settings['url'])
+        return RedisRateLimiter(client), RedisBlacklist(client, refresh=refresh)
+    raise ValueError(f"Unknown state backend: {backend}")
+
+class RateLimitExceeded(Exception):
+    """Raised while reading a metered request body once the client runs out of requests"""
 
 class SecurityMiddleware:
-    def __init__(self, app=None):
+    def __init__(self, app=None, rate_limit_store=None, ip_blacklist=None):
         self.app = app
         if app is not None:
             self.init_app(app)
@@ -13,10 +400,11 @@ class SecurityMiddleware:
         # Rate limiting configuration
         self.rate_limit_window = 60  # 1 minute window
         self.rate_limit_max_requests = 100  # max requests per window
-        self.rate_limit_store: Dict[str, List[float]] = {}
+        # Per-worker by default; see create_state_stores for shared state
+        self.rate_limit_store = rate_limit_store if rate_limit_store is not None else SlidingWindowLimiter()
         
         # IP blacklist
-        self.ip_blacklist: set = set()
+        self.ip_blacklist = ip_blacklist if ip_blacklist is not None else set()
         
         # Request size limit (10MB)
         self.max_request_size = 10 * 1024 * 1024
@@ -62,6 +450,15 @@ class SecurityMiddleware:
             r'(\%20OR\%20.*?=.*?)',
             r'(\%20AND\%20.*?=.*?)'
         ]
+        
+        # Precomputed security headers, rebuilt after update_csp_policy;
+        # change the policy through it rather than editing csp_policy
+        self._header_block: Optional[HeaderBlock] = None
+        self._endpoint_headers: Dict[Optional[str], HeaderBlock] = {}
+        
+        # Combined matcher over both pattern lists, compiled on first use
+        self._scanner: Optional[Pattern] = None
+        self._scanner_key: Optional[tuple] = None
 
     def init_app(self, app):
         """Initialize the middleware with the Flask app"""
@@ -87,105 +484,150 @@ class SecurityMiddleware:
             abort(403)  # Forbidden
         
         # Rate limiting
-        if not self._check_rate_limit(request.remote_addr):
+        cost = self._request_cost()
+        if cost > self.rate_limit_max_requests:
+            abort(413)  # Could never fit in one rate limit window
+        if not self._check_rate_limit(request.remote_addr, cost):
             abort(429)  # Too Many Requests
         
-        # XSS protection
-        if self._check_xss(request):
-            abort(400)  # Bad Request
-        
-        # SQL injection protection
-        if self._check_sql_injection(request):
+        # XSS and SQL injection protection
+        if self._check_injection(request):
             abort(400)  # Bad Request
 
     def after_request(self, response):
         """Add security headers to response"""
-        # Content Security Policy
-        csp = '; '.join([f"{k} {' '.join(v)}" for k, v in self.csp_policy.items()])
-        response.headers['Content-Security-Policy'] = csp
-        
-        # Other security headers
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-        response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-        response.headers['Permissions-Policy'] = 'geolocation=(), microphone=(), camera=()'
+        headers = response.headers
+        for name, value in self._headers_for(request.endpoint):
+            headers[name] = value
         
         return response
 
-    def _check_rate_limit(self, ip: str) -> bool:
-        """Check if the IP has exceeded the rate limit"""
-        current_time = time.time()
-        
-        # Clean old requests
-        if ip in self.rate_limit_store:
-            self.rate_limit_store[ip] = [
-                t for t in self.rate_limit_store[ip]
-                if current_time - t < self.rate_limit_window
-            ]
-        else:
-            self.rate_limit_store[ip] = []
-        
-        # Check rate limit
-        if len(self.rate_limit_store[ip]) >= self.rate_limit_max_requests:
-            return False
-        
-        # Add current request
-        self.rate_limit_store[ip].append(current_time)
-        return True
+    def _security_headers(self) -> HeaderBlock:
+        """Get the default header block, built once per policy change"""
+        block = self._header_block
+        if block is None:
+            csp = '; '.join([f"{k} {' '.join(v)}" for k, v in self.csp_policy.items()])
+            block = self._header_block = (
+                ('Content-Security-Policy', csp),
+                ('X-Content-Type-Options', 'nosniff'),
+                ('X-Frame-Options', 'DENY'),
+                ('X-XSS-Protection', '1; mode=block'),
+                ('Strict-Transport-Security', 'max-age=31536000; includeSubDomains'),
+                ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+                ('Permissions-Policy', 'geolocation=(), microphone=(), camera=()')
+            )
+        return block
 
-    def _check_xss(self, request) -> bool:
-        """Check for XSS attacks in request data"""
-        def check_value(value: str) -> bool:
-            if not isinstance(value, str):
-                return False
-            return any(re.search(pattern, value, re.IGNORECASE) for pattern in self.xss_patterns)
-        
-        # Check query parameters
-        if any(check_value(str(v)) for v in request.args.values()):
-            return True
+    def _headers_for(self, endpoint: Optional[str]) -> HeaderBlock:
+        """Get the header block for an endpoint, with its view's overrides applied"""
+        block = self._endpoint_headers.get(endpoint)
+        if block is None:
+            block = self._security_headers()
+            view = current_app.view_functions.get(endpoint) if endpoint else None
+            overrides = getattr(view, 'security_headers', None)
+            if overrides:
+                merged = dict(block)
+                merged.update(overrides)
+                block = tuple((name, value) for name, value in merged.items() if value is not None)
+            self._endpoint_headers[endpoint] = block
+        return block
+
+    def override_headers(self, overrides: Dict[str, Optional[str]]) -> Callable:
+        """Decorator replacing security headers on one view; a None value drops the header"""
+        def decorator(view):
+            view.security_headers = dict(overrides)
+            self._endpoint_headers.clear()
+            return view
+        return decorator
+
+    def charge_by_size(self, bytes_per_request: int) -> Callable:
+        """Decorator charging a view's requests to the rate limit per started block of body bytes"""
+        def decorator(view):
+            view.rate_limit_bytes = bytes_per_request
+            return view
+        return decorator
+
+    def skip_body_scan(self, view):
+        """Decorator exempting a view's request body from the injection scan; query strings are still scanned"""
+        view.scan_body = False
+        return view
+
+    def _view(self) -> Optional[Callable]:
+        """Get the view function handling the current request"""
+        return current_app.view_functions.get(request.endpoint) if request.endpoint else None
+
+    def _request_cost(self) -> int:
+        """Requests the current request counts as against the rate limit"""
+        unit = getattr(self._view(), 'rate_limit_bytes', None)
+        if not unit or request.content_length is None:
+            # Bodies of unknown length are charged as they are read, see metered_body
+            return 1
+        return max(1, -(-request.content_length // unit))
+
+    def metered_body(self) -> Iterator[bytes]:
+        """Iterate the request body's lines, charging a body of unknown length per started block as it is read"""
+        unit = getattr(self._view(), 'rate_limit_bytes', None)
+        if not unit or request.content_length is not None:
+            # Already charged in full before the view ran
+            yield from request.stream
+            return
         
-        # Check form data
-        if any(check_value(str(v)) for v in request.form.values()):
-            return True
+        charged = 1
+        size = 0
+        for line in request.stream:
+            size += len(line)
+            blocks = -(-size // unit)
+            if blocks > charged:
+                if not self._check_rate_limit(request.remote_addr, blocks - charged):
+                    raise RateLimitExceeded()
+                charged = blocks
+            yield line
+
+    def _check_rate_limit(self, ip: str, cost: int = 1) -> bool:
+        """Check if the IP has exceeded the rate limit"""
+        return self.rate_limit_store.allow(ip, self.rate_limit_max_requests, self.rate_limit_window, cost=cost)
+
+    def _injection_scanner(self) -> Optional[Pattern]:
+        """Get one matcher for every XSS and SQL pattern, rebuilt when the pattern lists change"""
+        key = (tuple(self.xss_patterns), tuple(self.sql_patterns))
+        if key != self._scanner_key:
+            patterns = key[0] + key[1]
+            self._scanner = re.compile(
+                '|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE
+            ) if patterns else None
+            self._scanner_key = key
+        return self._scanner
+
+    def _request_values(self, request) -> List[str]:
+        """Collect every string in the query, form and (nested) JSON data"""
+        values = [value for _, items in request.args.lists() for value in items]
+        if not getattr(self._view(), 'scan_body', True):
+            return values
+        values.extend(value for _, items in request.form.lists() for value in items)
         
-        # Check JSON data
         if request.is_json:
-            try:
-                json_data = request.get_json()
-                if isinstance(json_data, dict):
-                    return any(check_value(str(v)) for v in json_data.values())
-            except:
-                pass
-        
-        return False
-
-    def _check_sql_injection(self, request) -> bool:
-        """Check for SQL injection attempts in request data"""
-        def check_value(value: str) -> bool:
-            if not isinstance(value, str):
-                return False
-            return any(re.search(pattern, value, re.IGNORECASE) for pattern in self.sql_patterns)
-        
-        # Check query parameters
-        if any(check_value(str(v)) for v in request.args.values()):
-            return True
-        
-        # Check form data
-        if any(check_value(str(v)) for v in request.form.values()):
-            return True
+            # Parsed once; Flask caches the result for the view
+            pending = [request.get_json(silent=True)]
+            while pending:
+                item = pending.pop()
+                if isinstance(item, str):
+                    values.append(item)
+                elif isinstance(item, dict):
+                    pending.extend(item.values())
+                elif isinstance(item, list):
+                    pending.extend(item)
         
-        # Check JSON data
-        if request.is_json:
-            try:
-                json_data = request.get_json()
-                if isinstance(json_data, dict):
-                    return any(check_value(str(v)) for v in json_data.values())
-            except:
-                pass
+        return values
+
+    def _check_injection(self, request) -> bool:
+        """Check for XSS and SQL injection attempts in request data"""
+        scanner = self._injection_scanner()
+        if scanner is None:
+            return False
         
-        return False
+        # No pattern matches across a newline, so joining on newlines scans
+        # every value in one pass without matches spanning two values
+        return scanner.search('\n'.join(self._request_values(request))) is not None
 
     def handle_bad_request(self, error):
         """Handle 400 Bad Request errors"""
@@ -243,4 +685,8 @@ class SecurityMiddleware:
             if key in self.csp_policy:
                 self.csp_policy[key].extend(values)
             else:
-                self.csp_policy[key] = values 
\ No newline at end of file
+                self.csp_policy[key] = values
+        
+        # Rebuild the header blocks on the next response
+        self._header_block = None
+        self._endpoint_headers.clear() 
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Compiled wordlists.
+
+Compiling a wordlist validates every line once, drops duplicates and
+writes the survivors to a string table, optionally most frequent first.
+A compiled wordlist is opened with a single memory map and needs no
+splitting or regex matching when it is loaded. Text wordlists with an
+up-to-date compiled copy next to them are read from the copy.
+"""
+import hashlib
+import logging
+import re
+import struct
+from itertools import groupby
+from pathlib import Path
+from typing import Optional, Iterator
+
+from config import VALIDATION_PATTERNS
+from extsort import ExternalSorter
+from stringtable import MAGIC, StringTable, write_string_table
+from utils import SecurityError, stream_file_lines
+
+logger = logging.getLogger(__name__)
+
+# Compiled once for streaming wordlist validation
+PASSWORD_PATTERN = re.compile(VALIDATION_PATTERNS['password'].encode())
+
+COMPILED_SUFFIX = '.pwl'
+
+# Sort keys for compiling: big-endian, so byte order is numeric order
+POSITION = struct.Struct('>Q')
+MAX_POSITION = 2 ** 64 - 1
+# Separator and position after the word in an occurrence record
+OCCURRENCE_TAIL = 1 + POSITION.size
+
+def iter_valid_lines(path: Path) -> Iterator[str]:
+    """
+    Stream the valid passwords of a text wordlist, in file order.
+    
+    Args:
+        path: Text wordlist path
+    
+    Returns:
+        Iterator[str]: Valid passwords, duplicates included
+    
+    Raises:
+        SecurityError: If the wordlist cannot be opened
+    """
+    match = PASSWORD_PATTERN.match
+    return (
+        line.decode('ascii')
+        for line in stream_file_lines(Path(path))
+        if match(line)
+    )
+
+def compiled_path(path: Path) -> Path:
+    """
+    Get the default compiled path of a text wordlist.
+    
+    Args:
+        path: Text wordlist path
+    
+    Returns:
+        Path: Path with the compiled suffix
+    """
+    return Path(path).with_suffix(COMPILED_SUFFIX)
+
+def is_compiled(path: Path) -> bool:
+    """
+    Check whether a file is a compiled wordlist.
+    
+    Args:
+        path: File to check
+    
+    Returns:
+        bool: True if the file starts with the string table magic
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def compile_wordlist(source: Path, dest: Optional[Path] = None, by_frequency: bool = False) -> int:
+    """
+    Validate, deduplicate and compile a text wordlist.
+    
+    Args:
+        source: Text wordlist path
+        dest: Compiled wordlist path, next to the source by default
+        by_frequency: Order words by how often they occur, most frequent
+            first; otherwise keep the order of first occurrence
+    
+    Returns:
+        int: Number of distinct words written
+    
+    Raises:
+        SecurityError: If the source is unreadable or already compiled
+    """
+    source = Path(source)
+    if is_compiled(source):
+        raise SecurityError(f"Wordlist is already compiled: {source}")
+    dest = Path(dest) if dest else compiled_path(source)
+    
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Both passes sort on disk, so memory stays flat for any wordlist size:
+    # first every occurrence by word, then each distinct word by its rank
+    with ExternalSorter(directory=dest.parent) as occurrences, ExternalSorter(directory=dest.parent) as ranked:
+        for position, word in enumerate(iter_valid_lines(source)):
+            occurrences.add(word.encode() + b'\0' + POSITION.pack(position))
+        
+        # Occurrences of a word are adjacent and in file order
+        for word, group in groupby(occurrences.sorted(), key=lambda record: record[:-OCCURRENCE_TAIL]):
+            first = next(group)[-POSITION.size:]
+            if by_frequency:
+                # Most frequent first, ties in first-occurrence order
+                ranked.add(POSITION.pack(MAX_POSITION - (1 + sum(1 for _ in group))) + first + word)
+            else:
+                ranked.add(first + word)
+        
+        skip = POSITION.size * (2 if by_frequency else 1)
+        count = write_string_table(dest, (record[skip:].decode('ascii') for record in ranked.sorted()))
+    logger.info(f"Compiled {count} distinct words from {source} into {dest}")
+    return count
+
+def resolve_wordlist(path: Path) -> Path:
+    """
+    Prefer an up-to-date compiled copy of a text wordlist.
+    
+    Args:
+        path: Wordlist path, text or compiled
+    
+    Returns:
+        Path: The compiled copy if it is newer than the text wordlist,
+            otherwise the path itself
+    """
+    path = Path(path)
+    compiled = compiled_path(path)
+    if compiled != path and compiled.exists() and path.exists():
+        if compiled.stat().st_mtime >= path.stat().st_mtime:
+            return compiled
+    return path
+
+def ensure_compiled(path: Path, cache_dir: Path) -> Path:
+    """
+    Get a compiled wordlist for a path, compiling it into a cache if needed.
+    
+    Compiled wordlists and text wordlists with an up-to-date compiled copy
+    are used as they are. Other text wordlists are compiled into the cache
+    directory under a name derived from their path, size and modification
+    time, so edited wordlists are compiled again.
+    
+    Args:
+        path: Wordlist path, text or compiled
+        cache_dir: Directory for compiled copies
+    
+    Returns:
+        Path: Compiled wordlist path
+    
+    Raises:
+        SecurityError: If the wordlist cannot be read or compiled
+    """
+    path = resolve_wordlist(path)
+    if is_compiled(path):
+        return path
+    
+    try:
+        stat = path.stat()
+    except OSError as e:
+        raise SecurityError(f"Failed to read wordlist: {str(e)}")
+    key = f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    cached = Path(cache_dir) / f"{path.stem}_{hashlib.sha256(key.encode()).hexdigest()[:16]}{COMPILED_SUFFIX}"
+    if not cached.exists():
+        compile_wordlist(path, cached)
+    return cached
+
+def iter_compiled(path: Path) -> Iterator[str]:
+    """
+    Stream the words of a compiled wordlist from its memory map.
+    
+    The map is released when the iterator is exhausted or closed.
+    
+    Args:
+        path: Compiled wordlist path
+    
+    Returns:
+        Iterator[str]: Words in compiled order
+    
+    Raises:
+        SecurityError: If the file is not a valid compiled wordlist
+    """
+    table = StringTable(path)
+    
+    def words() -> Iterator[str]:
+        """Yield every word, then release the map."""
+        try:
+            yield from table
+        finally:
+            table.close()
+    
+    return words()